@@ -0,0 +1,39 @@
+// components/SimilarEntities.js
+import Link from "next/link"
+
+// Nearest officials or lobbyists from the build-time similarity index, with the estimated overlap of counterparts.
+export default function SimilarEntities({
+  title,
+  items = [],
+  linkPrefix,
+  counterpartLabel,
+  emptyLabel,
+  className = "mt-4"
+}) {
+  return (
+    <div className={className}>
+      <h3 className="text-sm font-semibold mb-2">{title}</h3>
+      {items.length ? (
+        <>
+          <div className="flex flex-wrap gap-2">
+            {items.map((item) => (
+              <Link
+                key={item.slug}
+                href={`${linkPrefix}/${item.slug}`}
+                title={`${item.counterpart_count} ${counterpartLabel}`}
+                className="text-xs md:text-sm px-2.5 py-1 rounded-full border border-[var(--ui-border)] bg-white/80 dark:bg-slate-900/35 hover:underline no-underline"
+              >
+                {item.name} · {Math.round(item.jaccard * 100)}%
+              </Link>
+            ))}
+          </div>
+          <p className="mt-2 text-xs text-muted-ui">
+            Percentages estimate the overlap (Jaccard similarity) of the {counterpartLabel} involved.
+          </p>
+        </>
+      ) : (
+        <p className="text-sm text-muted-ui">{emptyLabel}</p>
+      )}
+    </div>
+  )
+}
@@ -1,6 +1,6 @@
 import fs from "fs/promises"
 import path from "path"
-import { getDb } from "./sqlite"
+import { DB_PATH, withDb } from "./sqlite"
 
 function toIsoOrNull(value) {
   if (!value) return null
@@ -10,7 +10,27 @@ function toIsoOrNull(value) {
 }
 
 export async function getDataMetadata() {
-  const db = await getDb()
+  return withDb(readDataMetadata, "lib/dataMetadata")
+}
+
+// parser.py stores the totals and coverage alongside the dataset version, so a current build needs a single-row
+// read. Databases built before those columns existed fall back to computing them.
+async function readStoredMetadata(db) {
+  try {
+    const row = await db.get(
+      `SELECT total_returns, total_periods, total_lobbyists, total_officials,
+        earliest_period, latest_period, first_published_at, last_published_at
+      FROM dataset_metadata
+      ORDER BY id DESC
+      LIMIT 1`
+    )
+    return row && row.total_returns !== null ? row : null
+  } catch {
+    return null
+  }
+}
+
+async function computeMetadata(db) {
   const totals = await db.get(
     `SELECT
       COUNT(*) AS total_returns,
@@ -69,9 +89,24 @@ export async function getDataMetadata() {
     )
   }
 
+  return {
+    total_returns: totals?.total_returns ?? 0,
+    total_periods: totals?.total_periods ?? 0,
+    total_lobbyists: totals?.total_lobbyists ?? 0,
+    total_officials: officials?.total_officials ?? 0,
+    earliest_period: earliestPeriod?.period || null,
+    latest_period: latestPeriod?.period || null,
+    first_published_at: minMaxPublished?.first_published_at,
+    last_published_at: minMaxPublished?.last_published_at
+  }
+}
+
+async function readDataMetadata(db) {
+  const stored = (await readStoredMetadata(db)) || (await computeMetadata(db))
+
   let dbLastModifiedAt = null
   try {
-    const dbPath = path.resolve(process.cwd(), "lobbying.db")
+    const dbPath = path.resolve(process.cwd(), DB_PATH)
     const stat = await fs.stat(dbPath)
     dbLastModifiedAt = new Date(stat.mtime).toISOString()
   } catch {
@@ -80,16 +115,16 @@ export async function getDataMetadata() {
 
   return {
     summary: {
-      total_returns: totals?.total_returns ?? 0,
-      total_periods: totals?.total_periods ?? 0,
-      total_lobbyists: totals?.total_lobbyists ?? 0,
-      total_officials: officials?.total_officials ?? 0
+      total_returns: stored.total_returns,
+      total_periods: stored.total_periods,
+      total_lobbyists: stored.total_lobbyists,
+      total_officials: stored.total_officials
     },
     coverage: {
-      earliest_period: earliestPeriod?.period || null,
-      latest_period: latestPeriod?.period || null,
-      first_published_at: toIsoOrNull(minMaxPublished?.first_published_at),
-      last_published_at: toIsoOrNull(minMaxPublished?.last_published_at)
+      earliest_period: stored.earliest_period || null,
+      latest_period: stored.latest_period || null,
+      first_published_at: toIsoOrNull(stored.first_published_at),
+      last_published_at: toIsoOrNull(stored.last_published_at)
     },
     freshness: {
       db_last_modified_at: dbLastModifiedAt
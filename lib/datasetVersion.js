@@ -0,0 +1,35 @@
+import { recyclePool, withDb } from "./sqlite"
+
+const VERSION_CHECK_INTERVAL_MS = 5000
+
+let cachedVersion = null
+let checkedAt = 0
+
+async function readDatasetVersion(db) {
+  try {
+    const row = await db.get("SELECT dataset_version FROM dataset_metadata ORDER BY id DESC LIMIT 1")
+    return row?.dataset_version || null
+  } catch (err) {
+    if (!String(err?.message || "").includes("no such table")) throw err
+    return null
+  }
+}
+
+// The parser stamps a content hash of its inputs into dataset_metadata, so anything keyed on it stays valid until
+// the data is rebuilt from different sources. Callers already holding a pooled connection pass it in so a full pool
+// cannot deadlock waiting on itself.
+export async function getDatasetVersion(db) {
+  const now = Date.now()
+  if (cachedVersion && now - checkedAt < VERSION_CHECK_INTERVAL_MS) {
+    return cachedVersion
+  }
+
+  const version = db ? await readDatasetVersion(db) : await withDb(readDatasetVersion, "lib/datasetVersion")
+
+  const current = version || "unversioned"
+  // A rebuild may have added or dropped year partitions, which pooled connections only attach when they open.
+  if (cachedVersion && cachedVersion !== current) recyclePool()
+  cachedVersion = current
+  checkedAt = now
+  return cachedVersion
+}
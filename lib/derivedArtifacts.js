@@ -0,0 +1,108 @@
+import crypto from "crypto"
+import fs from "fs"
+import fsp from "fs/promises"
+import path from "path"
+import { etagMatches, REVALIDATE_CACHE_CONTROL } from "./httpCache"
+
+const DERIVED_DIR = path.join(process.cwd(), "data", "derived")
+const ARTIFACTS_DIR = path.join(DERIVED_DIR, "artifacts")
+const MANIFEST_PATH = path.join(ARTIFACTS_DIR, "manifest.json")
+
+// Preferred first. Each encoding is a separate representation, so each gets its own strong ETag.
+const ENCODINGS = [
+  { name: "br", suffix: ".br" },
+  { name: "gzip", suffix: ".gz" }
+]
+
+let cachedManifest = null
+let cachedMtimeMs = 0
+
+async function loadManifest() {
+  try {
+    const stat = await fsp.stat(MANIFEST_PATH)
+    if (cachedManifest && cachedMtimeMs === stat.mtimeMs) return cachedManifest
+    cachedManifest = JSON.parse(await fsp.readFile(MANIFEST_PATH, "utf-8")).artifacts || {}
+    cachedMtimeMs = stat.mtimeMs
+    return cachedManifest
+  } catch {
+    return null
+  }
+}
+
+// Content hashes of the source files, keyed by path and reused while the file's mtime is unchanged.
+const sourceHashes = new Map()
+
+async function sourceHash(filePath, mtimeMs) {
+  const known = sourceHashes.get(filePath)
+  if (known?.mtimeMs === mtimeMs) return known.hash
+  const body = await fsp.readFile(filePath)
+  const hash = crypto.createHash("sha256").update(body).digest("hex").slice(0, 16)
+  sourceHashes.set(filePath, { mtimeMs, hash })
+  return hash
+}
+
+// An artifact is current while its source file (data/derived/current_oireachtas_members.json, ...) is no newer than
+// the manifest entry, or was rewritten with the same content. A roster refreshed after the last artifact build is
+// then served from the source instead of the stale copy. Entries without a recorded source, or whose source is gone,
+// are served as built.
+async function isCurrent(artifact) {
+  if (!artifact.source) return true
+  const filePath = path.join(DERIVED_DIR, artifact.source)
+  let stat
+  try {
+    stat = await fsp.stat(filePath)
+  } catch {
+    return true
+  }
+  if (stat.mtimeMs <= artifact.source_mtime_ms) return true
+  return (await sourceHash(filePath, stat.mtimeMs)) === artifact.source_hash
+}
+
+function acceptedEncodings(header) {
+  return new Set(
+    String(header || "")
+      .split(",")
+      .map((part) => part.trim().split(";"))
+      .filter(([, q]) => !q || Number(q.trim().replace(/^q=/, "")) > 0)
+      .map(([name]) => name.trim().toLowerCase())
+  )
+}
+
+// Sends the precompressed artifact written by scripts/build-derived-artifacts.mjs, choosing brotli or gzip from
+// Accept-Encoding and streaming the stored file as is. Resolves false when the artifact has not been built, or its
+// source has changed since, so the caller can fall back to serializing the source JSON.
+export async function sendDerivedArtifact(req, res, name) {
+  const artifact = (await loadManifest())?.[name]
+  if (!artifact || !(await isCurrent(artifact))) return false
+
+  const accepted = acceptedEncodings(req.headers["accept-encoding"])
+  const encoding = ENCODINGS.find((candidate) => accepted.has(candidate.name))
+  const filePath = path.join(ARTIFACTS_DIR, `${artifact.file}${encoding ? encoding.suffix : ""}`)
+  let stat
+  try {
+    stat = await fsp.stat(filePath)
+  } catch {
+    return false
+  }
+
+  const etag = `"${artifact.hash}${encoding ? `-${encoding.name}` : ""}"`
+  res.setHeader("ETag", etag)
+  res.setHeader("Cache-Control", REVALIDATE_CACHE_CONTROL)
+  res.setHeader("Vary", "Accept-Encoding")
+  if (etagMatches(req.headers["if-none-match"], etag)) {
+    res.status(304).end()
+    return true
+  }
+
+  res.setHeader("Content-Type", "application/json; charset=utf-8")
+  res.setHeader("Content-Length", stat.size)
+  if (encoding) res.setHeader("Content-Encoding", encoding.name)
+  res.status(200)
+  await new Promise((resolve, reject) => {
+    const stream = fs.createReadStream(filePath)
+    stream.on("error", reject)
+    res.on("close", resolve)
+    stream.pipe(res)
+  })
+  return true
+}
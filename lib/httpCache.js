@@ -0,0 +1,27 @@
+import crypto from "crypto"
+
+export const REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+export function etagMatches(ifNoneMatch, etag) {
+  if (!ifNoneMatch) return false
+  return String(ifNoneMatch)
+    .split(",")
+    .map((value) => value.trim())
+    .some((value) => value === "*" || value === etag || value === `W/${etag}`)
+}
+
+export function sendJson(req, res, payload, { version, cacheControl = REVALIDATE_CACHE_CONTROL } = {}) {
+  const body = JSON.stringify(payload)
+  const etag = `"${crypto.createHash("sha1").update(body).digest("base64url")}"`
+  res.setHeader("ETag", etag)
+  res.setHeader("Cache-Control", cacheControl)
+  if (version) res.setHeader("X-Dataset-Version", version)
+
+  if (etagMatches(req.headers["if-none-match"], etag)) {
+    res.status(304).end()
+    return
+  }
+
+  res.setHeader("Content-Type", "application/json; charset=utf-8")
+  res.status(200).send(body)
+}
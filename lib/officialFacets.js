@@ -0,0 +1,150 @@
+// parser.py stores, per official, the sorted ids of their returns for every facet value in official_facets: each
+// year, activity method, lobbyist and job title the official held on the return, plus the returns that named only
+// them. Any filter combination is an intersection of those lists, and the same lists give the facet counts. Every
+// return of the official is also stored in each listing order, so a page of a selection is sliced here and only its
+// rows are read (fetchReturnsById in lib/returnPagination.js).
+
+const FACETS = ["year", "method", "lobbyist", "job_title"]
+const EMPTY = new Uint32Array(0)
+
+// record_ids is a little-endian uint32 array; copied so the view is aligned whatever the driver's buffer offset.
+function decodeIds(blob) {
+  if (!blob || !blob.length) return EMPTY
+  const ids = new Uint32Array(blob.length / 4)
+  for (let i = 0; i < ids.length; i++) ids[i] = blob.readUInt32LE(i * 4)
+  return ids
+}
+
+function intersect(a, b) {
+  const out = new Uint32Array(Math.min(a.length, b.length))
+  let i = 0
+  let j = 0
+  let n = 0
+  while (i < a.length && j < b.length) {
+    if (a[i] < b[j]) i++
+    else if (a[i] > b[j]) j++
+    else {
+      out[n++] = a[i]
+      i++
+      j++
+    }
+  }
+  return out.subarray(0, n)
+}
+
+function union(lists) {
+  if (lists.length === 1) return lists[0]
+  const merged = Uint32Array.from(new Set(lists.flatMap((list) => Array.from(list))))
+  return merged.sort()
+}
+
+function toList(value) {
+  if (Array.isArray(value)) return value.filter(Boolean)
+  if (typeof value === "string" && value) return value.split(",").map((item) => item.trim())
+  return []
+}
+
+export async function loadOfficialFacets(db, canonical) {
+  const facets = {
+    all: EMPTY,
+    single: EMPTY,
+    year: new Map(),
+    method: new Map(),
+    lobbyist: new Map(),
+    job_title: new Map(),
+    order: new Map()
+  }
+  const rows = await db.all(`SELECT facet, value, record_ids FROM official_facets WHERE person_name = ?`, [canonical])
+  for (const row of rows) {
+    const ids = decodeIds(row.record_ids)
+    if (row.facet === "all" || row.facet === "single") facets[row.facet] = ids
+    else facets[row.facet]?.set(row.value, ids)
+  }
+  return facets
+}
+
+// Ids allowed by each active filter; values within one facet are ORed. Lobbyist and method match case-insensitively
+// like the SQL filters they replace.
+function facetSelections(facets, { lobbyist, year, method, jobTitles, officialScope }) {
+  const pick = (facet, values, caseInsensitive = false) => {
+    if (!values.length) return null
+    const wanted = new Set(caseInsensitive ? values.map((value) => value.toLowerCase()) : values)
+    const lists = []
+    for (const [value, ids] of facets[facet]) {
+      if (wanted.has(caseInsensitive ? value.toLowerCase() : value)) lists.push(ids)
+    }
+    return lists.length ? union(lists) : EMPTY
+  }
+  return {
+    year: pick("year", year ? [String(year)] : []),
+    method: pick("method", toList(method), true),
+    lobbyist: pick("lobbyist", lobbyist ? [String(lobbyist)] : [], true),
+    job_title: pick("job_title", jobTitles || []),
+    scope: officialScope === "only-this-official" ? facets.single : null
+  }
+}
+
+function intersectSelections(facets, selections, skipped = null) {
+  return Object.entries(selections).reduce(
+    (ids, [facet, selected]) => (facet === skipped || !selected ? ids : intersect(ids, selected)),
+    facets.all
+  )
+}
+
+// The record ids (ascending) matching every filter.
+export function selectOfficialRecords(facets, filters) {
+  return intersectSelections(facets, facetSelections(facets, filters))
+}
+
+// For every facet, how many of the returns matching the other filters carry each value, so options that would empty
+// the listing can be shown as such.
+export function countOfficialFacets(facets, filters) {
+  const selections = facetSelections(facets, filters)
+  const facetCounts = {}
+  for (const facet of FACETS) {
+    const candidates = intersectSelections(facets, selections, facet)
+    const counts = {}
+    for (const [value, ids] of facets[facet]) {
+      const count = intersect(candidates, ids).length
+      if (count) counts[value] = count
+    }
+    facetCounts[facet] = counts
+  }
+  return facetCounts
+}
+
+// Index of `id` in the ascending `ids`, or -1.
+function findId(ids, id) {
+  let lo = 0
+  let hi = ids.length - 1
+  while (lo <= hi) {
+    const mid = (lo + hi) >>> 1
+    if (ids[mid] < id) lo = mid + 1
+    else if (ids[mid] > id) hi = mid - 1
+    else return mid
+  }
+  return -1
+}
+
+// The selection `ids` in the listing order `sort`, built once per selection (the official API caches it with its
+// summary). `positions[k]` is where `ids[k]` sits in `order`, so a page starts with one binary search.
+export function listOfficialRecords(facets, ids, sort) {
+  const listing = { ids, order: new Uint32Array(ids.length), positions: new Uint32Array(ids.length) }
+  let n = 0
+  for (const id of facets.order.get(sort) || EMPTY) {
+    const k = findId(ids, id)
+    if (k === -1) continue
+    listing.positions[k] = n
+    listing.order[n++] = id
+  }
+  listing.order = listing.order.subarray(0, n)
+  return listing
+}
+
+// The next `limit` ids of a listing, starting after `afterId`, the last return of the previous page, or skipping
+// `offset` of them.
+export function sliceOfficialRecords(listing, { afterId = null, offset = 0, limit }) {
+  const k = afterId === null ? -1 : findId(listing.ids, afterId)
+  const start = (k === -1 ? 0 : listing.positions[k] + 1) + offset
+  return Array.from(listing.order.subarray(start, start + limit))
+}
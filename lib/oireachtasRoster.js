@@ -1,6 +1,7 @@
-import { execFileSync } from "child_process"
+import { execFile } from "child_process"
 import fs from "fs/promises"
 import path from "path"
+import { promisify } from "util"
 
 const ROSTER_PATH = path.join(process.cwd(), "data", "derived", "current_oireachtas_members.json")
 
@@ -28,7 +29,10 @@ export function rosterNameSet(roster) {
   )
 }
 
-export function fetchOireachtasMemberContacts(memberUrl) {
+const execFileAsync = promisify(execFile)
+
+// Runs curl without blocking the event loop; the page can take up to 20 seconds.
+export async function fetchOireachtasMemberContacts(memberUrl) {
   if (!memberUrl) {
     return {
       emails: [],
@@ -39,7 +43,8 @@ export function fetchOireachtasMemberContacts(memberUrl) {
 
   let html = ""
   try {
-    html = execFileSync("curl", ["-L", "-s", "--max-time", "20", memberUrl], { encoding: "utf-8" })
+    const result = await execFileAsync("curl", ["-L", "-s", "--max-time", "20", memberUrl], { encoding: "utf-8" })
+    html = result.stdout
   } catch {
     return {
       emails: [],
@@ -0,0 +1,150 @@
+import crypto from "crypto"
+
+const SLOW_QUERY_MS = Number(process.env.SLOW_QUERY_MS) || 250
+const MAX_QUERY_SHAPES = 500
+export const DURATION_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+export const ROW_BUCKETS = [0, 1, 10, 100, 1000, 10000, 100000]
+
+function createMetricsState() {
+  return {
+    routes: new Map(),
+    shapes: new Map()
+  }
+}
+
+const metricsState = globalThis.__lobbyiengQueryMetricsState || createMetricsState()
+if (!globalThis.__lobbyiengQueryMetricsState) {
+  globalThis.__lobbyiengQueryMetricsState = metricsState
+}
+
+function createHistogram(buckets) {
+  return { buckets: buckets.map(() => 0), count: 0, sum: 0 }
+}
+
+function observe(histogram, bounds, value) {
+  histogram.count += 1
+  histogram.sum += value
+  const index = bounds.findIndex((bound) => value <= bound)
+  if (index !== -1) histogram.buckets[index] += 1
+}
+
+// Same normalization as scripts/check_query_plans.py, so a fingerprint in the slow-query log or /api/metrics can be
+// looked up in the query plan report.
+export function queryFingerprint(sql) {
+  const normalized = String(sql)
+    .replace(/--[^\n]*/g, "")
+    .replace(/'(?:[^']|'')*'/g, "?")
+    .replace(/(?<![\w.])-?\d+(?:\.\d+)?\b/g, "?")
+    .replace(/\?(?:\s*,\s*\?)+/g, "?, ...")
+    .split(/\s+/)
+    .filter(Boolean)
+    .join(" ")
+  return crypto.createHash("sha1").update(normalized).digest("hex").slice(0, 12)
+}
+
+function routeMetrics(route) {
+  let metrics = metricsState.routes.get(route)
+  if (!metrics) {
+    metrics = {
+      duration: createHistogram(DURATION_BUCKETS_MS),
+      rows: createHistogram(ROW_BUCKETS),
+      errors: 0,
+      slow: 0
+    }
+    metricsState.routes.set(route, metrics)
+  }
+  return metrics
+}
+
+function shapeMetrics(route, fingerprint) {
+  const key = `${route}\u0000${fingerprint}`
+  let shape = metricsState.shapes.get(key)
+  if (!shape) {
+    // Query text is built from a fixed set of templates, but keep a bound in case a caller inlines values.
+    if (metricsState.shapes.size >= MAX_QUERY_SHAPES) return null
+    shape = { route, fingerprint, calls: 0, totalMs: 0, maxMs: 0 }
+    metricsState.shapes.set(key, shape)
+  }
+  return shape
+}
+
+export function recordQuery({ route, sql, params, durationMs, rows, error }) {
+  const metrics = routeMetrics(route)
+  observe(metrics.duration, DURATION_BUCKETS_MS, durationMs)
+  observe(metrics.rows, ROW_BUCKETS, rows)
+  if (error) metrics.errors += 1
+
+  const fingerprint = queryFingerprint(sql)
+  const shape = shapeMetrics(route, fingerprint)
+  if (shape) {
+    shape.calls += 1
+    shape.totalMs += durationMs
+    shape.maxMs = Math.max(shape.maxMs, durationMs)
+  }
+
+  if (durationMs >= SLOW_QUERY_MS) {
+    metrics.slow += 1
+    console.warn(
+      JSON.stringify({
+        msg: "slow query",
+        route,
+        fingerprint,
+        duration_ms: Math.round(durationMs),
+        rows,
+        sql: String(sql).split(/\s+/).filter(Boolean).join(" "),
+        params
+      })
+    )
+  }
+}
+
+function rowCount(result) {
+  if (Array.isArray(result)) return result.length
+  return result ? 1 : 0
+}
+
+function normalizeParams(params) {
+  return params.length === 1 && (Array.isArray(params[0]) || typeof params[0] === "object") ? params[0] : params
+}
+
+// Wraps a connection checked out of the pool so every query is timed and attributed to the route that ran it.
+export function instrumentDb(db, route) {
+  const timed =
+    (method) =>
+    async (sql, ...params) => {
+      const started = performance.now()
+      let result
+      let error = null
+      try {
+        result = await db[method](sql, ...params)
+        return result
+      } catch (err) {
+        error = err
+        throw err
+      } finally {
+        recordQuery({
+          route,
+          sql,
+          params: normalizeParams(params),
+          durationMs: performance.now() - started,
+          rows: method === "all" || method === "get" ? rowCount(result) : 0,
+          error
+        })
+      }
+    }
+
+  return {
+    all: timed("all"),
+    get: timed("get"),
+    run: timed("run"),
+    exec: timed("exec")
+  }
+}
+
+export function getQueryMetrics() {
+  return {
+    slowQueryMs: SLOW_QUERY_MS,
+    routes: Array.from(metricsState.routes.entries()).map(([route, metrics]) => ({ route, ...metrics })),
+    shapes: Array.from(metricsState.shapes.values())
+  }
+}
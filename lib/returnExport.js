@@ -0,0 +1,95 @@
+import { RETURN_SORT_KEYS, writeChunk } from "./returnPagination"
+
+export const EXPORT_FORMATS = {
+  ndjson: { contentType: "application/x-ndjson; charset=utf-8", extension: "ndjson" },
+  csv: { contentType: "text/csv; charset=utf-8", extension: "csv" }
+}
+
+const EXPORT_COLUMNS = [
+  "id",
+  "csv_id",
+  "url",
+  "lobbyist_name",
+  "date_published",
+  "period",
+  "relevant_matter",
+  "public_policy_area",
+  "specific_details",
+  "subject_matter",
+  "intended_results",
+  "person_primary",
+  "any_dpo_or_former_dpo",
+  "current_or_former_dpos",
+  "grassroots_campaign",
+  "grassroots_directive",
+  "lobbying_on_behalf",
+  "clients",
+  "official_count"
+]
+
+// Flush to the socket once this much output has been buffered, rather than issuing one write per row.
+const FLUSH_BYTES = 64 * 1024
+
+const BATCH_SIZE = 500
+
+// fewest_officials_key is read for the keyset cursor only and is not exported.
+const EXPORT_SELECT = [
+  ...EXPORT_COLUMNS.map((column) => `lr.${column}`),
+  "lr.dpo_entries_json AS dpo_entries",
+  "lr.activities_json AS lobbying_activities",
+  "lr.fewest_officials_key"
+].join(", ")
+
+function toRecord(row) {
+  return {
+    ...Object.fromEntries(EXPORT_COLUMNS.map((column) => [column, row[column]])),
+    grassroots_campaign: row.grassroots_campaign === null ? null : Boolean(row.grassroots_campaign),
+    lobbying_on_behalf: row.lobbying_on_behalf === null ? null : Boolean(row.lobbying_on_behalf),
+    dpo_entries: JSON.parse(row.dpo_entries || "[]"),
+    lobbying_activities: JSON.parse(row.lobbying_activities || "[]")
+  }
+}
+
+function csvCell(value) {
+  if (value === null || value === undefined) return ""
+  const text = String(value)
+  return /[",\r\n]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text
+}
+
+// DPO and activity lists use the Register's own "::" and "|" separators.
+function csvLine(record) {
+  const dpos = record.dpo_entries.map((dpo) => [dpo.person_name, dpo.job_title, dpo.public_body].join("|")).join("::")
+  const activities = record.lobbying_activities.join("::")
+  return [...EXPORT_COLUMNS.map((column) => record[column]), dpos, activities].map(csvCell).join(",") + "\r\n"
+}
+
+// Reads the matching returns in batches and writes each batch as it arrives, so memory stays bounded by one batch and
+// the flush buffer no matter how many rows match. fetchBatch(afterValues, limit, columns) returns the next rows in
+// `sort` order; it should borrow a pooled connection for the read only (withDb), so a slow download never holds one
+// while the socket drains. Reading stops as soon as the client disconnects.
+export async function streamReturnExport(res, { fetchBatch, sort, format, filename, version }) {
+  const { contentType, extension } = EXPORT_FORMATS[format]
+  res.setHeader("Content-Type", contentType)
+  res.setHeader("Content-Disposition", `attachment; filename="${filename}.${extension}"`)
+  res.setHeader("Cache-Control", "no-store")
+  if (version) res.setHeader("X-Dataset-Version", version)
+  res.status(200)
+
+  const serialize = format === "csv" ? csvLine : (record) => `${JSON.stringify(record)}\n`
+  let buffer = format === "csv" ? [...EXPORT_COLUMNS, "dpo_entries", "lobbying_activities"].join(",") + "\r\n" : ""
+  let afterValues = null
+  for (;;) {
+    const rows = await fetchBatch(afterValues, BATCH_SIZE, EXPORT_SELECT)
+    for (const row of rows) {
+      buffer += serialize(toRecord(row))
+      if (buffer.length >= FLUSH_BYTES) {
+        if (!(await writeChunk(res, buffer))) return
+        buffer = ""
+      }
+    }
+    if (rows.length < BATCH_SIZE) break
+    afterValues = RETURN_SORT_KEYS[sort].map((key) => key.value(rows[rows.length - 1]))
+  }
+  if (buffer && !(await writeChunk(res, buffer))) return
+  res.end()
+}
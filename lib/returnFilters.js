@@ -0,0 +1,72 @@
+// Filters shared by the lobbyist detail API and its bulk export. Each builder returns a WHERE clause over
+// `lobbying_records lr` and its parameters; official returns are filtered through lib/officialFacets.js instead.
+// The clause is built per partition schema (see partitionBranches in lib/sqlite.js), so the EXISTS lookups on a
+// return's DPO and activity rows stay inside the database holding the return.
+
+// parser.py stores each DPO name's official slug in official_links, so resolving a slug is one index seek. Spellings
+// that share a slug resolve to the one on the most returns.
+export async function resolveOfficialName(db, slug) {
+  const row = await db.get(
+    `SELECT person_name FROM official_links WHERE official_slug = ? ORDER BY return_count DESC LIMIT 1`,
+    [slug]
+  )
+  return row ? row.person_name : null
+}
+
+// parser.py groups lobbyist spellings by slug into the lobbyists table, so resolving a slug is one index seek.
+export async function resolveLobbyist(db, slug) {
+  return (await db.get(`SELECT id, name, slug FROM lobbyists WHERE slug = ?`, [slug])) || null
+}
+
+// Accept method as array for multi-select (OR logic)
+function methodCondition(method, params) {
+  let methodFilters = []
+  if (Array.isArray(method)) {
+    methodFilters = method
+  } else if (typeof method === "string" && method) {
+    methodFilters = [method]
+  }
+  if (methodFilters.length === 0) return null
+  if (typeof method === "string" && method.includes(",")) {
+    methodFilters = method.split(",").map((s) => s.trim())
+  }
+  methodFilters.forEach((m) => params.push("%" + m.toLowerCase() + "%"))
+  return (schema) =>
+    `\n        AND EXISTS (\n          SELECT 1 FROM ${schema}.lobbying_activity_entries lae\n          WHERE lae.lobbying_record_id = lr.id\n            AND ( ` +
+    methodFilters.map(() => `LOWER(lae.activity) LIKE ?`).join(" OR ") +
+    ` )\n        )\n      `
+}
+
+export function parseJobTitles(jobTitles) {
+  return typeof jobTitles === "string" && jobTitles ? jobTitles.split(",").map((t) => t.trim()) : null
+}
+
+// Returns point at their lobbyist by id, so the (lobbyist_id, date_published, id) index drives the newest-first scan
+// and every spelling of the lobbyist's name is included. `where(schema)` is the clause for one partition schema; the
+// parameters are the same for each.
+export function buildLobbyistReturnFilters({ lobbyistId, official, year, method }) {
+  const conditions = []
+  const filterParams = [lobbyistId]
+  if (official) {
+    conditions.push(
+      (schema) =>
+        ` AND EXISTS (SELECT 1 FROM ${schema}.dpo_entries dpo ` +
+        `WHERE dpo.lobbying_record_id = lr.id AND LOWER(dpo.person_name) = ?) `
+    )
+    filterParams.push(official.toLowerCase())
+  }
+  if (year) {
+    conditions.push(() => " AND substr(TRIM(lr.period), -4) = ? ")
+    filterParams.push(year)
+  }
+  const activityCondition = methodCondition(method, filterParams)
+  if (activityCondition) conditions.push(activityCondition)
+
+  return {
+    where: (schema) => `
+      WHERE lr.lobbyist_id = ?
+      ${conditions.map((condition) => condition(schema)).join("")}
+    `,
+    params: filterParams
+  }
+}
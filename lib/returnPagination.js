@@ -0,0 +1,176 @@
+import { once } from "events"
+import { REVALIDATE_CACHE_CONTROL } from "./httpCache"
+import { partitionBranches } from "./sqlite"
+
+// Sort keys for return listings, all descending. Every sort ends on (date_published, id) so the order is total, and a
+// cursor resumes right after the last row of the previous page with one row-value comparison, which SQLite answers as
+// a range on the lobbying_records index with the same columns. Returns without a date_published come after every
+// dated return (see keysetPhases).
+const DATE_KEY = { column: "date_published", value: (row) => row.date_published ?? null }
+const ID_KEY = { column: "id", value: (row) => row.id }
+
+export const RETURN_SORT_KEYS = {
+  newest: [DATE_KEY, ID_KEY],
+  // parser.py stores -official_count, and a key below every other for returns naming no official, so they come last.
+  "fewest-officials": [
+    { column: "fewest_officials_key", value: (row) => row.fewest_officials_key },
+    DATE_KEY,
+    ID_KEY
+  ],
+  "most-officials": [
+    { column: "official_count", value: (row) => Number(row.official_count) || 0 },
+    DATE_KEY,
+    ID_KEY
+  ]
+}
+
+function descending(keys, table = "lr") {
+  return keys.map((key) => `${table}.${key.column} DESC`).join(", ")
+}
+
+function rowsAfter(keys, values) {
+  return `(${keys.map((key) => `lr.${key.column}`).join(", ")}) < (${values.map(() => "?").join(", ")})`
+}
+
+// The listing in `sort` order as two index ranges: the dated returns, then the undated tail ordered on the remaining
+// keys. Given the cursor row's `afterValues`, each range starts after it, and the dated one is skipped once the cursor
+// is in the tail. The IS NOT NULL is needed even with a cursor: (a, NULL, c) < (x, y, z) is true whenever a < x.
+export function keysetPhases(sort, afterValues = null) {
+  const keys = RETURN_SORT_KEYS[sort]
+  const dateIndex = keys.indexOf(DATE_KEY)
+  const tailKeys = keys.filter((key) => key !== DATE_KEY)
+  const inTail = afterValues !== null && afterValues[dateIndex] === null
+  const phases = []
+  if (!inTail) {
+    phases.push({
+      sql: `lr.date_published IS NOT NULL${afterValues ? ` AND ${rowsAfter(keys, afterValues)}` : ""}`,
+      params: afterValues || [],
+      keys
+    })
+  }
+  const tailValues = inTail ? afterValues.filter((_, index) => index !== dateIndex) : null
+  phases.push({
+    sql: `lr.date_published IS NULL${tailValues ? ` AND ${rowsAfter(tailKeys, tailValues)}` : ""}`,
+    params: tailValues || [],
+    keys: tailKeys
+  })
+  return phases
+}
+
+// Reads the rows of a page of return ids, in the page's order. A bound id list reaches every partition schema as a
+// primary key seek.
+export async function fetchReturnsById(db, ids, columns = "lr.*") {
+  if (!ids.length) return []
+  const rows = await db.all(
+    `SELECT ${columns} FROM lobbying_records lr WHERE lr.id IN (${ids.map(() => "?").join(", ")})`,
+    ids
+  )
+  const position = new Map(ids.map((id, index) => [id, index]))
+  return rows.sort((a, b) => position.get(a.id) - position.get(b.id))
+}
+
+// How many returns match `filters`, counted per partition schema. `filters.where(schema)` is the WHERE clause for
+// one schema.
+export async function countReturns(db, filters) {
+  const counts = partitionBranches(
+    db,
+    (schema) => `SELECT COUNT(*) AS total FROM ${schema}.lobbying_records lr ${filters.where(schema)}`,
+    filters.params
+  )
+  const row = await db.get(`SELECT SUM(total) AS total FROM (${counts.sql})`, counts.params)
+  return row?.total || 0
+}
+
+// Selects one page of returns matching `filters` in `sort` order, reading the phases of keysetPhases in turn. Each
+// partition schema contributes its first ids of the phase from its own index (see partitionBranches in lib/sqlite.js)
+// and the merged order picks the page, so `columns` (by default the full rows, with the DPO and activity arrays
+// parser.py serializes onto each return) are read for the page only. With `afterValues` the page starts right after
+// the cursor row instead of skipping `offset` rows; an offset past the dated returns is carried into the tail by
+// counting them.
+export async function fetchReturnPage(db, filters, sort, { afterValues = null, limit, offset = 0, columns = "lr.*" }) {
+  const keyColumns = RETURN_SORT_KEYS[sort].map((key) => `lr.${key.column}`).join(", ")
+  const ids = []
+  let skip = offset
+  for (const phase of keysetPhases(sort, afterValues)) {
+    const wanted = limit - ids.length
+    const branches = partitionBranches(
+      db,
+      (schema) => `
+        SELECT * FROM (
+          SELECT ${keyColumns}
+          FROM ${schema}.lobbying_records lr
+          ${filters.where(schema)}
+          AND ${phase.sql}
+          ORDER BY ${descending(phase.keys)}
+          LIMIT ?
+        )`,
+      [...filters.params, ...phase.params, skip + wanted]
+    )
+    const phaseRows = await db.all(
+      `SELECT page.id FROM (${branches.sql}) page ORDER BY ${descending(phase.keys, "page")} LIMIT ? OFFSET ?`,
+      [...branches.params, wanted, skip]
+    )
+    ids.push(...phaseRows.map((row) => row.id))
+    if (ids.length >= limit) break
+    if (skip && phaseRows.length) {
+      skip = 0
+    } else if (skip) {
+      const counted = await countReturns(db, {
+        where: (schema) => `${filters.where(schema)} AND ${phase.sql}`,
+        params: [...filters.params, ...phase.params]
+      })
+      skip = Math.max(0, skip - counted)
+    }
+  }
+  return fetchReturnsById(db, ids, columns)
+}
+
+export function encodeCursor(sort, row) {
+  const values = RETURN_SORT_KEYS[sort].map((key) => key.value(row))
+  return Buffer.from(JSON.stringify({ sort, values })).toString("base64url")
+}
+
+export function decodeCursor(cursor, sort) {
+  if (typeof cursor !== "string" || !cursor) return null
+  try {
+    const parsed = JSON.parse(Buffer.from(cursor, "base64url").toString("utf-8"))
+    if (parsed?.sort !== sort || !Array.isArray(parsed.values)) return null
+    if (parsed.values.length !== RETURN_SORT_KEYS[sort].length) return null
+    return parsed.values
+  } catch {
+    return null
+  }
+}
+
+// Writes a chunk and waits for the socket to drain when its buffer is full. Resolves false once the client has gone
+// away so callers can stop producing rows.
+export async function writeChunk(res, chunk) {
+  if (res.destroyed) return false
+  if (res.write(chunk)) return true
+  await Promise.race([once(res, "drain"), once(res, "close")])
+  return !res.destroyed
+}
+
+// Streams `head` as a JSON object whose `records` array is filled batch by batch, waiting for the socket to drain
+// between writes so memory stays bounded by one batch. fetchBatch(afterValues) returns the next rows in sort order.
+export async function streamRecordsJson(res, head, { version, sort, batchSize = 500, fetchBatch, mapRow }) {
+  res.setHeader("Content-Type", "application/json; charset=utf-8")
+  res.setHeader("Cache-Control", REVALIDATE_CACHE_CONTROL)
+  if (version) res.setHeader("X-Dataset-Version", version)
+  res.status(200)
+
+  if (!(await writeChunk(res, `${JSON.stringify(head).slice(0, -1)},"records":[`))) return
+  let afterValues = null
+  let first = true
+  for (;;) {
+    const rows = await fetchBatch(afterValues, batchSize)
+    if (rows.length) {
+      const chunk = rows.map((row) => JSON.stringify(mapRow(row))).join(",")
+      if (!(await writeChunk(res, first ? chunk : `,${chunk}`))) return
+      first = false
+      afterValues = RETURN_SORT_KEYS[sort].map((key) => key.value(rows[rows.length - 1]))
+    }
+    if (rows.length < batchSize) break
+  }
+  res.end("]}")
+}
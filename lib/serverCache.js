@@ -1,20 +1,68 @@
-const CACHE_MAX_ENTRIES = 200
+const CACHE_MAX_ENTRIES = Number(process.env.API_CACHE_MAX_ENTRIES) || 200
+const CACHE_MAX_BYTES = Number(process.env.API_CACHE_MAX_BYTES) || 64 * 1024 * 1024
+// Keys carry the dataset version, so entries only need a TTL for data that does not come from lobbying.db.
+export const DATASET_CACHE_TTL_MS = Number.POSITIVE_INFINITY
 
-const globalCache = globalThis.__lobbyiengApiCache || new Map()
-if (!globalThis.__lobbyiengApiCache) {
-  globalThis.__lobbyiengApiCache = globalCache
+// Map iteration follows insertion order, so re-inserting an entry on every read keeps the least recently used
+// entry first and lets both lookups and evictions run in O(1).
+function createCacheState() {
+  return {
+    entries: new Map(),
+    pending: new Map(),
+    bytes: 0,
+    stats: {
+      hits: 0,
+      misses: 0,
+      evictions: 0,
+      expirations: 0,
+      rejections: 0
+    }
+  }
+}
+
+const cacheState = globalThis.__lobbyiengApiCacheState || createCacheState()
+if (!globalThis.__lobbyiengApiCacheState) {
+  globalThis.__lobbyiengApiCacheState = cacheState
+}
+
+function estimateSize(value) {
+  try {
+    return Buffer.byteLength(JSON.stringify(value) ?? "", "utf8")
+  } catch {
+    return 0
+  }
+}
+
+function removeEntry(key) {
+  const existing = cacheState.entries.get(key)
+  if (!existing) return
+  cacheState.entries.delete(key)
+  cacheState.bytes -= existing.size
+}
+
+function evictIfNeeded() {
+  while (cacheState.entries.size > CACHE_MAX_ENTRIES || cacheState.bytes > CACHE_MAX_BYTES) {
+    const oldestKey = cacheState.entries.keys().next().value
+    if (oldestKey === undefined) return
+    removeEntry(oldestKey)
+    cacheState.stats.evictions += 1
+  }
 }
 
-function pruneCacheIfNeeded() {
-  if (globalCache.size <= CACHE_MAX_ENTRIES) return
-  const entries = Array.from(globalCache.entries()).sort((a, b) => a[1].createdAt - b[1].createdAt)
-  const toDelete = entries.slice(0, globalCache.size - CACHE_MAX_ENTRIES)
-  for (const [key] of toDelete) {
-    globalCache.delete(key)
+function lookup(key) {
+  const existing = cacheState.entries.get(key)
+  if (!existing) return undefined
+  if (existing.expiresAt <= Date.now()) {
+    removeEntry(key)
+    cacheState.stats.expirations += 1
+    return undefined
   }
+  cacheState.entries.delete(key)
+  cacheState.entries.set(key, existing)
+  return existing
 }
 
-export function buildCacheKey(prefix, params = {}) {
+export function buildCacheKey(prefix, params = {}, version = "") {
   const serialized = Object.entries(params)
     .map(([k, v]) => {
       if (Array.isArray(v)) return [k, v.join(",")]
@@ -24,59 +72,70 @@ export function buildCacheKey(prefix, params = {}) {
     .map(([k, v]) => `${k}=${v}`)
     .join("&")
 
-  return `${prefix}:${serialized}`
+  return version ? `${prefix}@${version}:${serialized}` : `${prefix}:${serialized}`
 }
 
 export async function getOrSetCache(key, ttlMs, producer) {
-  const now = Date.now()
-  const existing = globalCache.get(key)
-
-  if (existing && existing.value !== undefined && existing.expiresAt > now) {
+  const existing = lookup(key)
+  if (existing) {
+    cacheState.stats.hits += 1
     return { value: existing.value, hit: true }
   }
 
-  if (existing?.pendingPromise) {
-    const value = await existing.pendingPromise
+  const inFlight = cacheState.pending.get(key)
+  if (inFlight) {
+    cacheState.stats.hits += 1
+    const value = await inFlight
     return { value, hit: true }
   }
 
+  cacheState.stats.misses += 1
   const pendingPromise = Promise.resolve().then(producer)
-  globalCache.set(key, {
-    createdAt: now,
-    expiresAt: now + ttlMs,
-    pendingPromise
-  })
-  pruneCacheIfNeeded()
+  cacheState.pending.set(key, pendingPromise)
 
   try {
     const value = await pendingPromise
-    globalCache.set(key, {
-      createdAt: now,
-      expiresAt: Date.now() + ttlMs,
-      value
-    })
-    pruneCacheIfNeeded()
+    writeCache(key, value, ttlMs)
     return { value, hit: false }
-  } catch (error) {
-    globalCache.delete(key)
-    throw error
+  } finally {
+    cacheState.pending.delete(key)
   }
 }
 
 export function readCache(key) {
-  const now = Date.now()
-  const existing = globalCache.get(key)
-  if (!existing) return undefined
-  if (existing.value !== undefined && existing.expiresAt > now) return existing.value
-  if (existing.expiresAt <= now) globalCache.delete(key)
+  const existing = lookup(key)
+  if (existing) {
+    cacheState.stats.hits += 1
+    return existing.value
+  }
+  cacheState.stats.misses += 1
   return undefined
 }
 
 export function writeCache(key, value, ttlMs) {
-  globalCache.set(key, {
+  const size = estimateSize(value)
+  removeEntry(key)
+  if (size > CACHE_MAX_BYTES) {
+    cacheState.stats.rejections += 1
+    return
+  }
+  cacheState.entries.set(key, {
     createdAt: Date.now(),
     expiresAt: Date.now() + ttlMs,
+    size,
     value
   })
-  pruneCacheIfNeeded()
+  cacheState.bytes += size
+  evictIfNeeded()
+}
+
+export function getCacheStats() {
+  return {
+    entries: cacheState.entries.size,
+    pending: cacheState.pending.size,
+    bytes: cacheState.bytes,
+    max_entries: CACHE_MAX_ENTRIES,
+    max_bytes: CACHE_MAX_BYTES,
+    ...cacheState.stats
+  }
 }
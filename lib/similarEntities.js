@@ -0,0 +1,14 @@
+// parser.py stores the nearest officials (by the lobbyists that named them) and lobbyists (by the officials they
+// named) per entity and year in similar_entities; "all" covers every year.
+export async function loadSimilarEntities(db, entityType, entityKey, year) {
+  const scope = typeof year === "string" && /^\d{4}$/.test(year) ? year : "all"
+  return db.all(
+    `
+    SELECT similar_name AS name, similar_slug AS slug, jaccard, counterpart_count
+    FROM similar_entities
+    WHERE entity_type = ? AND entity_key = ? AND year = ?
+    ORDER BY rank
+    `,
+    [entityType, entityKey, scope]
+  )
+}
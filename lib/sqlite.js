@@ -1,27 +1,216 @@
+import fs from "fs"
+import path from "path"
 import sqlite3 from "sqlite3"
 import { open } from "sqlite"
+import { instrumentDb } from "./queryMetrics"
 
-let dbPromise
+export const DB_PATH = process.env.LOBBYING_DB_PATH || "./lobbying.db"
+const POOL_SIZE = Math.max(1, Number(process.env.SQLITE_POOL_SIZE) || 4)
+const ACQUIRE_TIMEOUT_MS = Math.max(1, Number(process.env.SQLITE_ACQUIRE_TIMEOUT_MS) || 5000)
+// When set, every statement the API runs is appended to this file as a JSON line for
+// scripts/check_query_plans.py. Bound parameters are already expanded into the SQL by SQLite's trace hook.
+const TRACE_FILE = process.env.SQLITE_TRACE_FILE
+let traceStream = null
+
+// Each connection has its own queue in node-sqlite3, so a pool of read-only connections lets WAL readers run
+// concurrently instead of queueing every request behind the slowest query.
+const pool = {
+  idle: [],
+  waiters: [],
+  opened: 0,
+  timeouts: 0,
+  generation: 0
+}
+// The pool generation each connection was opened in; see recyclePool.
+const connectionGenerations = new WeakMap()
+
+// Thrown by acquireDb when no pooled connection frees up within SQLITE_ACQUIRE_TIMEOUT_MS, so requests fail fast with
+// a 503 (see errorStatus) instead of queueing without bound behind slow ones.
+export class DbBusyError extends Error {
+  constructor(route) {
+    super(`No database connection free after ${ACQUIRE_TIMEOUT_MS}ms for ${route}`)
+    this.name = "DbBusyError"
+  }
+}
+
+// Status for a route's catch block: 503 with a Retry-After when the pool was exhausted, otherwise 500.
+export function errorStatus(res, err) {
+  if (!(err instanceof DbBusyError)) return 500
+  res.setHeader("Retry-After", "1")
+  return 503
+}
+
+// Tables that `parser.py --partition-years` splits into per-year databases (see PARTITIONED_TABLES there).
+const PARTITIONED_TABLES = ["lobbying_records", "dpo_entries", "lobbying_activity_entries"]
+
+// The schemas holding the partitioned tables on each pooled connection: main, then every attached year.
+const partitionSchemas = new WeakMap()
+
+// Attaches the closed-year databases registered in year_partitions (read-only, like the main connection) and shadows
+// the partitioned tables with TEMP views over all of them, so queries run unchanged. A year filter reaches every
+// partition as a seek on idx_lr_year and returns nothing from the other years without scanning them. Joins between
+// two of the views are another matter, see partitionBranches.
+async function attachYearPartitions(db) {
+  let partitions = []
+  try {
+    partitions = await db.all(`SELECT year, path FROM year_partitions ORDER BY year`)
+  } catch (err) {
+    if (!String(err?.message || "").includes("no such table")) {
+      throw err
+    }
+  }
+  if (!partitions.length) return
+  const schemas = ["main"]
+  for (const partition of partitions) {
+    const schema = `partition_${partition.year}`
+    await db.run(`ATTACH DATABASE ? AS ${schema}`, [path.resolve(path.dirname(DB_PATH), partition.path)])
+    schemas.push(schema)
+  }
+  partitionSchemas.set(db, schemas)
+  for (const table of PARTITIONED_TABLES) {
+    const branches = schemas.map((schema) => `SELECT * FROM ${schema}.${table}`)
+    await db.exec(`CREATE TEMP VIEW ${table} AS ${branches.join(" UNION ALL ")}`)
+  }
+}
 
 async function applyPragmas(db) {
-  await db.exec("PRAGMA journal_mode=WAL")
+  // journal_mode=WAL is persisted in the file by parser.py; read-only connections cannot change it.
   await db.exec("PRAGMA synchronous=NORMAL")
   await db.exec("PRAGMA temp_store=MEMORY")
   await db.exec("PRAGMA cache_size=-20000")
   await db.exec("PRAGMA mmap_size=268435456")
+  // After temp_store, which discards the temp schema, and before query_only, which forbids creating views in it.
+  await attachYearPartitions(db)
+  await db.exec("PRAGMA query_only=ON")
+}
+
+function traceStatement(sql) {
+  if (sql.startsWith("--") || /^\s*PRAGMA\b/i.test(sql)) return
+  traceStream ??= fs.createWriteStream(TRACE_FILE, { flags: "a" })
+  traceStream.write(`${JSON.stringify({ sql })}\n`)
+}
+
+async function openReadOnlyConnection() {
+  const generation = pool.generation
+  const db = await open({
+    filename: DB_PATH,
+    driver: sqlite3.Database,
+    mode: sqlite3.OPEN_READONLY
+  })
+  await applyPragmas(db)
+  if (TRACE_FILE) db.on("trace", traceStatement)
+  connectionGenerations.set(db, generation)
+  return db
 }
 
-export async function getDb() {
-  if (!dbPromise) {
-    dbPromise = open({
-      filename: "./lobbying.db",
-      driver: sqlite3.Database
-    }).then(async (db) => {
-      await applyPragmas(db)
-      return db
+function handOver(db) {
+  const waiter = pool.waiters.shift()
+  if (waiter) {
+    waiter(db)
+  } else {
+    pool.idle.push(db)
+  }
+}
+
+// Connections attach the year partitions and create their views once, when they open, so after a rebuild that adds
+// or drops partitions they would keep stale views and hold deleted partition files open. lib/datasetVersion.js calls
+// this when the stamped version changes: idle connections are closed now and checked-out ones when released, and the
+// next checkouts open fresh connections against the current layout.
+export function recyclePool() {
+  pool.generation += 1
+  const idle = pool.idle.splice(0)
+  pool.opened -= idle.length
+  for (const db of idle) db.close().catch(() => {})
+}
+
+async function checkoutConnection(route) {
+  const idle = pool.idle.pop()
+  if (idle) return idle
+
+  if (pool.opened < POOL_SIZE) {
+    pool.opened += 1
+    try {
+      return await openReadOnlyConnection()
+    } catch (err) {
+      pool.opened -= 1
+      throw err
+    }
+  }
+
+  return new Promise((resolve, reject) => {
+    const waiter = (db) => {
+      clearTimeout(timer)
+      resolve(db)
+    }
+    const timer = setTimeout(() => {
+      pool.waiters.splice(pool.waiters.indexOf(waiter), 1)
+      pool.timeouts += 1
+      reject(new DbBusyError(route))
+    }, ACQUIRE_TIMEOUT_MS)
+    pool.waiters.push(waiter)
+  })
+}
+
+// Handlers get an instrumented view of the pooled connection, labelled with their route for lib/queryMetrics.js;
+// releaseDb maps it back to the underlying connection.
+const connections = new WeakMap()
+
+export async function acquireDb(route = "unattributed") {
+  const connection = await checkoutConnection(route)
+  const db = instrumentDb(connection, route)
+  connections.set(db, connection)
+  return db
+}
+
+export function releaseDb(instrumented) {
+  if (!instrumented) return
+  const db = connections.get(instrumented)
+  if (!db) return
+  connections.delete(instrumented)
+  if (connectionGenerations.get(db) === pool.generation) {
+    handOver(db)
+    return
+  }
+  pool.opened -= 1
+  db.close().catch(() => {})
+  // A waiter would otherwise wait for a release that may not come; if the open fails it times out with a 503.
+  if (pool.waiters.length) {
+    pool.opened += 1
+    openReadOnlyConnection().then(handOver, () => {
+      pool.opened -= 1
     })
   }
+}
 
-  return dbPromise
+// SQLite cannot push a join between two of the partition views, or an ORDER BY ... LIMIT over one, into the UNION ALL
+// branches: it materializes the views instead, which turns an index seek into a scan of every year. Such queries run
+// once per schema, where each join stays inside one database and uses its indexes; a return's DPO and activity rows
+// are always stored with it. build(schema) returns the statement for one schema, naming its tables
+// `${schema}.lobbying_records` and so on, and the branches are combined with UNION ALL for the caller to aggregate.
+// `params` are repeated for every branch. Without partitions there is a single `main` branch.
+export function partitionBranches(db, build, params = []) {
+  const schemas = partitionSchemas.get(connections.get(db)) || ["main"]
+  return {
+    sql: schemas.map((schema) => build(schema)).join("\n      UNION ALL\n"),
+    params: schemas.flatMap(() => params)
+  }
 }
 
+export async function withDb(callback, route) {
+  const db = await acquireDb(route)
+  try {
+    return await callback(db)
+  } finally {
+    releaseDb(db)
+  }
+}
+
+export function getPoolStats() {
+  return {
+    size: POOL_SIZE,
+    opened: pool.opened,
+    idle: pool.idle.length,
+    waiting: pool.waiters.length,
+    timeouts: pool.timeouts
+  }
+}
@@ -1,4 +1,7 @@
-import { getDb } from "../../lib/sqlite"
+import { acquireDb, errorStatus, partitionBranches, releaseDb } from "../../lib/sqlite"
+import { getDatasetVersion } from "../../lib/datasetVersion"
+import { sendJson } from "../../lib/httpCache"
+import { buildCacheKey, DATASET_CACHE_TTL_MS, getOrSetCache } from "../../lib/serverCache"
 
 export default async function handler(req, res) {
   const { official, officials, lobbyist, start_year, end_year } = req.query
@@ -34,50 +37,62 @@ export default async function handler(req, res) {
     dateParams.push(end_year)
   }
 
-  let sql, params
+  // Counted per partition schema (see partitionBranches) and summed; each return is in exactly one schema.
+  let branch, branchParams
   if (officialsList.length > 0) {
     // All lobbyists and their connections to these officials
     const placeholders = officialsList.map(() => "?").join(",")
-    sql = `
+    branch = (schema) => `
         SELECT lr.lobbyist_name, de.person_name, COUNT(*) as connection_count
-        FROM lobbying_records lr
-        JOIN dpo_entries de ON lr.id = de.lobbying_record_id
+        FROM ${schema}.lobbying_records lr
+        JOIN ${schema}.dpo_entries de ON lr.id = de.lobbying_record_id
         WHERE lr.lobbyist_name IS NOT NULL AND de.person_name IN (${placeholders})
         ${dateFilter}
         GROUP BY lr.lobbyist_name, de.person_name
         `
-    params = [...officialsList, ...dateParams]
+    branchParams = [...officialsList, ...dateParams]
   } else {
     // All officials and their connections to this lobbyist
-    sql = `
+    branch = (schema) => `
         SELECT lr.lobbyist_name, de.person_name, COUNT(*) as connection_count
-        FROM lobbying_records lr
-        JOIN dpo_entries de ON lr.id = de.lobbying_record_id
+        FROM ${schema}.lobbying_records lr
+        JOIN ${schema}.dpo_entries de ON lr.id = de.lobbying_record_id
         WHERE lr.lobbyist_name = ? AND de.person_name IS NOT NULL
         ${dateFilter}
         GROUP BY lr.lobbyist_name, de.person_name
         `
-    params = [lobbyist, ...dateParams]
+    branchParams = [lobbyist, ...dateParams]
   }
 
+  let db
   try {
-    const db = await getDb()
-    const rows = await db.all(sql, params)
-    let records
-    if (officialsList.length > 0) {
-      // Group by lobbyist, but include all officials in dpo_entries
-      const grouped = {}
-      rows.forEach(({ lobbyist_name, person_name, connection_count }) => {
-        if (!grouped[lobbyist_name]) grouped[lobbyist_name] = []
-        grouped[lobbyist_name].push({ person_name, connection_count })
-      })
-      records = Object.entries(grouped).map(([lobbyist_name, dpo_entries]) => ({
-        lobbyist_name,
-        dpo_entries
-      }))
-    } else {
+    const version = await getDatasetVersion()
+    const cacheKey = buildCacheKey("chord-data", { officials: officialsList, lobbyist, start_year, end_year }, version)
+    const { value: records, hit } = await getOrSetCache(cacheKey, DATASET_CACHE_TTL_MS, async () => {
+      db = await acquireDb("/api/chord-data")
+      const branches = partitionBranches(db, branch, branchParams)
+      const rows = await db.all(
+        `
+        SELECT lobbyist_name, person_name, SUM(connection_count) AS connection_count
+        FROM (${branches.sql})
+        GROUP BY lobbyist_name, person_name
+        `,
+        branches.params
+      )
+      if (officialsList.length > 0) {
+        // Group by lobbyist, but include all officials in dpo_entries
+        const grouped = {}
+        rows.forEach(({ lobbyist_name, person_name, connection_count }) => {
+          if (!grouped[lobbyist_name]) grouped[lobbyist_name] = []
+          grouped[lobbyist_name].push({ person_name, connection_count })
+        })
+        return Object.entries(grouped).map(([lobbyist_name, dpo_entries]) => ({
+          lobbyist_name,
+          dpo_entries
+        }))
+      }
       // Group by official
-      records = [
+      return [
         {
           lobbyist_name: lobbyist,
           dpo_entries: rows.map(({ person_name, connection_count }) => ({
@@ -86,9 +101,12 @@ export default async function handler(req, res) {
           }))
         }
       ]
-    }
-    res.status(200).json(records || [])
-  } catch {
-    res.status(500).json({ error: "Database query failed" })
+    })
+    res.setHeader("X-Data-Cache", hit ? "HIT" : "MISS")
+    sendJson(req, res, records || [], { version })
+  } catch (err) {
+    res.status(errorStatus(res, err)).json({ error: "Database query failed" })
+  } finally {
+    releaseDb(db)
   }
 }
@@ -1,10 +1,13 @@
-import { getDb } from "../../../lib/sqlite"
+import { acquireDb, errorStatus, releaseDb } from "../../../lib/sqlite"
 import { officialSlugify, slugify } from "../../../lib/slugify"
+import { getDatasetVersion } from "../../../lib/datasetVersion"
+import { sendJson } from "../../../lib/httpCache"
 
 export default async function handler(req, res) {
+  let db
   try {
     const { slug } = req.query
-    const db = await getDb()
+    db = await acquireDb("/api/committees/[slug]")
 
     let committees = []
     try {
@@ -25,6 +28,7 @@ export default async function handler(req, res) {
       return res.status(404).json({ error: "Committee not found" })
     }
 
+    // official_links resolves committee member slugs to DPO names at ingest, with each official's return count.
     const membersRaw = await db.all(
       `
       SELECT DISTINCT
@@ -33,8 +37,10 @@ export default async function handler(req, res) {
         cm.member_uri,
         cm.member_url,
         cm.role,
-        cm.constituency
+        cm.constituency,
+        COALESCE(ol.return_count, 0) AS lobbying_return_count
       FROM committee_memberships cm
+      LEFT JOIN official_links ol ON ol.member_slug = cm.member_slug
       WHERE cm.committee_id = ?
       ORDER BY
         CASE WHEN cm.role IS NULL OR TRIM(cm.role) = '' THEN 1 ELSE 0 END,
@@ -43,40 +49,30 @@ export default async function handler(req, res) {
       `,
       [committee.id]
     )
-    const officialCounts = await db.all(`
-      SELECT dpo.person_name, COUNT(DISTINCT dpo.lobbying_record_id) AS lobbying_return_count
-      FROM dpo_entries dpo
-      WHERE dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-      GROUP BY dpo.person_name
-    `)
-    const countBySlug = new Map()
-    officialCounts.forEach((row) => {
-      const count = Number(row.lobbying_return_count) || 0
-      countBySlug.set(slugify(row.person_name), count)
-      countBySlug.set(officialSlugify(row.person_name), count)
-    })
-    const members = membersRaw.map((member) => {
-      const profileSlug = member.member_slug || officialSlugify(member.member_name)
-      const lobbyingReturnCount = countBySlug.get(profileSlug) || countBySlug.get(slugify(member.member_name)) || 0
-      return {
-        ...member,
-        member_slug: profileSlug,
-        has_lobbying_profile: lobbyingReturnCount > 0,
-        lobbying_return_count: lobbyingReturnCount
-      }
-    })
+    const members = membersRaw.map(({ lobbying_return_count: lobbyingReturnCount, ...member }) => ({
+      ...member,
+      member_slug: member.member_slug || officialSlugify(member.member_name),
+      has_lobbying_profile: lobbyingReturnCount > 0,
+      lobbying_return_count: lobbyingReturnCount
+    }))
 
-    res.setHeader("Cache-Control", "public, max-age=3600, stale-while-revalidate=60")
-    res.status(200).json({
-      ...committee,
-      slug: slugify(committee.name),
-      members
-    })
+    sendJson(
+      req,
+      res,
+      {
+        ...committee,
+        slug: slugify(committee.name),
+        members
+      },
+      { version: await getDatasetVersion(db) }
+    )
   } catch (err) {
     console.error("Error in committee detail API:", err)
-    res.status(500).json({
+    res.status(errorStatus(res, err)).json({
       error: "Internal server error",
       details: err.message
     })
+  } finally {
+    releaseDb(db)
   }
 }
@@ -1,9 +1,12 @@
-import { getDb } from "../../../lib/sqlite"
+import { acquireDb, errorStatus, releaseDb } from "../../../lib/sqlite"
 import { slugify } from "../../../lib/slugify"
+import { getDatasetVersion } from "../../../lib/datasetVersion"
+import { sendJson } from "../../../lib/httpCache"
 
 export default async function handler(req, res) {
+  let db
   try {
-    const db = await getDb()
+    db = await acquireDb("/api/committees")
     let rows = []
     try {
       rows = await db.all(`
@@ -37,8 +40,9 @@ export default async function handler(req, res) {
       if (!String(err?.message || "").includes("no such table")) throw err
     }
 
-    res.setHeader("Cache-Control", "public, max-age=3600, stale-while-revalidate=60")
-    res.status(200).json(
+    sendJson(
+      req,
+      res,
       rows.map((row) => {
         const dailMemberCount = Number(row.dail_member_count) || 0
         const seanadMemberCount = Number(row.seanad_member_count) || 0
@@ -61,13 +65,16 @@ export default async function handler(req, res) {
           chamber_type: chamberType,
           slug: slugify(row.name)
         }
-      })
+      }),
+      { version: await getDatasetVersion(db) }
     )
   } catch (err) {
     console.error("Error in committees API:", err)
-    res.status(500).json({
+    res.status(errorStatus(res, err)).json({
       error: "Internal server error",
       details: err.message
     })
+  } finally {
+    releaseDb(db)
   }
 }
@@ -1,11 +1,15 @@
 import { loadCurrentOireachtasRosterByChamber } from "../../lib/oireachtasRoster"
+import { sendJson } from "../../lib/httpCache"
+import { sendDerivedArtifact } from "../../lib/derivedArtifacts"
 
 export default async function handler(req, res) {
   try {
     const chamber = req.query.chamber === "seanad" ? "seanad" : req.query.chamber === "dail" ? "dail" : "all"
+    const artifactName = chamber === "all" ? "current_oireachtas_members" : `current_oireachtas_members.${chamber}`
+    if (await sendDerivedArtifact(req, res, artifactName)) return
+
     const roster = await loadCurrentOireachtasRosterByChamber(chamber)
-    res.setHeader("Cache-Control", "public, max-age=3600, stale-while-revalidate=60")
-    res.status(200).json(roster)
+    sendJson(req, res, roster)
   } catch (err) {
     res.status(500).json({
       error: "Failed to load current Oireachtas members",
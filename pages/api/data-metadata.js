@@ -1,12 +1,14 @@
 import { getDataMetadata } from "../../lib/dataMetadata"
+import { getDatasetVersion } from "../../lib/datasetVersion"
+import { sendJson } from "../../lib/httpCache"
+import { errorStatus } from "../../lib/sqlite"
 
 export default async function handler(req, res) {
   try {
     const metadata = await getDataMetadata()
-    res.setHeader("Cache-Control", "public, max-age=3600, stale-while-revalidate=60")
-    res.status(200).json(metadata)
+    sendJson(req, res, metadata, { version: await getDatasetVersion() })
   } catch (err) {
-    res.status(500).json({
+    res.status(errorStatus(res, err)).json({
       error: "Failed to load data metadata",
       details: err.message
     })
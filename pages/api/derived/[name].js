@@ -0,0 +1,18 @@
+import { sendDerivedArtifact } from "../../../lib/derivedArtifacts"
+
+// Serves a derived JSON artifact by its stable name (see data/derived/artifacts/manifest.json).
+export default async function handler(req, res) {
+  try {
+    const name = String(req.query.name || "").replace(/\.json$/, "")
+    if (!(await sendDerivedArtifact(req, res, name))) {
+      res.status(404).json({ error: "Artifact not found or out of date" })
+    }
+  } catch (err) {
+    console.error("Error in derived artifact API:", err)
+    if (res.headersSent) {
+      res.end()
+      return
+    }
+    res.status(500).json({ error: "Internal error", details: err.message })
+  }
+}
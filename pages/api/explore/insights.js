@@ -1,5 +1,7 @@
-import { getDb } from "../../../lib/sqlite"
-import { buildCacheKey, readCache, writeCache } from "../../../lib/serverCache"
+import { acquireDb, errorStatus, partitionBranches, releaseDb } from "../../../lib/sqlite"
+import { buildCacheKey, DATASET_CACHE_TTL_MS, readCache, writeCache } from "../../../lib/serverCache"
+import { getDatasetVersion } from "../../../lib/datasetVersion"
+import { sendJson } from "../../../lib/httpCache"
 
 const STOPWORDS = new Set([
   "the",
@@ -106,32 +108,77 @@ function biggestMovers(currentRows, previousRows, key) {
     .slice(0, 20)
 }
 
+// The officials named on each return, optionally in one year. Joins between returns and their DPO entries run once per
+// partition schema (see partitionBranches) and the callers aggregate the combined rows; a return's entries are always
+// stored in its schema, so COUNT(DISTINCT ...) over them is exact.
+function officialReturns(db, year) {
+  return partitionBranches(
+    db,
+    (schema) => `
+      SELECT dpo.person_name, lr.id
+      FROM ${schema}.dpo_entries dpo
+      JOIN ${schema}.lobbying_records lr ON lr.id = dpo.lobbying_record_id
+      WHERE ${year ? "substr(TRIM(lr.period), -4) = ? AND" : ""}
+        dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
+    `,
+    year ? [year] : []
+  )
+}
+
+const CENTRALITY_MEASURES = new Set(["degree", "pagerank", "betweenness"])
+
+// Top 20 officials or lobbyists by one network measure. influence is the node's share of PageRank and brokerage its
+// estimated share of shortest paths, both as percentages.
+async function centralityRanking(db, year, entityType, measure) {
+  if (!CENTRALITY_MEASURES.has(measure)) throw new Error(`Unknown centrality measure: ${measure}`)
+  const rows = await db.all(
+    `
+    SELECT name, slug, degree, weighted_degree, pagerank, betweenness
+    FROM graph_centrality
+    WHERE year = ? AND entity_type = ?
+    ORDER BY ${measure} DESC, name ASC
+    LIMIT 20
+    `,
+    [year, entityType]
+  )
+  return rows.map(({ pagerank, betweenness, ...row }) => ({
+    ...row,
+    influence: Math.round(pagerank * 10000) / 100,
+    brokerage: Math.round(betweenness * 10000) / 100
+  }))
+}
+
 export default async function handler(req, res) {
+  let db
   try {
     const searchTerm = String(req.query.q || "").trim()
     const requestedYear = typeof req.query.year === "string" ? req.query.year.trim() : ""
     const requestedMode = requestedYear === "all" ? "all" : /^\d{4}$/.test(requestedYear) ? requestedYear : ""
-    const cacheKey = buildCacheKey("explore-insights", { q: searchTerm, year: requestedMode })
+    const version = await getDatasetVersion()
+    const cacheKey = buildCacheKey("explore-insights", { q: searchTerm, year: requestedMode }, version)
     const cached = readCache(cacheKey)
     if (cached) {
       res.setHeader("X-Data-Cache", "HIT")
-      res.setHeader("Cache-Control", "public, max-age=3600, stale-while-revalidate=120")
-      res.status(200).json(cached)
+      sendJson(req, res, cached, { version })
       return
     }
 
-    const db = await getDb()
+    db = await acquireDb("/api/explore/insights")
 
-    const years = await db.all(
-      `
+    const yearBranches = partitionBranches(
+      db,
+      (schema) => `
       SELECT DISTINCT substr(TRIM(period), -4) AS year
-      FROM lobbying_records
+      FROM ${schema}.lobbying_records
       WHERE period IS NOT NULL
         AND TRIM(period) != ''
         AND substr(TRIM(period), -4) GLOB '[0-9][0-9][0-9][0-9]'
-      ORDER BY year DESC
       `
     )
+    const years = await db.all(
+      `SELECT DISTINCT year FROM (${yearBranches.sql}) ORDER BY year DESC`,
+      yearBranches.params
+    )
     const latestYear = years?.[0]?.year || null
     const isAllTime = requestedMode === "all"
     const selectedYear = !isAllTime && requestedMode && years.some((row) => row.year === requestedMode) ? requestedMode : latestYear
@@ -139,84 +186,54 @@ export default async function handler(req, res) {
     const previousYear = !isAllTime && selectedIndex >= 0 ? years?.[selectedIndex + 1]?.year || null : null
     const yearFilter = isAllTime ? "" : selectedYear
 
-    const topTargetsSelected = yearFilter
-      ? await db.all(
-          `
-          SELECT dpo.person_name AS name, COUNT(DISTINCT lr.id) AS contact_count
-          FROM dpo_entries dpo
-          JOIN lobbying_records lr ON lr.id = dpo.lobbying_record_id
-          WHERE substr(TRIM(lr.period), -4) = ? AND dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-          GROUP BY dpo.person_name
-          ORDER BY contact_count DESC, dpo.person_name ASC
-          LIMIT 20
-          `,
-          [yearFilter]
-        )
-      : await db.all(
-          `
-          SELECT dpo.person_name AS name, COUNT(DISTINCT lr.id) AS contact_count
-          FROM dpo_entries dpo
-          JOIN lobbying_records lr ON lr.id = dpo.lobbying_record_id
-          WHERE dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-          GROUP BY dpo.person_name
-          ORDER BY contact_count DESC, dpo.person_name ASC
-          LIMIT 20
-          `
-        )
-    const topLobbyistsSelected = yearFilter
-      ? await db.all(
-          `
-          SELECT
-            lr.lobbyist_name AS name,
-            COUNT(DISTINCT lr.id) AS return_count,
-            COUNT(DISTINCT dpo.person_name) AS unique_targets
-          FROM lobbying_records lr
-          LEFT JOIN dpo_entries dpo ON dpo.lobbying_record_id = lr.id
-          WHERE substr(TRIM(lr.period), -4) = ? AND lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-          GROUP BY lr.lobbyist_name
-          ORDER BY return_count DESC, unique_targets DESC, lr.lobbyist_name ASC
-          LIMIT 20
-          `,
-          [yearFilter]
-        )
-      : await db.all(
-          `
-          SELECT
-            lr.lobbyist_name AS name,
-            COUNT(DISTINCT lr.id) AS return_count,
-            COUNT(DISTINCT dpo.person_name) AS unique_targets
-          FROM lobbying_records lr
-          LEFT JOIN dpo_entries dpo ON dpo.lobbying_record_id = lr.id
-          WHERE lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-          GROUP BY lr.lobbyist_name
-          ORDER BY return_count DESC, unique_targets DESC, lr.lobbyist_name ASC
-          LIMIT 20
-          `
-        )
-    const currentOfficialCounts = yearFilter
-      ? await db.all(
-          `
-          SELECT dpo.person_name AS name, COUNT(DISTINCT lr.id) AS contact_count
-          FROM dpo_entries dpo
-          JOIN lobbying_records lr ON lr.id = dpo.lobbying_record_id
-          WHERE substr(TRIM(lr.period), -4) = ? AND dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-          GROUP BY dpo.person_name
-          `,
-          [yearFilter]
-        )
-      : []
-    const previousOfficialCounts = previousYear
-      ? await db.all(
-          `
-          SELECT dpo.person_name AS name, COUNT(DISTINCT lr.id) AS contact_count
-          FROM dpo_entries dpo
-          JOIN lobbying_records lr ON lr.id = dpo.lobbying_record_id
-          WHERE substr(TRIM(lr.period), -4) = ? AND dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-          GROUP BY dpo.person_name
-          `,
-          [previousYear]
-        )
-      : []
+    const targets = officialReturns(db, yearFilter)
+    const topTargetsSelected = await db.all(
+      `
+      SELECT person_name AS name, COUNT(DISTINCT id) AS contact_count
+      FROM (${targets.sql})
+      GROUP BY person_name
+      ORDER BY contact_count DESC, person_name ASC
+      LIMIT 20
+      `,
+      targets.params
+    )
+    const lobbyistTargets = partitionBranches(
+      db,
+      (schema) => `
+        SELECT lr.lobbyist_name, lr.id, dpo.person_name
+        FROM ${schema}.lobbying_records lr
+        LEFT JOIN ${schema}.dpo_entries dpo ON dpo.lobbying_record_id = lr.id
+        WHERE ${yearFilter ? "substr(TRIM(lr.period), -4) = ? AND" : ""}
+          lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
+      `,
+      yearFilter ? [yearFilter] : []
+    )
+    const topLobbyistsSelected = await db.all(
+      `
+      SELECT
+        lobbyist_name AS name,
+        COUNT(DISTINCT id) AS return_count,
+        COUNT(DISTINCT person_name) AS unique_targets
+      FROM (${lobbyistTargets.sql})
+      GROUP BY lobbyist_name
+      ORDER BY return_count DESC, unique_targets DESC, lobbyist_name ASC
+      LIMIT 20
+      `,
+      lobbyistTargets.params
+    )
+    const officialCounts = async (year) => {
+      const returns = officialReturns(db, year)
+      return db.all(
+        `
+        SELECT person_name AS name, COUNT(DISTINCT id) AS contact_count
+        FROM (${returns.sql})
+        GROUP BY person_name
+        `,
+        returns.params
+      )
+    }
+    const currentOfficialCounts = yearFilter ? await officialCounts(yearFilter) : []
+    const previousOfficialCounts = previousYear ? await officialCounts(previousYear) : []
 
     const currentLobbyistCounts = yearFilter
       ? await db.all(
@@ -314,154 +331,78 @@ export default async function handler(req, res) {
       .sort((a, b) => b.count - a.count || a.token.localeCompare(b.token))
       .slice(0, 30)
 
-    const officialCentralitySelected = yearFilter
-      ? await db.all(
-          `
-          WITH edges AS (
-            SELECT DISTINCT dpo.person_name AS official, lr.lobbyist_name AS lobbyist
-            FROM lobbying_records lr
-            JOIN dpo_entries dpo ON dpo.lobbying_record_id = lr.id
-            WHERE substr(TRIM(lr.period), -4) = ?
-              AND dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-              AND lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-          )
-          SELECT official AS name, COUNT(DISTINCT lobbyist) AS degree
-          FROM edges
-          GROUP BY official
-          ORDER BY degree DESC, official ASC
-          LIMIT 20
-          `,
-          [yearFilter]
-        )
-      : await db.all(
-          `
-          WITH edges AS (
-            SELECT DISTINCT dpo.person_name AS official, lr.lobbyist_name AS lobbyist
-            FROM lobbying_records lr
-            JOIN dpo_entries dpo ON dpo.lobbying_record_id = lr.id
-            WHERE dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-              AND lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-          )
-          SELECT official AS name, COUNT(DISTINCT lobbyist) AS degree
-          FROM edges
-          GROUP BY official
-          ORDER BY degree DESC, official ASC
-          LIMIT 20
-          `
-        )
+    // parser.py computes the network measures per year and for "all" years into graph_centrality.
+    const centralityYear = yearFilter || "all"
+    const centrality = {}
+    for (const entityType of ["official", "lobbyist"]) {
+      for (const measure of CENTRALITY_MEASURES) {
+        centrality[`${entityType}_${measure}`] = await centralityRanking(db, centralityYear, entityType, measure)
+      }
+    }
 
-    const lobbyistCentralitySelected = yearFilter
-      ? await db.all(
-          `
-          WITH edges AS (
-            SELECT DISTINCT dpo.person_name AS official, lr.lobbyist_name AS lobbyist
-            FROM lobbying_records lr
-            JOIN dpo_entries dpo ON dpo.lobbying_record_id = lr.id
-            WHERE substr(TRIM(lr.period), -4) = ?
-              AND dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-              AND lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-          )
-          SELECT lobbyist AS name, COUNT(DISTINCT official) AS degree
-          FROM edges
-          GROUP BY lobbyist
-          ORDER BY degree DESC, lobbyist ASC
-          LIMIT 20
-          `,
-          [yearFilter]
-        )
-      : await db.all(
-          `
-          WITH edges AS (
-            SELECT DISTINCT dpo.person_name AS official, lr.lobbyist_name AS lobbyist
-            FROM lobbying_records lr
-            JOIN dpo_entries dpo ON dpo.lobbying_record_id = lr.id
-            WHERE dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-              AND lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-          )
-          SELECT lobbyist AS name, COUNT(DISTINCT official) AS degree
-          FROM edges
-          GROUP BY lobbyist
-          ORDER BY degree DESC, lobbyist ASC
-          LIMIT 20
-          `
-        )
+    const edgeBranches = partitionBranches(
+      db,
+      (schema) => `
+        SELECT DISTINCT dpo.person_name AS official, lr.lobbyist_name AS lobbyist
+        FROM ${schema}.lobbying_records lr
+        JOIN ${schema}.dpo_entries dpo ON dpo.lobbying_record_id = lr.id
+        WHERE ${yearFilter ? "substr(TRIM(lr.period), -4) = ? AND" : ""}
+          dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
+          AND lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
+      `,
+      yearFilter ? [yearFilter] : []
+    )
+    const sharedLobbyistsSelected = await db.all(
+      `
+      WITH edges AS (
+        SELECT official, lobbyist FROM (${edgeBranches.sql}) GROUP BY official, lobbyist
+      )
+      SELECT
+        e1.official AS official_a,
+        e2.official AS official_b,
+        COUNT(*) AS shared_lobbyists
+      FROM edges e1
+      JOIN edges e2
+        ON e1.lobbyist = e2.lobbyist
+        AND e1.official < e2.official
+      GROUP BY e1.official, e2.official
+      ORDER BY shared_lobbyists DESC, e1.official ASC, e2.official ASC
+      LIMIT 20
+      `,
+      edgeBranches.params
+    )
 
-    const sharedLobbyistsSelected = yearFilter
-      ? await db.all(
-          `
-          WITH edges AS (
-            SELECT DISTINCT dpo.person_name AS official, lr.lobbyist_name AS lobbyist
-            FROM lobbying_records lr
-            JOIN dpo_entries dpo ON dpo.lobbying_record_id = lr.id
-            WHERE substr(TRIM(lr.period), -4) = ?
-              AND dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-              AND lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-          )
-          SELECT
-            e1.official AS official_a,
-            e2.official AS official_b,
-            COUNT(*) AS shared_lobbyists
-          FROM edges e1
-          JOIN edges e2
-            ON e1.lobbyist = e2.lobbyist
-            AND e1.official < e2.official
-          GROUP BY e1.official, e2.official
-          ORDER BY shared_lobbyists DESC, e1.official ASC, e2.official ASC
-          LIMIT 20
-          `,
-          [yearFilter]
+    const searchBranches = partitionBranches(
+      db,
+      (schema) => `
+        SELECT
+          lr.id,
+          lr.url,
+          lr.period,
+          lr.date_published,
+          lr.lobbyist_name,
+          COALESCE(lr.subject_matter, '') AS subject_matter,
+          COALESCE(lr.intended_results, '') AS intended_results,
+          GROUP_CONCAT(DISTINCT dpo.person_name) AS officials
+        FROM ${schema}.lobbying_records lr
+        LEFT JOIN ${schema}.dpo_entries dpo ON dpo.lobbying_record_id = lr.id
+        WHERE (
+          LOWER(COALESCE(lr.subject_matter, '')) LIKE LOWER(?)
+          OR LOWER(COALESCE(lr.intended_results, '')) LIKE LOWER(?)
+          OR LOWER(COALESCE(lr.specific_details, '')) LIKE LOWER(?)
+          OR LOWER(COALESCE(lr.relevant_matter, '')) LIKE LOWER(?)
+          OR LOWER(COALESCE(lr.public_policy_area, '')) LIKE LOWER(?)
         )
-      : await db.all(
-          `
-          WITH edges AS (
-            SELECT DISTINCT dpo.person_name AS official, lr.lobbyist_name AS lobbyist
-            FROM lobbying_records lr
-            JOIN dpo_entries dpo ON dpo.lobbying_record_id = lr.id
-            WHERE dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-              AND lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-          )
-          SELECT
-            e1.official AS official_a,
-            e2.official AS official_b,
-            COUNT(*) AS shared_lobbyists
-          FROM edges e1
-          JOIN edges e2
-            ON e1.lobbyist = e2.lobbyist
-            AND e1.official < e2.official
-          GROUP BY e1.official, e2.official
-          ORDER BY shared_lobbyists DESC, e1.official ASC, e2.official ASC
-          LIMIT 20
-          `
-        )
-
+        ${yearFilter ? "AND substr(TRIM(lr.period), -4) = ?" : ""}
+        GROUP BY lr.id
+      `,
+      yearFilter ? [...Array(5).fill(`%${searchTerm}%`), yearFilter] : Array(5).fill(`%${searchTerm}%`)
+    )
     const searchResults =
       searchTerm.length >= 2
         ? await db.all(
-            `
-            SELECT
-              lr.id,
-              lr.url,
-              lr.period,
-              lr.date_published,
-              lr.lobbyist_name,
-              COALESCE(lr.subject_matter, '') AS subject_matter,
-              COALESCE(lr.intended_results, '') AS intended_results,
-              GROUP_CONCAT(DISTINCT dpo.person_name) AS officials
-            FROM lobbying_records lr
-            LEFT JOIN dpo_entries dpo ON dpo.lobbying_record_id = lr.id
-            WHERE (
-              LOWER(COALESCE(lr.subject_matter, '')) LIKE LOWER(?)
-              OR LOWER(COALESCE(lr.intended_results, '')) LIKE LOWER(?)
-              OR LOWER(COALESCE(lr.specific_details, '')) LIKE LOWER(?)
-              OR LOWER(COALESCE(lr.relevant_matter, '')) LIKE LOWER(?)
-              OR LOWER(COALESCE(lr.public_policy_area, '')) LIKE LOWER(?)
-            )
-            ${yearFilter ? "AND substr(TRIM(lr.period), -4) = ?" : ""}
-            GROUP BY lr.id
-            ORDER BY lr.date_published DESC
-            LIMIT 50
-            `,
-            yearFilter ? [...Array(5).fill(`%${searchTerm}%`), yearFilter] : Array(5).fill(`%${searchTerm}%`)
+            `SELECT * FROM (${searchBranches.sql}) ORDER BY date_published DESC LIMIT 50`,
+            searchBranches.params
           )
         : []
 
@@ -479,8 +420,12 @@ export default async function handler(req, res) {
       biggest_mover_lobbyists: biggestMoverLobbyists,
       top_policy_areas_selected: topPolicyAreasSelected,
       top_keywords_selected: topKeywordsSelected,
-      official_centrality_selected: officialCentralitySelected.map((row) => ({ ...row, slug: slugify(row.name) })),
-      lobbyist_centrality_selected: lobbyistCentralitySelected.map((row) => ({ ...row, slug: slugify(row.name) })),
+      official_centrality_selected: centrality.official_degree,
+      official_influence_selected: centrality.official_pagerank,
+      official_brokerage_selected: centrality.official_betweenness,
+      lobbyist_centrality_selected: centrality.lobbyist_degree,
+      lobbyist_influence_selected: centrality.lobbyist_pagerank,
+      lobbyist_brokerage_selected: centrality.lobbyist_betweenness,
       shared_lobbyists_selected: sharedLobbyistsSelected.map((row) => ({
         ...row,
         official_a_slug: slugify(row.official_a),
@@ -494,15 +439,16 @@ export default async function handler(req, res) {
       }))
     }
 
-    writeCache(cacheKey, payload, 5 * 60 * 1000)
+    writeCache(cacheKey, payload, DATASET_CACHE_TTL_MS)
     res.setHeader("X-Data-Cache", "MISS")
-    res.setHeader("Cache-Control", "public, max-age=3600, stale-while-revalidate=120")
-    res.status(200).json(payload)
+    sendJson(req, res, payload, { version })
   } catch (err) {
     console.error("Error building exploration insights:", err)
-    res.status(500).json({
+    res.status(errorStatus(res, err)).json({
       error: "Internal server error",
       details: err.message
     })
+  } finally {
+    releaseDb(db)
   }
 }
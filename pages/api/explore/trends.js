@@ -0,0 +1,166 @@
+import { acquireDb, errorStatus, releaseDb } from "../../../lib/sqlite"
+import { buildCacheKey, DATASET_CACHE_TTL_MS, readCache, writeCache } from "../../../lib/serverCache"
+import { getDatasetVersion } from "../../../lib/datasetVersion"
+import { sendJson } from "../../../lib/httpCache"
+import { resolveLobbyist } from "../../../lib/returnFilters"
+
+// Everything here reads the per-period rollup tables parser.py builds (official_period_rollups,
+// lobbyist_period_rollups, policy_area_period_rollups), so a series or a comparison touches a few hundred rows.
+const ENTITIES = {
+  official: {
+    table: "official_period_rollups",
+    nameColumn: "r.person_name",
+    slugColumn: "ol.official_slug",
+    counterpartColumn: "r.lobbyist_count",
+    methodColumn: "r.method_counts",
+    join: "LEFT JOIN official_links ol ON ol.person_name = r.person_name"
+  },
+  lobbyist: {
+    table: "lobbyist_period_rollups",
+    nameColumn: "l.name",
+    slugColumn: "l.slug",
+    counterpartColumn: "r.official_count",
+    methodColumn: "r.method_counts",
+    join: "JOIN lobbyists l ON l.id = r.lobbyist_id"
+  },
+  policy_area: {
+    table: "policy_area_period_rollups",
+    nameColumn: "r.public_policy_area",
+    slugColumn: "NULL",
+    counterpartColumn: "NULL",
+    methodColumn: "NULL",
+    join: ""
+  }
+}
+
+// Returns the WHERE clause selecting one entity's rows, or null when the slug or name does not exist.
+async function resolveEntity(db, entity, { slug, name }) {
+  if (entity === "official") {
+    const link = await db.get(
+      `SELECT person_name FROM official_links WHERE official_slug = ? ORDER BY return_count DESC LIMIT 1`,
+      [slug]
+    )
+    return link ? { name: link.person_name, where: "r.person_name = ?", params: [link.person_name] } : null
+  }
+  if (entity === "lobbyist") {
+    const lobbyist = await resolveLobbyist(db, slug)
+    return lobbyist ? { name: lobbyist.name, where: "r.lobbyist_id = ?", params: [lobbyist.id] } : null
+  }
+  return name ? { name, where: "r.public_policy_area = ?", params: [name] } : null
+}
+
+async function buildSeries(db, entity, target) {
+  const config = ENTITIES[entity]
+  const rows = await db.all(
+    `
+    SELECT r.period, r.period_start, r.return_count,
+      ${config.counterpartColumn} AS counterpart_count, ${config.methodColumn} AS method_counts
+    FROM ${config.table} r
+    WHERE ${target.where}
+    ORDER BY r.period_start ASC, r.period ASC
+    `,
+    target.params
+  )
+  return rows.map((row) => ({
+    period: row.period,
+    period_start: row.period_start || null,
+    return_count: row.return_count,
+    ...(entity === "policy_area"
+      ? {}
+      : { counterpart_count: row.counterpart_count, methods: JSON.parse(row.method_counts || "{}") })
+  }))
+}
+
+// Biggest movers by return count between two periods, in the same shape as the explore insights.
+async function buildMovers(db, entity, fromPeriod, toPeriod, limit) {
+  const config = ENTITIES[entity]
+  const rows = await db.all(
+    `
+    SELECT ${config.nameColumn} AS name, ${config.slugColumn} AS slug, r.period, r.return_count
+    FROM ${config.table} r
+    ${config.join}
+    WHERE r.period IN (?, ?)
+    `,
+    [fromPeriod, toPeriod]
+  )
+  const byName = new Map()
+  for (const row of rows) {
+    const entry = byName.get(row.name) || { name: row.name, slug: row.slug, previous: 0, current: 0 }
+    if (row.period === toPeriod) entry.current += row.return_count
+    else entry.previous += row.return_count
+    byName.set(row.name, entry)
+  }
+  return Array.from(byName.values())
+    .map((row) => ({ ...row, delta: row.current - row.previous }))
+    .filter((row) => row.delta !== 0)
+    .sort((a, b) => {
+      if (b.delta !== a.delta) return b.delta - a.delta
+      if (b.current !== a.current) return b.current - a.current
+      return a.name.localeCompare(b.name)
+    })
+    .slice(0, limit)
+}
+
+export default async function handler(req, res) {
+  const entity = typeof req.query.entity === "string" && req.query.entity ? req.query.entity : "official"
+  if (!ENTITIES[entity]) {
+    res.status(400).json({ error: `entity must be one of ${Object.keys(ENTITIES).join(", ")}` })
+    return
+  }
+  const slug = typeof req.query.slug === "string" ? req.query.slug.trim() : ""
+  const name = typeof req.query.name === "string" ? req.query.name.trim() : ""
+  const from = typeof req.query.from === "string" ? req.query.from.trim() : ""
+  const to = typeof req.query.to === "string" ? req.query.to.trim() : ""
+  const limit = Math.min(Math.max(Number.parseInt(req.query.limit, 10) || 20, 1), 100)
+
+  let db
+  try {
+    const version = await getDatasetVersion()
+    const cacheKey = buildCacheKey("explore-trends-v2", { entity, slug, name, from, to, limit }, version)
+    const cached = readCache(cacheKey)
+    if (cached) {
+      res.setHeader("X-Data-Cache", "HIT")
+      sendJson(req, res, cached, { version })
+      return
+    }
+
+    db = await acquireDb("/api/explore/trends")
+    let payload
+    if (slug || name) {
+      const target = await resolveEntity(db, entity, { slug, name })
+      if (!target) {
+        res.status(404).json({ error: "Not found" })
+        return
+      }
+      payload = { entity, name: target.name, series: await buildSeries(db, entity, target) }
+    } else {
+      // Without explicit periods, compare the latest period with the one before it.
+      const periods = await db.all(
+        `
+        SELECT period, MAX(period_start) AS period_start
+        FROM lobbyist_period_rollups
+        GROUP BY period
+        ORDER BY period_start DESC, period DESC
+        `
+      )
+      const toPeriod = to || periods[0]?.period || null
+      const toIndex = periods.findIndex((row) => row.period === toPeriod)
+      const fromPeriod = from || (toIndex >= 0 ? periods[toIndex + 1]?.period : null) || null
+      payload = {
+        entity,
+        from: fromPeriod,
+        to: toPeriod,
+        movers: fromPeriod && toPeriod ? await buildMovers(db, entity, fromPeriod, toPeriod, limit) : []
+      }
+    }
+
+    writeCache(cacheKey, payload, DATASET_CACHE_TTL_MS)
+    res.setHeader("X-Data-Cache", "MISS")
+    sendJson(req, res, payload, { version })
+  } catch (err) {
+    console.error("Error in explore trends API:", err)
+    res.status(errorStatus(res, err)).json({ error: "Failed to load trends", details: err.message })
+  } finally {
+    releaseDb(db)
+  }
+}
@@ -0,0 +1,53 @@
+import { acquireDb, errorStatus, releaseDb, withDb } from "../../../../lib/sqlite"
+import { getDatasetVersion } from "../../../../lib/datasetVersion"
+import { EXPORT_FORMATS, streamReturnExport } from "../../../../lib/returnExport"
+import { buildLobbyistReturnFilters, resolveLobbyist } from "../../../../lib/returnFilters"
+import { fetchReturnPage, RETURN_SORT_KEYS } from "../../../../lib/returnPagination"
+
+// Responses are streamed and can run well past Next's 4 MB response warning.
+export const config = { api: { responseLimit: false } }
+
+// Bulk export of a lobbyist's returns, taking the same filters as /api/lobbyists/[slug].
+export default async function handler(req, res) {
+  let db
+  try {
+    const { slug, format = "ndjson", official, year, method, sort = "newest" } = req.query
+    if (!Object.hasOwn(EXPORT_FORMATS, format)) {
+      return res.status(400).json({ error: `Unsupported format, expected one of: ${Object.keys(EXPORT_FORMATS)}` })
+    }
+    const sortValue = Array.isArray(sort) ? sort[0] : sort
+    const activeSort = Object.hasOwn(RETURN_SORT_KEYS, sortValue) ? sortValue : "newest"
+
+    db = await acquireDb("/api/export/lobbyists/[slug]")
+    const lobbyist = await resolveLobbyist(db, slug)
+    if (!lobbyist) {
+      return res.status(404).json({ error: "Lobbyist not found" })
+    }
+
+    const version = await getDatasetVersion(db)
+    // The export reads its batches on connections of its own (see streamReturnExport).
+    releaseDb(db)
+    db = undefined
+    const filters = buildLobbyistReturnFilters({ lobbyistId: lobbyist.id, official, year, method })
+    await streamReturnExport(res, {
+      fetchBatch: (afterValues, limit, columns) =>
+        withDb(
+          (batchDb) => fetchReturnPage(batchDb, filters, activeSort, { afterValues, limit, columns }),
+          "/api/export/lobbyists/[slug]"
+        ),
+      sort: activeSort,
+      format,
+      filename: `${slug}-returns`,
+      version
+    })
+  } catch (err) {
+    console.error("Error in lobbyist export API:", err)
+    if (res.headersSent) {
+      res.end()
+      return
+    }
+    res.status(errorStatus(res, err)).json({ error: "Internal error", details: err.message })
+  } finally {
+    releaseDb(db)
+  }
+}
@@ -0,0 +1,73 @@
+import { acquireDb, errorStatus, releaseDb, withDb } from "../../../../lib/sqlite"
+import { getDatasetVersion } from "../../../../lib/datasetVersion"
+import { EXPORT_FORMATS, streamReturnExport } from "../../../../lib/returnExport"
+import { parseJobTitles, resolveOfficialName } from "../../../../lib/returnFilters"
+import {
+  listOfficialRecords,
+  loadOfficialFacets,
+  selectOfficialRecords,
+  sliceOfficialRecords
+} from "../../../../lib/officialFacets"
+import { fetchReturnsById, RETURN_SORT_KEYS } from "../../../../lib/returnPagination"
+
+// Responses are streamed and can run well past Next's 4 MB response warning.
+export const config = { api: { responseLimit: false } }
+
+// Bulk export of an official's returns, taking the same filters as /api/officials/[slug].
+export default async function handler(req, res) {
+  let db
+  try {
+    const { slug, format = "ndjson", lobbyist, year, method, job_titles, official_scope, sort = "newest" } = req.query
+    if (!Object.hasOwn(EXPORT_FORMATS, format)) {
+      return res.status(400).json({ error: `Unsupported format, expected one of: ${Object.keys(EXPORT_FORMATS)}` })
+    }
+    const officialScopeValue = Array.isArray(official_scope) ? official_scope[0] : official_scope
+    const activeOfficialScope = officialScopeValue === "only-this-official" ? "only-this-official" : "all"
+    const sortValue = Array.isArray(sort) ? sort[0] : sort
+    const activeSort = Object.hasOwn(RETURN_SORT_KEYS, sortValue) ? sortValue : "newest"
+
+    db = await acquireDb("/api/export/officials/[slug]")
+    const canonical = await resolveOfficialName(db, slug)
+    if (!canonical) {
+      return res.status(404).json({ error: "Official not found" })
+    }
+
+    const facets = await loadOfficialFacets(db, canonical)
+    const selection = selectOfficialRecords(facets, {
+      lobbyist,
+      year,
+      method,
+      jobTitles: parseJobTitles(job_titles),
+      officialScope: activeOfficialScope
+    })
+    const listing = listOfficialRecords(facets, selection, activeSort)
+    const version = await getDatasetVersion(db)
+    // The export reads its batches on connections of its own (see streamReturnExport).
+    releaseDb(db)
+    db = undefined
+    await streamReturnExport(res, {
+      fetchBatch: (afterValues, limit, columns) =>
+        withDb((batchDb) => {
+          const afterId = afterValues ? afterValues.at(-1) : null
+          return fetchReturnsById(
+            batchDb,
+            sliceOfficialRecords(listing, { afterId, limit }),
+            columns
+          )
+        }, "/api/export/officials/[slug]"),
+      sort: activeSort,
+      format,
+      filename: `${slug}-returns`,
+      version
+    })
+  } catch (err) {
+    console.error("Error in official export API:", err)
+    if (res.headersSent) {
+      res.end()
+      return
+    }
+    res.status(errorStatus(res, err)).json({ error: "Internal error", details: err.message })
+  } finally {
+    releaseDb(db)
+  }
+}
@@ -1,31 +1,31 @@
-import { getDb } from "../../lib/sqlite"
+import { acquireDb, errorStatus, releaseDb } from "../../lib/sqlite"
+import { getDatasetVersion } from "../../lib/datasetVersion"
+import { sendJson } from "../../lib/httpCache"
 
 export default async function handler(req, res) {
+  let db
   try {
-    const db = await getDb()
+    db = await acquireDb("/api/lobbyists")
     const { period, year } = req.query
     const hasYearFilter = typeof year === "string" && /^\d{4}$/.test(year)
     const hasPeriodFilter = !hasYearFilter && period && period !== "All"
-    const timeCondition = hasYearFilter
-      ? "AND substr(TRIM(period), -4) = ?"
-      : hasPeriodFilter
-        ? "AND period = ?"
-        : ""
+    const timeCondition = hasYearFilter ? "substr(TRIM(r.period), -4) = ?" : "r.period = ?"
     const timeParams = hasYearFilter ? [year] : hasPeriodFilter ? [period] : []
-    let rows
-    rows = await db.all(
-      `
-      SELECT
-        MIN(TRIM(lobbyist_name)) AS name,
-        COUNT(DISTINCT id) AS return_count
-      FROM lobbying_records
-      WHERE lobbyist_name IS NOT NULL
-        AND TRIM(lobbyist_name) != ''
-        ${timeCondition}
-      GROUP BY LOWER(TRIM(lobbyist_name))
-      `,
-      timeParams
-    )
+    // parser.py builds one lobbyists row per slug with its all-time return count; time filters add up the lobbyist's
+    // per-period counts in lobbyist_period_rollups, which never touches the (possibly partitioned) returns.
+    const rows =
+      hasYearFilter || hasPeriodFilter
+        ? await db.all(
+            `
+            SELECT l.name, SUM(r.return_count) AS return_count
+            FROM lobbyist_period_rollups r
+            JOIN lobbyists l ON l.id = r.lobbyist_id
+            WHERE ${timeCondition}
+            GROUP BY r.lobbyist_id
+            `,
+            timeParams
+          )
+        : await db.all(`SELECT name, return_count FROM lobbyists`)
 
     const lobbyists = rows
       .map((row) => ({
@@ -35,13 +35,14 @@ export default async function handler(req, res) {
       .filter((row) => row.name)
       .sort((a, b) => a.name.localeCompare(b.name))
 
-    res.setHeader("Cache-Control", "public, max-age=3600, stale-while-revalidate=60")
-    res.status(200).json(lobbyists)
+    sendJson(req, res, lobbyists, { version: await getDatasetVersion(db) })
   } catch (err) {
     console.error("Error in lobbyists API:", err)
-    res.status(500).json({
+    res.status(errorStatus(res, err)).json({
       error: "Internal server error",
       details: err.message
     })
+  } finally {
+    releaseDb(db)
   }
 }
@@ -1,247 +1,197 @@
-import { getDb } from "../../../lib/sqlite"
-import { buildCacheKey, readCache, writeCache } from "../../../lib/serverCache"
-
-function slugify(name) {
-  return name
-    .normalize("NFD")
-    .replace(/[^\p{L}\p{N}]+/gu, "-") // Replace non-alphanumeric (unicode) with dash
-    .replace(/-+/g, "-") // Collapse multiple dashes
-    .replace(/^-|-$/g, "") // Trim leading/trailing dashes
-    .toLowerCase()
+import { acquireDb, errorStatus, releaseDb, withDb } from "../../../lib/sqlite"
+import { buildCacheKey, DATASET_CACHE_TTL_MS, readCache, writeCache } from "../../../lib/serverCache"
+import { getDatasetVersion } from "../../../lib/datasetVersion"
+import { sendJson } from "../../../lib/httpCache"
+import {
+  countReturns,
+  decodeCursor,
+  encodeCursor,
+  fetchReturnPage,
+  RETURN_SORT_KEYS,
+  streamRecordsJson
+} from "../../../lib/returnPagination"
+import { buildLobbyistReturnFilters, resolveLobbyist } from "../../../lib/returnFilters"
+import { loadSimilarEntities } from "../../../lib/similarEntities"
+
+// Use any_dpo_or_former_dpo to set isFormerDPO
+function parseRecord(r) {
+  const dpo_entries = JSON.parse(r.dpo_entries_json || "[]")
+  return {
+    id: r.id,
+    url: r.url,
+    lobbyist_name: r.lobbyist_name,
+    date_published: r.date_published,
+    specific_details: r.specific_details?.slice(0, 1000),
+    intended_results: r.intended_results?.slice(0, 1000),
+    isFormerDPO: r.any_dpo_or_former_dpo === "Yes",
+    official_count: r.official_count || dpo_entries.length,
+    dpo_entries,
+    lobbying_activities: JSON.parse(r.activities_json || "[]")
+      .map((entry) => entry.trim())
+      .filter(Boolean)
+  }
+}
+
+// Everything in the response except the records, shared by every page of a filtered listing.
+async function buildSummary(db, { slug, official, year, method, sort }) {
+  const lobbyist = await resolveLobbyist(db, slug)
+  if (!lobbyist) return null
+
+  const filters = buildLobbyistReturnFilters({ lobbyistId: lobbyist.id, official, year, method })
+  const total = await countReturns(db, filters)
+
+  // Retrieve all records (unpaginated) to compute unique filter options.
+  const allRecordsQuery = `
+    SELECT lr.period, lr.specific_details, lr.dpo_entries_json, lr.activities_json
+    FROM lobbying_records lr
+    WHERE lr.lobbyist_id = ?
+  `
+  const allRaw = await db.all(allRecordsQuery, [lobbyist.id])
+
+  // Compute unique filter options.
+  // For methods, extract from activities (between pipes) and from specific_details (second field)
+  const methodSet = new Set()
+  const officialSet = new Set()
+  allRaw.forEach((r) => {
+    // Parse methods from activities
+    JSON.parse(r.activities_json || "[]").forEach((act) => {
+      const parts = act.split("|")
+      if (parts.length > 1 && parts[1].trim()) {
+        methodSet.add(parts[1].trim())
+      }
+    })
+    JSON.parse(r.dpo_entries_json || "[]").forEach((dpo) => officialSet.add(dpo.person_name))
+    // Parse methods from specific_details
+    if (r.specific_details) {
+      r.specific_details.split(/,(?![^|]*\|)/).forEach((entry) => {
+        const parts = entry.split("|").map((s) => s.trim())
+        if (parts[1]) methodSet.add(parts[1])
+      })
+    }
+  })
+  const uniqueMethods = Array.from(methodSet).filter(Boolean).sort()
+
+  const uniqueOfficials = Array.from(officialSet).filter(Boolean).sort()
+  const uniqueYears = Array.from(
+    new Set(allRaw.map((r) => String(r.period || "").trim().slice(-4)).filter((value) => /^\d{4}$/.test(value)))
+  ).sort((a, b) => b - a)
+
+  return {
+    lobbyistId: lobbyist.id,
+    name: lobbyist.name,
+    slug: lobbyist.slug,
+    total,
+    officials: uniqueOfficials,
+    years: uniqueYears,
+    methods: uniqueMethods,
+    similar: await loadSimilarEntities(db, "lobbyist", lobbyist.slug, year),
+    currentFilters: {
+      officialFilter: official || "",
+      yearFilter: year || "",
+      methodFilter: method || "",
+      sort
+    }
+  }
 }
 
+// per_page=All responses are streamed and can run well past Next's 4 MB response warning.
+export const config = { api: { responseLimit: false } }
+
 export default async function handler(req, res) {
+  let db
   try {
-    const { slug, page = 1, official, year, method, sort = "newest" } = req.query
+    const { slug, page = 1, cursor, per_page = 10, official, year, method, sort = "newest" } = req.query
     const sortValue = Array.isArray(sort) ? sort[0] : sort
-    const allowedSorts = new Set(["newest", "fewest-officials", "most-officials"])
-    const activeSort = allowedSorts.has(sortValue) ? sortValue : "newest"
-    const cacheKey = buildCacheKey("lobbyist-detail", {
+    const activeSort = Object.hasOwn(RETURN_SORT_KEYS, sortValue) ? sortValue : "newest"
+    const afterValues = decodeCursor(Array.isArray(cursor) ? cursor[0] : cursor, activeSort)
+    const returnAll = per_page === "All"
+    const perPageNum = returnAll ? 0 : parseInt(per_page, 10) || 10
+    const offset = afterValues ? 0 : (page - 1) * perPageNum
+    const summaryParams = {
       slug,
-      page,
       official,
       year,
       method: Array.isArray(method) ? method.join(",") : method,
       sort: activeSort
-    })
-    const cached = readCache(cacheKey)
+    }
+
+    const version = await getDatasetVersion()
+    const cacheKey = buildCacheKey(
+      "lobbyist-detail-v3",
+      { ...summaryParams, page: afterValues ? "" : page, cursor: afterValues ? cursor : "", per_page },
+      version
+    )
+    const cached = returnAll ? undefined : readCache(cacheKey)
     if (cached) {
       res.setHeader("X-Data-Cache", "HIT")
-      res.status(200).json(cached)
+      sendJson(req, res, cached, { version })
       return
     }
-    const PER_PAGE = 10
-    const offset = (page - 1) * PER_PAGE
-
-    const db = await getDb()
-
-    // Resolve canonical lobbyist name from lobbying_records.
-    const rows = await db.all(`SELECT DISTINCT lobbyist_name FROM lobbying_records`)
-    let canonical = null
-    for (const row of rows) {
-      if (slugify(row.lobbyist_name) === slug) {
-        canonical = row.lobbyist_name
-        break
-      }
-    }
-    if (!canonical) {
-      return res.status(404).json({ error: "Lobbyist not found" })
-    }
 
-    // Build filtering conditions for official, year, and method.
-    let filterConditions = ""
-    const filterParams = []
-    if (official) {
-      filterConditions +=
-        " AND EXISTS (SELECT 1 FROM dpo_entries dpo WHERE dpo.lobbying_record_id = lr.id AND LOWER(dpo.person_name) = ?) "
-      filterParams.push(official.toLowerCase())
-    }
-    if (year) {
-      filterConditions += " AND substr(TRIM(lr.period), -4) = ? "
-      filterParams.push(year)
-    }
-    // Accept method as array for multi-select (OR logic)
-    let methodFilters = []
-    if (Array.isArray(method)) {
-      methodFilters = method
-    } else if (typeof method === "string" && method) {
-      methodFilters = [method]
-    }
-    if (methodFilters.length > 0) {
-      if (typeof method === "string" && method.includes(",")) {
-        methodFilters = method.split(",").map((s) => s.trim())
+    db = await acquireDb("/api/lobbyists/[slug]")
+
+    const summaryKey = buildCacheKey("lobbyist-summary-v3", summaryParams, version)
+    let summary = readCache(summaryKey)
+    if (!summary) {
+      summary = await buildSummary(db, { slug, official, year, method, sort: activeSort })
+      if (!summary) {
+        return res.status(404).json({ error: "Lobbyist not found" })
       }
-      filterConditions +=
-        `\n        AND EXISTS (\n          SELECT 1 FROM lobbying_activity_entries lae\n          WHERE lae.lobbying_record_id = lr.id\n            AND ( ` +
-        methodFilters.map(() => `LOWER(lae.activity) LIKE ?`).join(" OR ") +
-        ` )\n        )\n      `
-      methodFilters.forEach((m) => filterParams.push("%" + m.toLowerCase() + "%"))
+      writeCache(summaryKey, summary, DATASET_CACHE_TTL_MS)
     }
 
-    // Query total count using the filters.
-    const countQuery = `
-      SELECT COUNT(DISTINCT lr.id) AS total
-      FROM lobbying_records lr
-      WHERE LOWER(lr.lobbyist_name) = ?
-      ${filterConditions}
-    `
-    const countRow = await db.get(countQuery, [canonical.toLowerCase(), ...filterParams])
-    const total = countRow?.total || 0
-
-    const orderClause =
-      activeSort === "fewest-officials"
-        ? "CASE WHEN dpo_count = 0 THEN 1 ELSE 0 END, dpo_count ASC, lr.date_published DESC"
-        : activeSort === "most-officials"
-          ? "dpo_count DESC, lr.date_published DESC"
-          : "lr.date_published DESC"
-
-    // Query paginated records with filters.
-    const baseQuery = `
-      SELECT lr.*, lr.any_dpo_or_former_dpo,
-        (
-          SELECT COUNT(*)
-          FROM dpo_entries dpo
-          WHERE dpo.lobbying_record_id = lr.id
-            AND dpo.person_name IS NOT NULL
-            AND TRIM(dpo.person_name) != ''
-        ) AS dpo_count,
-        (
-          SELECT GROUP_CONCAT(dpo.person_name || '|' || dpo.job_title || '|' || dpo.public_body, '||')
-          FROM dpo_entries dpo
-          WHERE dpo.lobbying_record_id = lr.id
-        ) AS dpos,
-        (
-          SELECT GROUP_CONCAT(activity, '||')
-          FROM lobbying_activity_entries
-          WHERE lobbying_record_id = lr.id
-        ) AS activities
-      FROM lobbying_records lr
-      WHERE LOWER(lr.lobbyist_name) = ?
-      ${filterConditions}
-      ORDER BY ${orderClause}
-      LIMIT ? OFFSET ?
-    `
-
-    const records = await db.all(baseQuery, [canonical.toLowerCase(), ...filterParams, PER_PAGE, offset])
-    // Use any_dpo_or_former_dpo to set isFormerDPO
-    const parsedRecords = records.map((r) => {
-      let dpo_entries = []
-      if (typeof r.dpos === "string") {
-        dpo_entries = r.dpos.split("||").map((entry) => {
-          const [name, job, body] = entry.split("|")
-          return {
-            person_name: name,
-            job_title: job,
-            public_body: body
-          }
-        })
-      }
-      return {
-        id: r.id,
-        url: r.url,
-        lobbyist_name: r.lobbyist_name,
-        date_published: r.date_published,
-        specific_details: r.specific_details?.slice(0, 1000),
-        intended_results: r.intended_results?.slice(0, 1000),
-        isFormerDPO: r.any_dpo_or_former_dpo === "Yes",
-        official_count: r.dpo_count || dpo_entries.length,
-        dpo_entries,
-        lobbying_activities:
-          typeof r.activities === "string"
-            ? r.activities
-                .split("||")
-                .map((entry) => entry.trim())
-                .filter(Boolean)
-            : []
-      }
-    })
+    const { lobbyistId, ...summaryFields } = summary
+    const filters = buildLobbyistReturnFilters({ lobbyistId, official, year, method })
 
-    // Retrieve all records (unpaginated) to compute unique filter options.
-    const allRecordsQuery = `
-      SELECT lr.*,
-        (
-          SELECT GROUP_CONCAT(dpo.person_name || '|' || dpo.job_title || '|' || dpo.public_body, '||')
-          FROM dpo_entries dpo
-          WHERE dpo.lobbying_record_id = lr.id
-        ) AS dpos,
-        (
-          SELECT GROUP_CONCAT(activity, '||')
-          FROM lobbying_activity_entries
-          WHERE lobbying_record_id = lr.id
-        ) AS activities
-      FROM lobbying_records lr
-      WHERE LOWER(lr.lobbyist_name) = ?
-    `
-    const allRaw = await db.all(allRecordsQuery, [canonical.toLowerCase()])
-    const allRecords = allRaw.map((r) => ({
-      dpo_entries:
-        typeof r.dpos === "string"
-          ? r.dpos.split("||").map((entry) => {
-              const [name] = entry.split("|")
-              return name
-            })
-          : [],
-      date_published: r.date_published,
-      lobbying_activities:
-        typeof r.activities === "string"
-          ? r.activities
-              .split("||")
-              .map((entry) => entry.trim())
-              .filter(Boolean)
-          : []
-    }))
-
-    // Compute unique filter options.
-    // For methods, extract from activities (between pipes) and from specific_details (second field)
-    const methodSet = new Set()
-    allRaw.forEach((r) => {
-      // Parse methods from activities
-      if (typeof r.activities === "string") {
-        r.activities.split("||").forEach((act) => {
-          const parts = act.split("|")
-          if (parts.length > 1 && parts[1].trim()) {
-            methodSet.add(parts[1].trim())
-          }
-        })
-      }
-      // Parse methods from specific_details
-      if (r.specific_details) {
-        r.specific_details.split(/,(?![^|]*\|)/).forEach((entry) => {
-          const parts = entry.split("|").map((s) => s.trim())
-          if (parts[1]) methodSet.add(parts[1])
-        })
-      }
-    })
-    const uniqueMethods = Array.from(methodSet).filter(Boolean).sort()
+    if (returnAll) {
+      // Stream every matching record in keyset batches; each batch borrows a pooled connection of its own.
+      releaseDb(db)
+      db = undefined
+      await streamRecordsJson(
+        res,
+        { ...summaryFields, page: 1, pageSize: summary.total, nextCursor: null },
+        {
+          version,
+          sort: activeSort,
+          mapRow: parseRecord,
+          fetchBatch: (batchAfter, limit) =>
+            withDb(
+              (batchDb) => fetchReturnPage(batchDb, filters, activeSort, { afterValues: batchAfter, limit }),
+              "/api/lobbyists/[slug]"
+            )
+        }
+      )
+      return
+    }
 
-    const uniqueOfficials = Array.from(new Set(allRecords.flatMap((r) => r.dpo_entries).filter(Boolean))).sort()
-    const uniqueYears = Array.from(
-      new Set(allRaw.map((r) => String(r.period || "").trim().slice(-4)).filter((value) => /^\d{4}$/.test(value)))
-    ).sort((a, b) => b - a)
+    // One extra row tells us whether a next page exists without a second query.
+    const rows = await fetchReturnPage(db, filters, activeSort, { afterValues, limit: perPageNum + 1, offset })
+    const pageRows = rows.slice(0, perPageNum)
+    const nextCursor = rows.length > perPageNum ? encodeCursor(activeSort, pageRows[pageRows.length - 1]) : null
 
+    const { name, slug: lobbyistSlug, total, ...rest } = summaryFields
     const payload = {
-      name: canonical,
-      slug: slugify(canonical),
+      name,
+      slug: lobbyistSlug,
       total,
       page: parseInt(page),
-      pageSize: PER_PAGE,
-      records: parsedRecords,
-      officials: uniqueOfficials,
-      years: uniqueYears,
-      methods: uniqueMethods,
-      currentFilters: {
-        officialFilter: official || "",
-        yearFilter: year || "",
-        methodFilter: method || "",
-        sort: activeSort
-      }
+      pageSize: perPageNum,
+      nextCursor,
+      records: pageRows.map(parseRecord),
+      ...rest
     }
 
-    writeCache(cacheKey, payload, 2 * 60 * 1000)
+    writeCache(cacheKey, payload, DATASET_CACHE_TTL_MS)
     res.setHeader("X-Data-Cache", "MISS")
-    res.status(200).json(payload)
+    sendJson(req, res, payload, { version })
   } catch (err) {
     console.error("Error in lobbyist detail API:", err)
-    res.status(500).json({ error: "Internal error", details: err.message })
+    if (res.headersSent) {
+      res.end()
+      return
+    }
+    res.status(errorStatus(res, err)).json({ error: "Internal error", details: err.message })
+  } finally {
+    releaseDb(db)
   }
 }
@@ -0,0 +1,129 @@
+import { getCacheStats } from "../../lib/serverCache"
+import { getPoolStats } from "../../lib/sqlite"
+import { DURATION_BUCKETS_MS, ROW_BUCKETS, getQueryMetrics } from "../../lib/queryMetrics"
+
+function escapeLabel(value) {
+  return String(value).replace(/\\/g, "\\\\").replace(/\n/g, "\\n").replace(/"/g, '\\"')
+}
+
+function labels(values) {
+  const pairs = Object.entries(values).map(([key, value]) => `${key}="${escapeLabel(value)}"`)
+  return pairs.length ? `{${pairs.join(",")}}` : ""
+}
+
+function metric(lines, name, type, help, samples) {
+  lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`)
+  for (const [labelValues, value] of samples) {
+    lines.push(`${name}${labels(labelValues)} ${value}`)
+  }
+}
+
+// Buckets are stored per bound, Prometheus expects them cumulative with a closing +Inf bucket.
+function histogram(lines, name, help, bounds, series, scale = 1) {
+  lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} histogram`)
+  for (const [labelValues, data] of series) {
+    let cumulative = 0
+    bounds.forEach((bound, index) => {
+      cumulative += data.buckets[index]
+      lines.push(`${name}_bucket${labels({ ...labelValues, le: bound * scale })} ${cumulative}`)
+    })
+    lines.push(`${name}_bucket${labels({ ...labelValues, le: "+Inf" })} ${data.count}`)
+    lines.push(`${name}_sum${labels(labelValues)} ${data.sum * scale}`)
+    lines.push(`${name}_count${labels(labelValues)} ${data.count}`)
+  }
+}
+
+function renderMetrics() {
+  const { routes, shapes, slowQueryMs } = getQueryMetrics()
+  const cache = getCacheStats()
+  const pool = getPoolStats()
+  const lines = []
+
+  histogram(
+    lines,
+    "lobbying_db_query_duration_seconds",
+    "SQLite query duration by calling route.",
+    DURATION_BUCKETS_MS,
+    routes.map(({ route, duration }) => [{ route }, duration]),
+    0.001
+  )
+  histogram(
+    lines,
+    "lobbying_db_query_rows",
+    "Rows returned per SQLite query by calling route.",
+    ROW_BUCKETS,
+    routes.map(({ route, rows }) => [{ route }, rows])
+  )
+  metric(
+    lines,
+    "lobbying_db_query_errors_total",
+    "counter",
+    "SQLite queries that raised an error.",
+    routes.map(({ route, errors }) => [{ route }, errors])
+  )
+  metric(
+    lines,
+    "lobbying_db_slow_queries_total",
+    "counter",
+    `SQLite queries slower than ${slowQueryMs} ms (SLOW_QUERY_MS), each logged with its parameters.`,
+    routes.map(({ route, slow }) => [{ route }, slow])
+  )
+  metric(
+    lines,
+    "lobbying_db_query_shape_calls_total",
+    "counter",
+    "Calls per query shape; the fingerprint matches the slow-query log and scripts/check_query_plans.py.",
+    shapes.map(({ route, fingerprint, calls }) => [{ route, fingerprint }, calls])
+  )
+  metric(
+    lines,
+    "lobbying_db_query_shape_seconds_total",
+    "counter",
+    "Total time spent per query shape.",
+    shapes.map(({ route, fingerprint, totalMs }) => [{ route, fingerprint }, totalMs / 1000])
+  )
+  metric(
+    lines,
+    "lobbying_db_query_shape_max_seconds",
+    "gauge",
+    "Slowest single call per query shape since the process started.",
+    shapes.map(({ route, fingerprint, maxMs }) => [{ route, fingerprint }, maxMs / 1000])
+  )
+
+  metric(lines, "lobbying_db_pool_size", "gauge", "Configured read-only connections (SQLITE_POOL_SIZE).", [
+    [{}, pool.size]
+  ])
+  metric(lines, "lobbying_db_pool_connections", "gauge", "Read-only connections by state.", [
+    [{ state: "opened" }, pool.opened],
+    [{ state: "idle" }, pool.idle]
+  ])
+  metric(lines, "lobbying_db_pool_waiting", "gauge", "Requests waiting for a pooled connection.", [[{}, pool.waiting]])
+  metric(
+    lines,
+    "lobbying_db_pool_timeouts_total",
+    "counter",
+    "Requests answered 503 after waiting SQLITE_ACQUIRE_TIMEOUT_MS for a pooled connection.",
+    [[{}, pool.timeouts]]
+  )
+
+  for (const counter of ["hits", "misses", "evictions", "expirations", "rejections"]) {
+    metric(lines, `lobbying_api_cache_${counter}_total`, "counter", `API response cache ${counter}.`, [
+      [{}, cache[counter]]
+    ])
+  }
+  metric(lines, "lobbying_api_cache_entries", "gauge", "Entries held in the API response cache.", [[{}, cache.entries]])
+  metric(lines, "lobbying_api_cache_bytes", "gauge", "Estimated size of the API response cache.", [[{}, cache.bytes]])
+
+  return `${lines.join("\n")}\n`
+}
+
+export default function handler(req, res) {
+  // Set METRICS_TOKEN to require `Authorization: Bearer <token>` when the app port is reachable from outside.
+  const token = process.env.METRICS_TOKEN
+  if (token && req.headers.authorization !== `Bearer ${token}`) {
+    return res.status(401).json({ error: "Unauthorized" })
+  }
+  res.setHeader("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+  res.setHeader("Cache-Control", "no-store")
+  res.status(200).send(renderMetrics())
+}
@@ -1,6 +1,26 @@
-import { getDb } from "../../../lib/sqlite"
+import { acquireDb, errorStatus, releaseDb, withDb } from "../../../lib/sqlite"
 import { buildCacheKey, readCache, writeCache } from "../../../lib/serverCache"
 import { fetchOireachtasMemberContacts, loadCurrentOireachtasRoster } from "../../../lib/oireachtasRoster"
+import { getDatasetVersion } from "../../../lib/datasetVersion"
+import { sendJson } from "../../../lib/httpCache"
+import {
+  decodeCursor,
+  encodeCursor,
+  fetchReturnsById,
+  RETURN_SORT_KEYS,
+  streamRecordsJson
+} from "../../../lib/returnPagination"
+import { parseJobTitles, resolveOfficialName } from "../../../lib/returnFilters"
+import {
+  countOfficialFacets,
+  listOfficialRecords,
+  loadOfficialFacets,
+  selectOfficialRecords,
+  sliceOfficialRecords
+} from "../../../lib/officialFacets"
+import { loadSimilarEntities } from "../../../lib/similarEntities"
+
+const OFFICIAL_DETAIL_TTL_MS = 60 * 60 * 1000
 
 function slugify(name) {
   return name
@@ -22,12 +42,26 @@ function committeeSlugify(name) {
     .replace(/^-|-$/g, "")
 }
 
-// Helper: extract method from an activity string.
-// E.g., "One email to each of the listed TDs. - Email" returns "Email"
-function extractMethod(activityStr) {
-  if (!activityStr) return ""
-  const parts = activityStr.split("-")
-  return parts[parts.length - 1].trim()
+function parseRecord(r) {
+  return {
+    id: r.id,
+    url: r.url,
+    lobbyist_name: r.lobbyist_name,
+    date_published: r.date_published,
+    specific_details: r.specific_details?.slice(0, 1000),
+    intended_results: r.intended_results?.slice(0, 1000),
+    // new fields
+    any_dpo_or_former_dpo: r.any_dpo_or_former_dpo,
+    isFormerDPO: r.any_dpo_or_former_dpo === "Yes",
+    official_count: r.official_count || 0,
+    dpo_entries: JSON.parse(r.dpo_entries_json || "[]"),
+    lobbying_activities: JSON.parse(r.activities_json || "[]")
+      .map((entry) => {
+        const parts = entry.split("|").map((s) => s.trim())
+        return parts.length >= 2 && parts[0] ? `${parts[0]} - ${parts[1]}` : parts[1] || parts[0] || ""
+      })
+      .filter(Boolean)
+  }
 }
 
 function toIsoOrNull(value) {
@@ -36,11 +70,126 @@ function toIsoOrNull(value) {
   return Number.isNaN(date.getTime()) ? null : date.toISOString()
 }
 
+// Everything in the response except the records themselves. It depends on the filters but not on the page, so
+// every page (and the streamed "All" response) of a listing reuses one computation. Filter options and their counts
+// come from the official's facet lists (see lib/officialFacets.js).
+async function buildSummary(db, canonical, facets, filters, { slug, lobbyist, year, method, officialScope, sort }) {
+  const officialSlug = slugify(canonical)
+  // official_links holds the roster and committee member slugs resolved for this name at ingest, and the profile
+  // parser.py derives from the official's dated returns.
+  let link = null
+  try {
+    link = await db.get(
+      `
+      SELECT roster_slug, member_slug, first_seen_at, last_seen_at, most_recent_title, most_recent_public_body,
+        job_titles, public_bodies
+      FROM official_links
+      WHERE person_name = ?
+      `,
+      [canonical]
+    )
+  } catch (err) {
+    if (!String(err?.message || "").includes("no such table")) {
+      throw err
+    }
+  }
+  const rosterSlug = link ? link.roster_slug : officialSlug
+  const currentRoster = rosterSlug ? await loadCurrentOireachtasRoster() : []
+  const currentRosterMember = currentRoster.find((member) => member?.slug === rosterSlug)
+  let committeeMemberships = []
+  try {
+    committeeMemberships = await db.all(
+      `
+      SELECT DISTINCT
+        c.name,
+        c.url,
+        c.membership_url,
+        c.house_no,
+        c.scraped_at,
+        cm.role,
+        cm.member_name,
+        cm.member_uri,
+        cm.member_url,
+        cm.constituency
+      FROM committee_memberships cm
+      JOIN committees c ON c.id = cm.committee_id
+      WHERE cm.member_slug IN (?, ?, ?)
+      ORDER BY c.name ASC, cm.role ASC
+      `,
+      [officialSlug, slug, link?.member_slug || officialSlug]
+    )
+  } catch (err) {
+    if (!String(err?.message || "").includes("no such table")) {
+      throw err
+    }
+  }
+
+  return {
+    name: canonical,
+    slug: officialSlug,
+    total: selectOfficialRecords(facets, filters).length,
+    profile: {
+      name: canonical,
+      most_recent_title: link?.most_recent_title || null,
+      most_recent_public_body: link?.most_recent_public_body || null,
+      first_seen_at: toIsoOrNull(link?.first_seen_at),
+      last_seen_at: toIsoOrNull(link?.last_seen_at),
+      distinct_titles: JSON.parse(link?.job_titles || "[]"),
+      distinct_public_bodies: JSON.parse(link?.public_bodies || "[]"),
+      oireachtas_profile: currentRosterMember
+        ? {
+            chamber: currentRosterMember.chamber || null,
+            member_url: currentRosterMember.member_url || null,
+            image_url: currentRosterMember.image_url || null,
+            party: currentRosterMember.party || null,
+            constituency: currentRosterMember.constituency || null,
+            // Filled in by addOireachtasContacts once the connection is released.
+            emails: [],
+            phones: [],
+            social_links: []
+          }
+        : null,
+      committee_memberships: committeeMemberships.map((committee) => ({
+        ...committee,
+        slug: committeeSlugify(committee.name)
+      }))
+    },
+    lobbyists: Array.from(facets.lobbyist.keys()).sort(),
+    similar: await loadSimilarEntities(db, "official", canonical, year),
+    years: Array.from(facets.year.keys()).sort((a, b) => b - a),
+    methods: Array.from(facets.method.keys()).sort(),
+    facet_counts: countOfficialFacets(facets, filters),
+    currentFilters: {
+      lobbyistFilter: lobbyist || "",
+      yearFilter: year || "",
+      methodFilter: method || "",
+      officialScope,
+      sort
+    }
+  }
+}
+
+// Contact details are scraped live from the member's Oireachtas page, which can take seconds, so they are fetched
+// after the pooled connection is released.
+async function addOireachtasContacts(summary) {
+  const profile = summary.profile.oireachtas_profile
+  if (!profile?.member_url) return
+  const contacts = await fetchOireachtasMemberContacts(profile.member_url)
+  profile.emails = contacts.emails || []
+  profile.phones = contacts.phones || []
+  profile.social_links = contacts.social_links || []
+}
+
+// per_page=All responses are streamed and can run well past Next's 4 MB response warning.
+export const config = { api: { responseLimit: false } }
+
 export default async function handler(req, res) {
+  let db
   try {
     const {
       slug,
       page = 1,
+      cursor,
       lobbyist,
       year,
       method,
@@ -52,392 +201,128 @@ export default async function handler(req, res) {
     const officialScopeValue = Array.isArray(official_scope) ? official_scope[0] : official_scope
     const activeOfficialScope = officialScopeValue === "only-this-official" ? "only-this-official" : "all"
     const sortValue = Array.isArray(sort) ? sort[0] : sort
-    const allowedSorts = new Set(["newest", "fewest-officials", "most-officials"])
-    const activeSort = allowedSorts.has(sortValue) ? sortValue : "newest"
-    const cacheKey = buildCacheKey("official-detail-v2", {
+    const activeSort = Object.hasOwn(RETURN_SORT_KEYS, sortValue) ? sortValue : "newest"
+    const afterValues = decodeCursor(Array.isArray(cursor) ? cursor[0] : cursor, activeSort)
+    const returnAll = per_page === "All"
+    const perPageNum = returnAll ? 0 : parseInt(per_page, 10) || 10
+    const offset = afterValues ? 0 : (page - 1) * perPageNum
+
+    const jobTitles = parseJobTitles(job_titles)
+    const summaryParams = {
       slug,
-      page,
       lobbyist,
       year,
       method: Array.isArray(method) ? method.join(",") : method,
       job_titles,
-      per_page,
       official_scope: activeOfficialScope,
       sort: activeSort
-    })
-    const cached = readCache(cacheKey)
+    }
+
+    const version = await getDatasetVersion()
+    const cacheKey = buildCacheKey(
+      "official-detail-v5",
+      { ...summaryParams, page: afterValues ? "" : page, cursor: afterValues ? cursor : "", per_page },
+      version
+    )
+    const cached = returnAll ? undefined : readCache(cacheKey)
     if (cached) {
       res.setHeader("X-Data-Cache", "HIT")
-      res.status(200).json(cached)
+      sendJson(req, res, cached, { version })
       return
     }
 
-    let perPageNum = 10
-    let returnAll = false
-    if (per_page === "All") {
-      returnAll = true
-    } else {
-      perPageNum = parseInt(per_page, 10) || 10
-    }
-    const offset = (page - 1) * perPageNum
-
-    const db = await getDb()
-
-    // Parse job_titles from comma-separated string to array
-    let allowedJobTitles = null
-    if (job_titles) {
-      allowedJobTitles = job_titles.split(",").map((t) => t.trim())
-    }
+    db = await acquireDb("/api/officials/[slug]")
 
-    // Resolve canonical official name from dpo_entries.
-    const dpoRows = await db.all(`SELECT person_name FROM dpo_entries`)
-    let canonical = null
-    for (const row of dpoRows) {
-      if (slugify(row.person_name) === slug) {
-        canonical = row.person_name
-        break
+    // The selection's ids in listing order are cached with the summary, so later pages of a listing neither decode
+    // the official's facet lists nor intersect them again.
+    const summaryKey = buildCacheKey("official-summary-v4", summaryParams, version)
+    const cachedSummary = readCache(summaryKey)
+    const summaryBuilt = !cachedSummary
+    let summary = cachedSummary?.summary
+    let listing = cachedSummary?.listing
+    if (!summary) {
+      const canonical = await resolveOfficialName(db, slug)
+      if (!canonical) {
+        return res.status(404).json({ error: "Official not found" })
       }
+      const facets = await loadOfficialFacets(db, canonical)
+      const filters = { lobbyist, year, method, jobTitles, officialScope: activeOfficialScope }
+      listing = listOfficialRecords(facets, selectOfficialRecords(facets, filters), activeSort)
+      summary = await buildSummary(db, canonical, facets, filters, {
+        slug,
+        lobbyist,
+        year,
+        method,
+        officialScope: activeOfficialScope,
+        sort: activeSort
+      })
     }
-    if (!canonical) {
-      return res.status(404).json({ error: "Official not found" })
-    }
-
-    // Build filtering conditions for lobbyist, year, method, and job_title.
-    let filterConditions = ""
-    const filterParams = []
-    if (lobbyist) {
-      filterConditions += " AND LOWER(lr.lobbyist_name) = ? "
-      filterParams.push(lobbyist.toLowerCase())
-    }
-    // Accept method as array for multi-select (OR logic)
-    let methodFilters = []
-    if (Array.isArray(method)) {
-      methodFilters = method
-    } else if (typeof method === "string" && method) {
-      methodFilters = [method]
-    }
-    if (methodFilters.length > 0) {
-      if (typeof method === "string" && method.includes(",")) {
-        methodFilters = method.split(",").map((s) => s.trim())
-      }
-      filterConditions +=
-        `\n        AND EXISTS (\n          SELECT 1 FROM lobbying_activity_entries lae\n          WHERE lae.lobbying_record_id = lr.id\n            AND ( ` +
-        methodFilters.map(() => `LOWER(lae.activity) LIKE ?`).join(" OR ") +
-        ` )\n        )\n      `
-      methodFilters.forEach((m) => filterParams.push("%" + m.toLowerCase() + "%"))
-    }
-    if (year) {
-      filterConditions += " AND substr(TRIM(lr.period), -4) = ? "
-      filterParams.push(year)
-    }
-    if (activeOfficialScope === "only-this-official") {
-      filterConditions += `
-        AND (
-          SELECT COUNT(DISTINCT dpo.person_name)
-          FROM dpo_entries dpo
-          WHERE dpo.lobbying_record_id = lr.id
-            AND dpo.person_name IS NOT NULL
-            AND TRIM(dpo.person_name) != ''
-        ) = 1
-      `
-    }
-
-    // Add job_title filter if provided
-    let jobTitleCondition = ""
-    if (allowedJobTitles && allowedJobTitles.length > 0) {
-      jobTitleCondition = ` AND dpo.job_title IN (${allowedJobTitles.map(() => "?").join(",")}) `
-    }
-
-    // Query total count using the filters.
-    const countQuery = `
-      SELECT COUNT(DISTINCT lr.id) AS total
-      FROM lobbying_records lr
-      WHERE EXISTS (
-        SELECT 1 FROM dpo_entries dpo
-        WHERE dpo.lobbying_record_id = lr.id
-          AND dpo.person_name = ?
-          ${jobTitleCondition}
-      )
-      ${filterConditions}
-    `
-    const countRow = await db.get(countQuery, [canonical, ...(allowedJobTitles || []), ...filterParams])
-    const total = countRow?.total || 0
-
-    const dpoCountSelect = `
-        (
-          SELECT COUNT(DISTINCT dpo.person_name)
-          FROM dpo_entries dpo
-          WHERE dpo.lobbying_record_id = lr.id
-            AND dpo.person_name IS NOT NULL
-            AND TRIM(dpo.person_name) != ''
-        ) AS dpo_count,
-    `
-    const orderClause =
-      activeSort === "fewest-officials"
-        ? "CASE WHEN dpo_count = 0 THEN 1 ELSE 0 END, dpo_count ASC, lr.date_published DESC"
-        : activeSort === "most-officials"
-          ? "dpo_count DESC, lr.date_published DESC"
-          : "lr.date_published DESC"
 
-    // Define baseQuery for paginated fetch
-    const baseQuery = `
-      SELECT lr.*,
-        ${dpoCountSelect}
-        (
-          SELECT GROUP_CONCAT(dpo.person_name || '|' || dpo.job_title || '|' || dpo.public_body, '||')
-          FROM dpo_entries dpo
-          WHERE dpo.lobbying_record_id = lr.id
-        ) AS dpos,
-        (
-          SELECT GROUP_CONCAT(activity, '||')
-          FROM lobbying_activity_entries
-          WHERE lobbying_record_id = lr.id
-        ) AS activities
-      FROM lobbying_records lr
-      WHERE EXISTS (
-        SELECT 1 FROM dpo_entries dpo
-        WHERE dpo.lobbying_record_id = lr.id
-          AND dpo.person_name = ?
-          ${jobTitleCondition}
-      )
-      ${filterConditions}
-      ORDER BY ${orderClause}
-      LIMIT ? OFFSET ?
-    `
+    // Pages are sliced from the official's returns in listing order; a cursor's last value is its row's id.
+    const pageIds = (after, limit, skip = 0) =>
+      sliceOfficialRecords(listing, { afterId: after ? after.at(-1) : null, offset: skip, limit })
 
-    // Query paginated records with filters.
-    let records = []
     if (returnAll) {
-      // Return all records matching filters (no LIMIT/OFFSET)
-      const allQuery = `
-      SELECT lr.*,
-        ${dpoCountSelect}
-        (
-          SELECT GROUP_CONCAT(dpo.person_name || '|' || dpo.job_title || '|' || dpo.public_body, '||')
-          FROM dpo_entries dpo
-          WHERE dpo.lobbying_record_id = lr.id
-        ) AS dpos,
-        (
-          SELECT GROUP_CONCAT(activity, '||')
-          FROM lobbying_activity_entries
-          WHERE lobbying_record_id = lr.id
-        ) AS activities
-      FROM lobbying_records lr
-      WHERE EXISTS (
-        SELECT 1 FROM dpo_entries dpo
-        WHERE dpo.lobbying_record_id = lr.id
-          AND dpo.person_name = ?
-          ${jobTitleCondition}
-      )
-      ${filterConditions}
-      ORDER BY ${orderClause}
-    `
-      records = await db.all(allQuery, [canonical, ...(allowedJobTitles || []), ...filterParams])
-    } else {
-      records = await db.all(baseQuery, [canonical, ...(allowedJobTitles || []), ...filterParams, perPageNum, offset])
-    }
-    const parsedRecords = records.map((r) => ({
-      id: r.id,
-      url: r.url,
-      lobbyist_name: r.lobbyist_name,
-      date_published: r.date_published,
-      specific_details: r.specific_details?.slice(0, 1000),
-      intended_results: r.intended_results?.slice(0, 1000),
-      // new fields
-      any_dpo_or_former_dpo: r.any_dpo_or_former_dpo,
-      isFormerDPO: r.any_dpo_or_former_dpo === "Yes",
-      official_count: r.dpo_count || 0,
-      dpo_entries:
-        typeof r.dpos === "string"
-          ? r.dpos.split("||").map((entry) => {
-              const [name, job, body] = entry.split("|")
-              return {
-                person_name: name,
-                job_title: job,
-                public_body: body
-              }
-            })
-          : [],
-      lobbying_activities:
-        typeof r.activities === "string"
-          ? r.activities
-              .split("||")
-              .map((entry) => {
-                const parts = entry.split("|").map((s) => s.trim())
-                return parts.length >= 2 && parts[0] ? `${parts[0]} - ${parts[1]}` : parts[1] || parts[0] || ""
-              })
-              .filter(Boolean)
-          : []
-    }))
-
-    // Retrieve all records (unpaginated) to compute unique filter options.
-    const allRecordsQuery = `
-      SELECT lr.*,
-        (
-          SELECT GROUP_CONCAT(dpo.person_name || '|' || dpo.job_title || '|' || dpo.public_body, '||')
-          FROM dpo_entries dpo
-          WHERE dpo.lobbying_record_id = lr.id
-        ) AS dpos,
-        (
-          SELECT GROUP_CONCAT(activity, '||')
-          FROM lobbying_activity_entries
-          WHERE lobbying_record_id = lr.id
-        ) AS activities
-      FROM lobbying_records lr
-      WHERE EXISTS (
-        SELECT 1 FROM dpo_entries dpo
-        WHERE dpo.lobbying_record_id = lr.id
-          AND dpo.person_name = ?
-      )
-      ORDER BY lr.date_published DESC
-    `
-    const allRaw = await db.all(allRecordsQuery, [canonical])
-    const allRecords = allRaw.map((r) => ({
-      id: r.id,
-      url: r.url,
-      lobbyist_name: r.lobbyist_name,
-      date_published: r.date_published,
-      specific_details: r.specific_details?.slice(0, 1000),
-      intended_results: r.intended_results?.slice(0, 1000),
-      dpo_entries:
-        typeof r.dpos === "string"
-          ? r.dpos.split("||").map((entry) => {
-              const [name, job, body] = entry.split("|")
-              return {
-                person_name: name,
-                job_title: job,
-                public_body: body
-              }
-            })
-          : [],
-      lobbying_activities:
-        typeof r.activities === "string"
-          ? r.activities
-              .split("||")
-              .map((entry) => {
-                const parts = entry.split("|").map((s) => s.trim())
-                return parts.length >= 2 && parts[0] ? `${parts[0]} - ${parts[1]}` : parts[1] || parts[0] || ""
-              })
-              .filter(Boolean)
-          : []
-    }))
-
-    // Build derived official profile metadata from all matched records.
-    const dpoProfileRows = []
-    for (const row of allRaw) {
-      const date = toIsoOrNull(row.date_published)
-      if (!date || typeof row.dpos !== "string") continue
-      const dpos = row.dpos.split("||")
-      for (const entry of dpos) {
-        const [personName, jobTitle, publicBody] = entry.split("|")
-        if (personName === canonical) {
-          dpoProfileRows.push({
-            date_published: date,
-            job_title: (jobTitle || "").trim(),
-            public_body: (publicBody || "").trim()
-          })
-        }
+      // Stream every matching record in batches instead of materializing the whole history. Batches borrow
+      // a pooled connection each, so a slow client does not pin one for the length of the download.
+      releaseDb(db)
+      db = undefined
+      if (summaryBuilt) {
+        await addOireachtasContacts(summary)
+        writeCache(summaryKey, { summary, listing }, OFFICIAL_DETAIL_TTL_MS)
       }
-    }
-
-    dpoProfileRows.sort((a, b) => new Date(b.date_published) - new Date(a.date_published))
-    const mostRecent = dpoProfileRows[0] || null
-    const firstSeen = dpoProfileRows.length ? dpoProfileRows[dpoProfileRows.length - 1].date_published : null
-    const lastSeen = dpoProfileRows.length ? dpoProfileRows[0].date_published : null
-    const distinctTitles = Array.from(new Set(dpoProfileRows.map((r) => r.job_title).filter(Boolean))).sort()
-    const distinctBodies = Array.from(new Set(dpoProfileRows.map((r) => r.public_body).filter(Boolean))).sort()
-    const officialSlug = slugify(canonical)
-    const currentRoster = await loadCurrentOireachtasRoster()
-    const currentRosterMember = currentRoster.find((member) => member?.slug === officialSlug)
-    const oireachtasContacts = currentRosterMember?.member_url
-      ? fetchOireachtasMemberContacts(currentRosterMember.member_url)
-      : { emails: [], phones: [], social_links: [] }
-    let committeeMemberships = []
-    try {
-      committeeMemberships = await db.all(
-        `
-        SELECT DISTINCT
-          c.name,
-          c.url,
-          c.membership_url,
-          c.house_no,
-          c.scraped_at,
-          cm.role,
-          cm.member_name,
-          cm.member_uri,
-          cm.member_url,
-          cm.constituency
-        FROM committee_memberships cm
-        JOIN committees c ON c.id = cm.committee_id
-        WHERE cm.member_slug IN (?, ?)
-        ORDER BY c.name ASC, cm.role ASC
-        `,
-        [officialSlug, slug]
+      await streamRecordsJson(
+        res,
+        { ...summary, page: 1, pageSize: summary.total, nextCursor: null },
+        {
+          version,
+          sort: activeSort,
+          mapRow: parseRecord,
+          fetchBatch: (batchAfter, limit) =>
+            withDb(
+              (batchDb) => fetchReturnsById(batchDb, pageIds(batchAfter, limit)),
+              "/api/officials/[slug]"
+            )
+        }
       )
-    } catch (err) {
-      if (!String(err?.message || "").includes("no such table")) {
-        throw err
-      }
+      return
     }
 
-    // Compute unique filter options.
-    const uniqueLobbyists = Array.from(new Set(allRecords.map((r) => r.lobbyist_name).filter(Boolean))).sort()
-    const uniqueYears = Array.from(
-      new Set(allRaw.map((r) => String(r.period || "").trim().slice(-4)).filter((value) => /^\d{4}$/.test(value)))
-    ).sort((a, b) => b - a)
-    const uniqueMethods = Array.from(
-      new Set(allRecords.flatMap((r) => (r.lobbying_activities || []).map(extractMethod)).filter(Boolean))
-    ).sort()
+    // One extra row tells us whether a next page exists without a second query.
+    const rows = await fetchReturnsById(db, pageIds(afterValues, perPageNum + 1, offset))
+    const pageRows = rows.slice(0, perPageNum)
+    const nextCursor = rows.length > perPageNum ? encodeCursor(activeSort, pageRows[pageRows.length - 1]) : null
+    releaseDb(db)
+    db = undefined
+    if (summaryBuilt) {
+      await addOireachtasContacts(summary)
+      // Oireachtas contact details are fetched live, so these entries still expire.
+      writeCache(summaryKey, { summary, listing }, OFFICIAL_DETAIL_TTL_MS)
+    }
 
+    const { name, slug: officialSlug, total, ...rest } = summary
     const payload = {
-      name: canonical,
-      slug: slugify(canonical),
+      name,
+      slug: officialSlug,
       total,
       page: parseInt(page),
-      pageSize: returnAll ? records.length : perPageNum,
-      records: parsedRecords,
-      profile: {
-        name: canonical,
-        most_recent_title: mostRecent?.job_title || null,
-        most_recent_public_body: mostRecent?.public_body || null,
-        first_seen_at: firstSeen,
-        last_seen_at: lastSeen,
-        distinct_titles: distinctTitles,
-        distinct_public_bodies: distinctBodies,
-        oireachtas_profile: currentRosterMember
-          ? {
-              chamber: currentRosterMember.chamber || null,
-              member_url: currentRosterMember.member_url || null,
-              image_url: currentRosterMember.image_url || null,
-              party: currentRosterMember.party || null,
-              constituency: currentRosterMember.constituency || null,
-              emails: oireachtasContacts.emails || [],
-              phones: oireachtasContacts.phones || [],
-              social_links: oireachtasContacts.social_links || []
-            }
-          : null,
-        committee_memberships: committeeMemberships.map((committee) => ({
-          ...committee,
-          slug: committeeSlugify(committee.name)
-        }))
-      },
-      lobbyists: uniqueLobbyists,
-      years: uniqueYears,
-      methods: uniqueMethods,
-      currentFilters: {
-        lobbyistFilter: lobbyist || "",
-        yearFilter: year || "",
-        methodFilter: method || "",
-        officialScope: activeOfficialScope,
-        sort: activeSort
-      }
+      pageSize: perPageNum,
+      nextCursor,
+      records: pageRows.map(parseRecord),
+      ...rest
     }
 
-    writeCache(cacheKey, payload, 2 * 60 * 1000)
+    writeCache(cacheKey, payload, OFFICIAL_DETAIL_TTL_MS)
     res.setHeader("X-Data-Cache", "MISS")
-    res.status(200).json(payload)
+    sendJson(req, res, payload, { version })
   } catch (err) {
     console.error("Error in official detail API:", err)
-    res.status(500).json({ error: "Internal error", details: err.message })
+    if (res.headersSent) {
+      res.end()
+      return
+    }
+    res.status(errorStatus(res, err)).json({ error: "Internal error", details: err.message })
+  } finally {
+    releaseDb(db)
   }
 }
@@ -1,4 +1,6 @@
-import { getDb } from "../../../../lib/sqlite"
+import { acquireDb, errorStatus, partitionBranches, releaseDb } from "../../../../lib/sqlite"
+import { getDatasetVersion } from "../../../../lib/datasetVersion"
+import { sendJson } from "../../../../lib/httpCache"
 
 // Slugify function matching pages/api/officials/[slug].js
 function slugify(name) {
@@ -16,10 +18,12 @@ export default async function handler(req, res) {
     res.status(400).json({ error: "Missing slug" })
     return
   }
+  let db
   try {
-    const db = await getDb()
+    db = await acquireDb("/api/officials/[slug]/methods")
     // Resolve canonical official name from dpo_entries
-    const rows = await db.all(`SELECT DISTINCT person_name FROM dpo_entries`)
+    const names = partitionBranches(db, (schema) => `SELECT DISTINCT person_name FROM ${schema}.dpo_entries`)
+    const rows = await db.all(`SELECT DISTINCT person_name FROM (${names.sql}) ORDER BY person_name`, names.params)
     let canonical = null
     for (const row of rows) {
       if (slugify(row.person_name) === slug) {
@@ -30,16 +34,18 @@ export default async function handler(req, res) {
     if (!canonical) {
       return res.status(404).json({ error: "Official not found" })
     }
-    // Query for unique activities (methods) for this official via dpo_entries
-    const methodsRows = await db.all(
-      `SELECT lae.activity
-             FROM lobbying_activity_entries lae
-             JOIN dpo_entries dpo ON lae.lobbying_record_id = dpo.lobbying_record_id
+    // Query for unique activities (methods) for this official via dpo_entries, joined per partition schema
+    const branches = partitionBranches(
+      db,
+      (schema) => `SELECT lae.activity
+             FROM ${schema}.lobbying_activity_entries lae
+             JOIN ${schema}.dpo_entries dpo ON lae.lobbying_record_id = dpo.lobbying_record_id
              WHERE dpo.person_name = ?
                AND lae.activity IS NOT NULL
                AND TRIM(lae.activity) != ''`,
-      canonical
+      [canonical]
     )
+    const methodsRows = await db.all(branches.sql, branches.params)
     // Extract method from activity string (between first and second pipe) and count occurrences
     const methodCounts = {}
     methodsRows.forEach((row) => {
@@ -55,8 +61,10 @@ export default async function handler(req, res) {
         methodCounts[method] = (methodCounts[method] || 0) + 1
       }
     })
-    res.status(200).json({ methods: methodCounts, name: canonical })
+    sendJson(req, res, { methods: methodCounts, name: canonical }, { version: await getDatasetVersion(db) })
   } catch (err) {
-    res.status(500).json({ error: err.message })
+    res.status(errorStatus(res, err)).json({ error: err.message })
+  } finally {
+    releaseDb(db)
   }
 }
@@ -1,4 +1,6 @@
-import { getDb } from "../../../lib/sqlite"
+import { acquireDb, errorStatus, partitionBranches, releaseDb } from "../../../lib/sqlite"
+import { getDatasetVersion } from "../../../lib/datasetVersion"
+import { sendJson } from "../../../lib/httpCache"
 
 function slugify(name) {
   return name
@@ -18,9 +20,53 @@ function normalizeNameKey(name) {
     .trim()
 }
 
+const MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+// Mirrors period_start_key in parser.py: "1 Sep, 2025 to 31 Dec, 2025" starts on [2025, 9, 1].
+function periodStart(period) {
+  const match = String(period || "").match(/^\s*(\d{1,2}) (\w{3})\w*, (\d{4})/)
+  if (!match) return [0, 0, 0]
+  return [parseInt(match[3], 10), MONTHS.indexOf(match[2]) + 1, parseInt(match[1], 10)]
+}
+
+function comparePeriodStarts(a, b) {
+  const startA = periodStart(a)
+  const startB = periodStart(b)
+  return startA[0] - startB[0] || startA[1] - startB[1] || startA[2] - startB[2]
+}
+
+// parser.py precomputes the directory per year and per directory title set into official_summary. Returns null
+// when the requested title set was not precomputed (or the table is missing) so the caller can query live. On both
+// paths `periods` holds only the official's latest reporting period within the filter, not every period they appear
+// in, so the directory stays one row per official.
+async function readOfficialSummary(db, { year, allowedJobTitles }) {
+  const titleSet = allowedJobTitles ? allowedJobTitles.slice().sort().join(",") : ""
+  try {
+    const known = await db.get(`SELECT 1 AS found FROM official_summary WHERE title_set = ? LIMIT 1`, [titleSet])
+    if (!known) return null
+    const rows = await db.all(
+      `SELECT person_name, job_title, latest_period, return_count
+      FROM official_summary
+      WHERE title_set = ? AND year = ?`,
+      [titleSet, year || "all"]
+    )
+    return rows.map((row) => ({
+      name: row.person_name,
+      slug: slugify(row.person_name),
+      job_title: row.job_title,
+      periods: row.latest_period ? [row.latest_period] : [],
+      return_count: row.return_count
+    }))
+  } catch (err) {
+    if (String(err?.message || "").includes("no such table")) return null
+    throw err
+  }
+}
+
 export default async function handler(req, res) {
+  let db
   try {
-    const db = await getDb()
+    db = await acquireDb("/api/officials")
 
     const { period, year, job_titles } = req.query
     const hasYearFilter = typeof year === "string" && /^\d{4}$/.test(year)
@@ -37,159 +83,76 @@ export default async function handler(req, res) {
     if (allowedJobTitles && allowedJobTitles.length > 0) {
       jobTitleCondition = ` AND dpo.job_title IN (${allowedJobTitles.map(() => "?").join(",")}) `
     }
-    let rows
-    if (hasTimeFilter) {
-      rows = await db.all(
-        `
+
+    if (!hasPeriodFilter) {
+      const summary = await readOfficialSummary(db, {
+        year: hasYearFilter ? year : null,
+        allowedJobTitles: allowedJobTitles?.length ? allowedJobTitles : null
+      })
+      if (summary) {
+        const officials = summary.filter((off) => off.slug).sort((a, b) => a.name.localeCompare(b.name))
+        sendJson(req, res, officials, { version: await getDatasetVersion(db) })
+        return
+      }
+    }
+
+    // Single periods and ad hoc title lists are not precomputed. The dpo_entries join runs once per partition schema
+    // (see partitionBranches).
+    const entries = partitionBranches(
+      db,
+      (schema) => `
           SELECT
-            person_name,
-            job_title,
+            dpo.person_name,
+            dpo.job_title,
             lr.period,
+            lr.date_published,
             dpo.lobbying_record_id
-          FROM dpo_entries dpo
-          JOIN lobbying_records lr ON dpo.lobbying_record_id = lr.id
-          WHERE person_name IS NOT NULL AND TRIM(person_name) != ''
-            ${timeCondition}
-            ${jobTitleCondition}
-        `,
-        [...timeParams, ...(allowedJobTitles || [])]
-      )
-    } else {
-      rows = await db.all(
-        `
-          WITH ranked AS (
-            SELECT
-              dpo.person_name,
-              dpo.job_title,
-              lr.period,
-              dpo.lobbying_record_id,
-              CAST(substr(lr.period, 8, 4) AS INTEGER) AS year,
-              CASE substr(lr.period, 4, 3)
-                WHEN 'Jan' THEN 1
-                WHEN 'Feb' THEN 2
-                WHEN 'Mar' THEN 3
-                WHEN 'Apr' THEN 4
-                WHEN 'May' THEN 5
-                WHEN 'Jun' THEN 6
-                WHEN 'Jul' THEN 7
-                WHEN 'Aug' THEN 8
-                WHEN 'Sep' THEN 9
-                WHEN 'Oct' THEN 10
-                WHEN 'Nov' THEN 11
-                WHEN 'Dec' THEN 12
-                ELSE 0
-              END AS month,
-              ROW_NUMBER() OVER (
-                PARTITION BY dpo.person_name
-                ORDER BY CAST(substr(lr.period, 8, 4) AS INTEGER) DESC,
-                         CASE substr(lr.period, 4, 3)
-                           WHEN 'Jan' THEN 1
-                           WHEN 'Feb' THEN 2
-                           WHEN 'Mar' THEN 3
-                           WHEN 'Apr' THEN 4
-                           WHEN 'May' THEN 5
-                           WHEN 'Jun' THEN 6
-                           WHEN 'Jul' THEN 7
-                           WHEN 'Aug' THEN 8
-                           WHEN 'Sep' THEN 9
-                           WHEN 'Oct' THEN 10
-                           WHEN 'Nov' THEN 11
-                           WHEN 'Dec' THEN 12
-                           ELSE 0
-                         END DESC
-              ) AS rn
-            FROM dpo_entries dpo
-            JOIN lobbying_records lr ON dpo.lobbying_record_id = lr.id
-            WHERE dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
+          FROM ${schema}.dpo_entries dpo
+          JOIN ${schema}.lobbying_records lr ON dpo.lobbying_record_id = lr.id
+          WHERE dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
+            ${hasTimeFilter ? timeCondition : ""}
             ${jobTitleCondition}
-          )
-          SELECT person_name, job_title, period, lobbying_record_id
-          FROM ranked
-          WHERE rn = 1
         `,
-        allowedJobTitles || []
-      )
-    }
-
-    const countRows = await db.all(
-      `
-        SELECT dpo.person_name, dpo.lobbying_record_id
-        FROM dpo_entries dpo
-        JOIN lobbying_records lr ON dpo.lobbying_record_id = lr.id
-        WHERE dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-          ${hasTimeFilter ? timeCondition : ""}
-          ${jobTitleCondition}
-      `,
-      [...timeParams, ...(allowedJobTitles || [])]
+      [...(hasTimeFilter ? timeParams : []), ...(allowedJobTitles || [])]
     )
+    const rows = await db.all(entries.sql, entries.params)
 
-    const countMap = new Map()
-    for (const row of countRows) {
-      const key = normalizeNameKey(row.person_name)
-      if (!countMap.has(key)) countMap.set(key, new Set())
-      countMap.get(key).add(row.lobbying_record_id)
-    }
-
-    const nameMap = new Map()
+    // Spellings of one official are listed under the one on their latest return, ranked as build_official_summary
+    // in parser.py ranks them: by period start, then publication date, then id.
+    const latestFirst = (a, b) =>
+      comparePeriodStarts(b.period, a.period) ||
+      String(b.date_published || "").localeCompare(String(a.date_published || "")) ||
+      b.lobbying_record_id - a.lobbying_record_id
+    const byName = new Map()
     for (const row of rows) {
-      const ascii = normalizeNameKey(row.person_name)
-      if (!nameMap.has(ascii)) nameMap.set(ascii, [])
-      nameMap.get(ascii).push({
-        name: row.person_name,
-        job_title: row.job_title,
-        period: row.period,
-        return_count: countMap.get(ascii)?.size || 0
-      })
+      const key = normalizeNameKey(row.person_name)
+      const official = byName.get(key)
+      if (!official) {
+        byName.set(key, { latest: row, records: new Set([row.lobbying_record_id]) })
+        continue
+      }
+      official.records.add(row.lobbying_record_id)
+      if (latestFirst(row, official.latest) < 0) official.latest = row
     }
 
-    let officials
-    if (hasTimeFilter) {
-      officials = Array.from(nameMap.values()).map((variants) => {
-        const v = variants.slice().sort((a, b) => a.name.localeCompare(b.name))[0]
-        return {
-          name: v.name,
-          slug: slugify(v.name),
-          job_title: v.job_title,
-          periods: [v.period],
-          return_count: v.return_count
-        }
-      })
-    } else {
-      officials = Array.from(nameMap.values()).map((variants) => {
-        const best = variants.reduce((acc, cur) => {
-          const extract = (p) => {
-            const m = p.period.match(/(\d{1,2}) (\w+), (\d{4})/)
-            if (!m) return { year: 0, month: 0 }
-            const year = parseInt(m[3], 10)
-            const monthNames = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-            const month = monthNames.indexOf(m[2]) + 1
-            return { year, month }
-          }
-          const a = extract(acc)
-          const c = extract(cur)
-          if (c.year > a.year) return cur
-          if (c.year === a.year && c.month > a.month) return cur
-          return acc
-        })
-        return {
-          name: best.name,
-          slug: slugify(best.name),
-          job_title: best.job_title,
-          periods: Array.from(new Set(variants.map((v) => v.period).filter(Boolean))),
-          return_count: best.return_count
-        }
-      })
-    }
+    let officials = Array.from(byName.values(), ({ latest, records }) => ({
+      name: latest.person_name,
+      slug: slugify(latest.person_name),
+      job_title: latest.job_title,
+      periods: latest.period ? [latest.period] : [],
+      return_count: records.size
+    }))
 
     officials = officials.filter((off) => off && off.slug).sort((a, b) => a.name.localeCompare(b.name))
 
-    res.setHeader("Cache-Control", "public, max-age=3600, stale-while-revalidate=60")
-    res.status(200).json(officials)
+    sendJson(req, res, officials, { version: await getDatasetVersion(db) })
   } catch (err) {
     console.error("Error in officials index API:", err)
-    res.status(500).json({
+    res.status(errorStatus(res, err)).json({
       error: "Internal server error",
       details: err.message
     })
+  } finally {
+    releaseDb(db)
   }
 }
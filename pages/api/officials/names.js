@@ -1,11 +1,21 @@
-import { getDb } from "../../../lib/sqlite"
+import { acquireDb, errorStatus, partitionBranches, releaseDb } from "../../../lib/sqlite"
+import { getDatasetVersion } from "../../../lib/datasetVersion"
+import { sendJson } from "../../../lib/httpCache"
 
 export default async function handler(req, res) {
+  let db
   try {
-    const db = await getDb()
-    const rows = await db.all("SELECT DISTINCT person_name FROM dpo_entries")
-    res.status(200).json(rows)
-  } catch {
-    res.status(500).json({ error: "Database query failed" })
+    db = await acquireDb("/api/officials/names")
+    // Each partition schema lists its names from idx_dpo_person_name.
+    const branches = partitionBranches(db, (schema) => `SELECT DISTINCT person_name FROM ${schema}.dpo_entries`)
+    const rows = await db.all(
+      `SELECT DISTINCT person_name FROM (${branches.sql}) ORDER BY person_name`,
+      branches.params
+    )
+    sendJson(req, res, rows, { version: await getDatasetVersion(db) })
+  } catch (err) {
+    res.status(errorStatus(res, err)).json({ error: "Database query failed" })
+  } finally {
+    releaseDb(db)
   }
 }
@@ -1,22 +1,32 @@
-import { getDb } from "../../lib/sqlite"
+import { acquireDb, errorStatus, partitionBranches, releaseDb } from "../../lib/sqlite"
+import { getDatasetVersion } from "../../lib/datasetVersion"
+import { sendJson } from "../../lib/httpCache"
 
 export default async function handler(req, res) {
+  let db
   try {
-    const db = await getDb()
-    // Get the most recent period by date_published
-    const row = await db.get(
-      `SELECT period FROM lobbying_records WHERE period IS NOT NULL AND period != '' ORDER BY date_published DESC LIMIT 1`
+    db = await acquireDb("/api/periods-latest")
+    // Get the most recent period by date_published, from each partition schema's newest return
+    const latest = partitionBranches(
+      db,
+      (schema) => `
+        SELECT * FROM (
+          SELECT period, date_published FROM ${schema}.lobbying_records
+          WHERE period IS NOT NULL AND period != '' ORDER BY date_published DESC LIMIT 1
+        )`
     )
+    const row = await db.get(`SELECT period FROM (${latest.sql}) ORDER BY date_published DESC LIMIT 1`, latest.params)
     if (row && row.period) {
-      res.setHeader("Cache-Control", "public, max-age=3600, stale-while-revalidate=60")
-      res.status(200).json({ period: row.period })
+      sendJson(req, res, { period: row.period }, { version: await getDatasetVersion(db) })
     } else {
       res.status(404).json({ error: "No period found" })
     }
   } catch (err) {
-    res.status(500).json({
+    res.status(errorStatus(res, err)).json({
       error: "Internal server error",
       details: err.message
     })
+  } finally {
+    releaseDb(db)
   }
 }
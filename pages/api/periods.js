@@ -1,9 +1,12 @@
 // /api/periods.js - Returns all available periods from the database
-import { getDb } from "../../lib/sqlite"
+import { acquireDb, errorStatus, releaseDb } from "../../lib/sqlite"
+import { getDatasetVersion } from "../../lib/datasetVersion"
+import { sendJson } from "../../lib/httpCache"
 
 export default async function handler(req, res) {
+  let db
   try {
-    const db = await getDb()
+    db = await acquireDb("/api/periods")
     // Get all unique periods, ordered by date_published ascending
     const rows = await db.all(
       `SELECT DISTINCT period FROM lobbying_records WHERE period IS NOT NULL AND period != '' ORDER BY date_published ASC`
@@ -12,12 +15,13 @@ export default async function handler(req, res) {
     const periods = rows
       .map((row) => row.period)
       .filter((p) => typeof p === "string" && p.trim() && p.trim().toLowerCase() !== "false")
-    res.setHeader("Cache-Control", "public, max-age=3600, stale-while-revalidate=60")
-    res.status(200).json({ periods })
+    sendJson(req, res, { periods }, { version: await getDatasetVersion(db) })
   } catch (err) {
-    res.status(500).json({
+    res.status(errorStatus(res, err)).json({
       error: "Failed to list periods",
       details: err.message
     })
+  } finally {
+    releaseDb(db)
   }
 }
@@ -1,25 +1,31 @@
-import { getDb } from "../../lib/sqlite"
+import { acquireDb, errorStatus, partitionBranches, releaseDb } from "../../lib/sqlite"
+import { getDatasetVersion } from "../../lib/datasetVersion"
+import { sendJson } from "../../lib/httpCache"
 
 export default async function handler(req, res) {
+  let db
   try {
-    const db = await getDb()
-    const rows = await db.all(
-      `
+    db = await acquireDb("/api/years")
+    // Each partition schema lists its years from idx_lr_year.
+    const branches = partitionBranches(
+      db,
+      (schema) => `
       SELECT DISTINCT substr(TRIM(period), -4) AS year
-      FROM lobbying_records
+      FROM ${schema}.lobbying_records
       WHERE period IS NOT NULL
         AND substr(TRIM(period), -4) GLOB '[0-9][0-9][0-9][0-9]'
-      ORDER BY year ASC
       `
     )
+    const rows = await db.all(`SELECT DISTINCT year FROM (${branches.sql}) ORDER BY year ASC`, branches.params)
     const years = rows.map((row) => row.year).filter(Boolean)
 
-    res.setHeader("Cache-Control", "public, max-age=3600, stale-while-revalidate=60")
-    res.status(200).json({ years, latestYear: years.at(-1) || "" })
+    sendJson(req, res, { years, latestYear: years.at(-1) || "" }, { version: await getDatasetVersion(db) })
   } catch (err) {
-    res.status(500).json({
+    res.status(errorStatus(res, err)).json({
       error: "Failed to list years",
       details: err.message
     })
+  } finally {
+    releaseDb(db)
   }
 }
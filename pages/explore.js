@@ -6,6 +6,28 @@ import { BarElement, CategoryScale, Chart, Legend, LinearScale, Tooltip } from "
 
 Chart.register(CategoryScale, LinearScale, BarElement, Tooltip, Legend)
 
+// Network rankings computed at build time (graph_centrality); field selects the API list, valueKey the column shown.
+const CENTRALITY_MEASURES = {
+  degree: {
+    label: "Degree",
+    field: "centrality",
+    valueKey: "degree",
+    subtitle: "Unique counterpart count (degree centrality)"
+  },
+  influence: {
+    label: "Influence",
+    field: "influence",
+    valueKey: "influence",
+    subtitle: "Share of PageRank (%): reach weighted by how well connected each counterpart is"
+  },
+  brokerage: {
+    label: "Brokerage",
+    field: "brokerage",
+    valueKey: "brokerage",
+    subtitle: "Share of shortest paths through the node (%, approximate betweenness)"
+  }
+}
+
 function formatCount(value) {
   return new Intl.NumberFormat("en-US").format(value || 0)
 }
@@ -181,6 +203,7 @@ export default function ExplorePage() {
   const [latestYear, setLatestYear] = useState("")
   const [moversView, setMoversView] = useState("officials")
   const [centralityView, setCentralityView] = useState("officials")
+  const [centralityMeasure, setCentralityMeasure] = useState("degree")
   const selectedYearRef = useRef("")
 
   useEffect(() => {
@@ -260,8 +283,9 @@ export default function ExplorePage() {
   const lobbyistActivityItems = data?.top_lobbyists_selected || []
   const moversItems =
     moversView === "officials" ? data?.biggest_mover_officials || [] : data?.biggest_mover_lobbyists || []
-  const centralityItems =
-    centralityView === "officials" ? data?.official_centrality_selected || [] : data?.lobbyist_centrality_selected || []
+  const centralityMeasureConfig = CENTRALITY_MEASURES[centralityMeasure]
+  const centralityEntity = centralityView === "officials" ? "official" : "lobbyist"
+  const centralityItems = data?.[`${centralityEntity}_${centralityMeasureConfig.field}_selected`] || []
   const centralityLinkPrefix = centralityView === "officials" ? "/officials" : "/lobbyists"
   const moversLinkPrefix = moversView === "officials" ? "/officials" : "/lobbyists"
 
@@ -441,20 +465,37 @@ export default function ExplorePage() {
 
             <SectionCard
               title="Network Centrality"
-              subtitle="Unique counterpart count (degree centrality)"
+              subtitle={centralityMeasureConfig.subtitle}
               controls={
-                <SegmentTabs
-                  tabs={[
-                    { key: "officials", label: "Officials" },
-                    { key: "lobbyists", label: "Lobbyists" }
-                  ]}
-                  active={centralityView}
-                  onChange={setCentralityView}
-                />
+                <div className="flex flex-wrap gap-2">
+                  <SegmentTabs
+                    tabs={[
+                      { key: "officials", label: "Officials" },
+                      { key: "lobbyists", label: "Lobbyists" }
+                    ]}
+                    active={centralityView}
+                    onChange={setCentralityView}
+                  />
+                  <SegmentTabs
+                    tabs={Object.entries(CENTRALITY_MEASURES).map(([key, { label }]) => ({ key, label }))}
+                    active={centralityMeasure}
+                    onChange={setCentralityMeasure}
+                  />
+                </div>
               }
             >
-              <RankList items={centralityItems} valueKey="degree" linkPrefix={centralityLinkPrefix} loading={loading} />
-              <CompactBarChart items={centralityItems} valueKey="degree" title="Degree" loading={loading} />
+              <RankList
+                items={centralityItems}
+                valueKey={centralityMeasureConfig.valueKey}
+                linkPrefix={centralityLinkPrefix}
+                loading={loading}
+              />
+              <CompactBarChart
+                items={centralityItems}
+                valueKey={centralityMeasureConfig.valueKey}
+                title={centralityMeasureConfig.label}
+                loading={loading}
+              />
             </SectionCard>
 
               <SectionCard title="Top Policy Areas" subtitle={timeRangeLabel}>
@@ -2,6 +2,7 @@ import { useRouter } from "next/router"
 import Head from "next/head"
 import Select from "react-select"
 import LobbyingCardLobbyist from "../../components/LobbyingCardLobbyist"
+import SimilarEntities from "../../components/SimilarEntities"
 import { useState, useEffect, useMemo } from "react"
 import { Share2 } from "lucide-react"
 import { getServerBaseUrl } from "../../lib/serverBaseUrl"
@@ -53,6 +54,7 @@ export default function LobbyistPage({ lobbyistData, fetchError }) {
     officials = [],
     years = [],
     methods = [],
+    similar = [],
     currentFilters
   } = lobbyistData || {}
 
@@ -181,6 +183,16 @@ export default function LobbyistPage({ lobbyistData, fetchError }) {
           </div>
         </header>
         <main className="max-w-7xl mx-auto px-4 py-8">
+          <section className="surface-card mb-6">
+            <SimilarEntities
+              title="Lobbyists Contacting Similar Officials"
+              items={similar}
+              linkPrefix="/lobbyists"
+              counterpartLabel="officials"
+              emptyLabel="No lobbyists with a similar set of officials."
+              className=""
+            />
+          </section>
           <div className="surface-card mb-6 flex flex-col sm:flex-row gap-6 items-end">
             {/* Official filter */}
             <div className="w-64 accent-blue-600 dark:accent-blue-400">
@@ -3,6 +3,7 @@ import Head from "next/head"
 import Image from "next/image"
 import Select from "react-select"
 import LobbyingCard from "../../components/LobbyingCard"
+import SimilarEntities from "../../components/SimilarEntities"
 import { useState, useEffect, useMemo } from "react"
 import { Share2 } from "lucide-react"
 import { getServerBaseUrl } from "../../lib/serverBaseUrl"
@@ -82,6 +83,7 @@ export default function OfficialPage({ officialData }) {
     pageSize = 10,
     profile = null,
     lobbyists = [],
+    similar = [],
     years = [],
     methods = [],
     currentFilters = {}
@@ -405,6 +407,14 @@ export default function OfficialPage({ officialData }) {
                 <p className="text-sm text-muted-ui">No current committee memberships matched for this official.</p>
               )}
             </div>
+
+            <SimilarEntities
+              title="Officials Lobbied by Similar Lobbyists"
+              items={similar}
+              linkPrefix="/officials"
+              counterpartLabel="lobbyists"
+              emptyLabel="No officials with a similar set of lobbyists."
+            />
           </section>
 
           {/* Filters Bar at Top */}
@@ -1,13 +1,20 @@
 import os
 import glob
+import argparse
 import csv
+import hashlib
 import json
+import math
+import random
 import re
 import sqlite3
+import sys
 import unicodedata
-from collections import defaultdict, Counter
+from array import array
+from collections import defaultdict, deque, Counter
 from datetime import datetime, timezone
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Boolean, Text, text, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, Float, String, DateTime, Boolean, Text, LargeBinary, text, ForeignKey
+from sqlalchemy import select, insert, update, delete, event
 from sqlalchemy.orm import declarative_base, sessionmaker, relationship
 
 # --- Config ---
@@ -16,6 +23,21 @@ DATABASE_URL = "sqlite:///lobbying.db"
 DERIVED_FOLDER = os.path.join("data", "derived")
 PRECOMPUTED_INSIGHTS_PATH = os.path.join(DERIVED_FOLDER, "explore_insights.json")
 COMMITTEE_MEMBERSHIPS_PATH = os.path.join(DERIVED_FOLDER, "committee_memberships.json")
+CURRENT_MEMBERS_PATH = os.path.join(DERIVED_FOLDER, "current_oireachtas_members.json")
+# Reviewed merge proposals from scripts/detect_name_variants.py; kept out of DATA_FOLDER's *.csv glob.
+NAME_VARIANTS_PATH = os.path.join(DATA_FOLDER, "overrides", "name_variants.csv")
+# With `--partition-years`, returns for years before the latest OPEN_PARTITION_YEARS are moved once into their own
+# database in PARTITION_FOLDER and attached from then on (see create_year_partitions). The previous year stays open
+# because its last returns are filed in January.
+PARTITION_FOLDER = "partitions"
+OPEN_PARTITION_YEARS = 2
+
+# Job title filters the official directories request from /api/officials (pages/dail.js); each is precomputed into
+# official_summary alongside the unfiltered directory.
+OFFICIAL_DIRECTORY_TITLES = {
+    "dail": ["TD", "An Tánaiste", "An Taoiseach", "Minister", "Minister of State", "Tánaiste and Minister"],
+    "seanad": ["Senator"],
+}
 
 BANNED_NAMES = [
     "Skill Set Strategy Consultants", 
@@ -131,6 +153,31 @@ for canonical, variants in NAME_CANONICALIZATION.items():
     for v in variants:
         NAME_VARIANT_TO_CANONICAL[to_ascii(v)] = canonical
 
+def load_accepted_name_variants(path=NAME_VARIANTS_PATH):
+    """Accepted rows of the reviewed override file as {kind: {variant: canonical}}, with chains (a -> b -> c)
+    resolved to the final canonical name."""
+    accepted = {"official": {}, "lobbyist": {}}
+    if not os.path.exists(path):
+        return accepted
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if (row.get("status") or "").strip().lower() == "accept" and row.get("kind") in accepted:
+                accepted[row["kind"]][row["variant"].strip()] = row["canonical"].strip()
+    for mapping in accepted.values():
+        for variant in list(mapping):
+            seen = {variant}
+            canonical = mapping[variant]
+            while canonical in mapping and canonical not in seen:
+                seen.add(canonical)
+                canonical = mapping[canonical]
+            mapping[variant] = canonical
+    return accepted
+
+ACCEPTED_NAME_VARIANTS = load_accepted_name_variants()
+# NAME_CANONICALIZATION entries take precedence over detected variants.
+for variant, canonical in ACCEPTED_NAME_VARIANTS["official"].items():
+    NAME_VARIANT_TO_CANONICAL.setdefault(to_ascii(variant), canonical)
+
 STOPWORDS = {
     "the", "and", "for", "with", "from", "that", "this", "into", "their", "about", "were", "was", "are", "has",
     "have", "had", "been", "will", "would", "could", "should", "its", "our", "out", "new", "all", "any", "can",
@@ -141,12 +188,23 @@ STOPWORDS = {
 # --- Database Setup ---
 Base = declarative_base()
 
+class Lobbyist(Base):
+    __tablename__ = "lobbyists"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String)  # most common spelling
+    slug = Column(String, unique=True)  # /lobbyists/[slug]; spellings with the same slug are one lobbyist
+    variants = Column(Text)  # JSON list of every spelling in the returns, most common first
+    return_count = Column(Integer)
+
+NO_OFFICIALS_SORT_KEY = -(2 ** 31)
+
 class LobbyingRecord(Base):
     __tablename__ = "lobbying_records"
     id = Column(Integer, primary_key=True, autoincrement=True)
     csv_id = Column(String)
     url = Column(String, unique=True)
     lobbyist_name = Column(String)
+    lobbyist_id = Column(Integer, ForeignKey("lobbyists.id"))
     date_published = Column(DateTime)
     period = Column(String)
     relevant_matter = Column(String)
@@ -161,6 +219,14 @@ class LobbyingRecord(Base):
     grassroots_directive = Column(String)
     lobbying_on_behalf = Column(Boolean)
     clients = Column(Text)
+    official_count = Column(Integer, default=0)
+    # Descending sort key for "fewest officials" listings: -official_count, and NO_OFFICIALS_SORT_KEY for returns
+    # naming no official so they come last. Every listing sort is then one direction (see lib/returnPagination.js).
+    fewest_officials_key = Column(Integer, default=NO_OFFICIALS_SORT_KEY)
+    # Prejoined copies of the record's dpo_entries ({person_name, job_title, public_body}) and activity strings as
+    # JSON arrays, so listing pages read them with the row instead of aggregating the child tables per request.
+    dpo_entries_json = Column(Text, default="[]")
+    activities_json = Column(Text, default="[]")
 
     dpo_entries = relationship("DPOEntry", back_populates="lobbying_record", cascade="all, delete-orphan")
     activity_entries = relationship("LobbyingActivityEntry", back_populates="lobbying_record", cascade="all, delete-orphan")
@@ -207,10 +273,239 @@ class CommitteeMembership(Base):
     phones = Column(String)
     scraped_at = Column(String)
 
-engine = create_engine(DATABASE_URL, echo=False)
-Base.metadata.drop_all(engine)
-Base.metadata.create_all(engine)
-Session = sessionmaker(bind=engine)
+class CommitteeMembershipChange(Base):
+    __tablename__ = "committee_membership_changes"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    committee_url = Column(String)
+    committee_name = Column(String)
+    member_slug = Column(String)
+    member_name = Column(String)
+    role = Column(String)
+    change_type = Column(String)  # joined, left or updated
+    changed_at = Column(String)
+
+class DatasetMetadata(Base):
+    __tablename__ = "dataset_metadata"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    dataset_version = Column(String)
+    built_at = Column(String)
+    total_returns = Column(Integer)
+    total_periods = Column(Integer)
+    total_lobbyists = Column(Integer)
+    total_officials = Column(Integer)
+    earliest_period = Column(String)
+    latest_period = Column(String)
+    first_published_at = Column(String)
+    last_published_at = Column(String)
+
+class OfficialSummary(Base):
+    __tablename__ = "official_summary"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    person_name = Column(String)
+    year = Column(String)  # "all" or a four digit year
+    title_set = Column(String)  # sorted, comma-joined job titles; "" for every title
+    job_title = Column(String)
+    latest_period = Column(String)
+    return_count = Column(Integer)
+
+class OfficialLink(Base):
+    __tablename__ = "official_links"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    person_name = Column(String)
+    official_slug = Column(String)  # /officials/[slug]
+    roster_slug = Column(String)  # slug in current_oireachtas_members.json, if a current member
+    member_slug = Column(String)  # committee_memberships.member_slug, if on a committee
+    return_count = Column(Integer)
+    # Profile for the detail page, from the official's returns that have a date_published: the first and last
+    # date_published, the title and public body on the most recent return, and every title and public body as sorted
+    # JSON lists.
+    first_seen_at = Column(String)
+    last_seen_at = Column(String)
+    most_recent_title = Column(String)
+    most_recent_public_body = Column(String)
+    job_titles = Column(Text)
+    public_bodies = Column(Text)
+
+# Per-period rollups for trend charts and period-over-period comparisons. period_start is the period's first day
+# (YYYY-MM-DD, "" when the label does not parse) so series sort chronologically; method_counts is a JSON object of
+# activity method -> number of activities.
+class OfficialPeriodRollup(Base):
+    __tablename__ = "official_period_rollups"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    person_name = Column(String)
+    period = Column(String)
+    period_start = Column(String)
+    return_count = Column(Integer)
+    lobbyist_count = Column(Integer)  # distinct lobbyists on those returns
+    method_counts = Column(Text)
+
+class LobbyistPeriodRollup(Base):
+    __tablename__ = "lobbyist_period_rollups"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    lobbyist_id = Column(Integer, ForeignKey("lobbyists.id"))
+    period = Column(String)
+    period_start = Column(String)
+    return_count = Column(Integer)
+    official_count = Column(Integer)  # distinct officials named on those returns
+    method_counts = Column(Text)
+
+class PolicyAreaPeriodRollup(Base):
+    __tablename__ = "policy_area_period_rollups"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    public_policy_area = Column(String)
+    period = Column(String)
+    period_start = Column(String)
+    return_count = Column(Integer)
+
+# Per official, the ids of their returns carrying each facet value, so the detail page filters by intersecting
+# lists instead of joining dpo_entries and lobbying_activity_entries. Facets: "all" and "single" (returns naming only
+# this official) with value "", "year", "method", "lobbyist" and "job_title" (the official's title on the return).
+# record_ids is the ascending ids packed as little-endian uint32, except for facet "order", whose rows hold every
+# return of the official in the listing order named by value (see LISTING_ORDERS), so a page is a slice of it.
+class OfficialFacet(Base):
+    __tablename__ = "official_facets"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    person_name = Column(String)
+    facet = Column(String)
+    value = Column(String)
+    record_count = Column(Integer)
+    record_ids = Column(LargeBinary)
+
+# Network measures per node of the official-lobbyist graph, for each year and for "all" years. pagerank sums to 1
+# over a graph; hits is the authority score for officials and the hub score for lobbyists; betweenness is the share
+# of shortest paths through the node, estimated from GRAPH_BETWEENNESS_SAMPLES sources.
+GRAPH_BETWEENNESS_SAMPLES = 128
+
+class GraphCentrality(Base):
+    __tablename__ = "graph_centrality"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String)  # official or lobbyist
+    name = Column(String)
+    slug = Column(String)  # profile slug: official_slugify for officials, lobbyists.slug for lobbyists
+    year = Column(String)  # "all" or a four digit year
+    degree = Column(Integer)  # distinct counterparts
+    weighted_degree = Column(Integer)  # returns linking the node to its counterparts
+    pagerank = Column(Float)
+    hits = Column(Float)
+    betweenness = Column(Float)
+
+# Officials lobbied by similar sets of lobbyists, and lobbyists that lobbied similar sets of officials: the
+# SIMILAR_NEIGHBOURS nearest entities per entity, year and "all" years, found with MinHash and LSH banding.
+MINHASH_PERMUTATIONS = 128
+LSH_BANDS = 32
+SIMILAR_NEIGHBOURS = 10
+SIMILAR_MIN_JACCARD = 0.2
+SIMILAR_MIN_COUNTERPARTS = 3
+SIMILAR_MAX_BUCKET = 200
+
+class SimilarEntity(Base):
+    __tablename__ = "similar_entities"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    entity_type = Column(String)  # official or lobbyist
+    entity_key = Column(String)  # dpo_entries.person_name for officials, lobbyists.slug for lobbyists
+    year = Column(String)  # "all" or a four digit year
+    rank = Column(Integer)
+    similar_name = Column(String)
+    similar_slug = Column(String)  # profile slug of the similar entity
+    jaccard = Column(Float)  # estimated Jaccard similarity of the two counterpart sets
+    counterpart_count = Column(Integer)  # size of the similar entity's counterpart set
+
+# Aggregates behind data/derived/explore_insights.json, one row per period. Like the committee tables this persists
+# between builds: a period's partial is only recomputed when its records change.
+EXPLORE_PARTIALS_VERSION = 1  # bump when the partial layout changes
+
+class ExplorePeriodPartial(Base):
+    __tablename__ = "explore_period_partials"
+    period = Column(String, primary_key=True)
+    fingerprint = Column(String)
+    latest_date = Column(String)
+    payload = Column(Text)  # JSON
+
+# Closed years stored in their own database file (path relative to lobbying.db). Record ids stay unique across
+# files: returns ingested later are numbered after last_record_id.
+class YearPartition(Base):
+    __tablename__ = "year_partitions"
+    year = Column(String, primary_key=True)
+    path = Column(String)
+    record_count = Column(Integer)
+    first_record_id = Column(Integer)
+    last_record_id = Column(Integer)
+    built_at = Column(String)
+
+# Committee tables persist between builds so memberships can be diffed rather than reinserted. Ingest recreates
+# every rebuilt table; precompute recreates only the derived ones, so it can be rerun on its own.
+INGESTED_TABLES = [
+    Lobbyist.__table__,
+    LobbyingRecord.__table__,
+    DPOEntry.__table__,
+    LobbyingActivityEntry.__table__,
+]
+DERIVED_TABLES = [
+    DatasetMetadata.__table__,
+    OfficialSummary.__table__,
+    OfficialLink.__table__,
+    OfficialPeriodRollup.__table__,
+    LobbyistPeriodRollup.__table__,
+    PolicyAreaPeriodRollup.__table__,
+    OfficialFacet.__table__,
+    GraphCentrality.__table__,
+    SimilarEntity.__table__,
+]
+REBUILT_TABLES = INGESTED_TABLES + DERIVED_TABLES
+# Tables split across the year partitions; every other table lives in lobbying.db only.
+PARTITIONED_TABLES = [LobbyingRecord.__table__, DPOEntry.__table__, LobbyingActivityEntry.__table__]
+
+# Importing this module does not touch lobbying.db: the engine is created by connect_database(), which the command
+# line entry point calls before running any step.
+engine = None
+Session = sessionmaker()
+# Set while the derived tables are built, so reads of the partitioned tables see every year (see
+# use_partition_views). Ingest writes to the tables in lobbying.db itself, which the views would shadow.
+partition_views = False
+
+def partition_schema(year):
+    return f"partition_{year}"
+
+def attach_year_partitions(conn, views):
+    """Attaches every registered year partition to a sqlite3 connection and, with `views`, shadows the partitioned
+    tables with TEMP views that UNION ALL them with lobbying.db's own rows. lib/sqlite.js does the same for the API,
+    and scripts/year_partitions.py, read-only, for the scripts that inspect a built database."""
+    try:
+        partitions = conn.execute("SELECT year, path FROM year_partitions ORDER BY year").fetchall()
+    except sqlite3.OperationalError:
+        return
+    for year, path in partitions:
+        conn.execute(f"ATTACH DATABASE ? AS {partition_schema(year)}", (path,))
+    if views and partitions:
+        schemas = ["main"] + [partition_schema(year) for year, _ in partitions]
+        for table in PARTITIONED_TABLES:
+            branches = " UNION ALL ".join(f"SELECT * FROM {schema}.{table.name}" for schema in schemas)
+            conn.execute(f"CREATE TEMP VIEW {table.name} AS {branches}")
+
+def connect_database(url=DATABASE_URL):
+    global engine
+    if engine is None:
+        engine = create_engine(url, echo=False)
+        Session.configure(bind=engine)
+        event.listen(engine, "connect", lambda conn, _: attach_year_partitions(conn, partition_views))
+        Base.metadata.create_all(engine)
+    return engine
+
+def use_partition_views(enabled):
+    global partition_views
+    partition_views = enabled
+    # Pooled connections were set up for the previous mode (and partition list).
+    engine.dispose()
+
+def open_database():
+    """sqlite3 connection for builders that bypass SQLAlchemy, set up like the engine's connections."""
+    conn = sqlite3.connect("lobbying.db")
+    attach_year_partitions(conn, partition_views)
+    return conn
+
+def recreate_tables(tables):
+    Base.metadata.drop_all(engine, tables=tables)
+    Base.metadata.create_all(engine, tables=tables)
 
 # --- Helper Functions ---
 def safe_get(row, key):
@@ -241,6 +536,13 @@ def slugify(value):
     value = re.sub(r"-+", "-", value)
     return value.strip("-")
 
+def lobbyist_slugify(value):
+    # Mirrors lobbyistSlugify in the API: accents are decomposed and, like any other non-alphanumeric run, become
+    # a dash, so existing /lobbyists/[slug] URLs keep resolving.
+    value = unicodedata.normalize("NFD", str(value or ""))
+    value = "".join(ch if unicodedata.category(ch)[0] in "LN" else "-" for ch in value)
+    return re.sub(r"-+", "-", value).strip("-").lower()
+
 def official_slugify(value):
     value = unicodedata.normalize("NFD", str(value or ""))
     value = "".join(ch for ch in value if unicodedata.category(ch) != "Mn")
@@ -292,265 +594,242 @@ def biggest_movers(current_rows, previous_rows):
 def rows_with_slug(rows):
     return [{**row, "slug": slugify(row["name"])} for row in rows]
 
-def build_explore_precomputed():
-    conn = sqlite3.connect("lobbying.db")
-    conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-    try:
-        periods = cur.execute(
-            """
-            SELECT period, MAX(date_published) AS latest_date
-            FROM lobbying_records
-            WHERE period IS NOT NULL AND TRIM(period) != ''
-            GROUP BY period
-            ORDER BY latest_date DESC
-            """
-        ).fetchall()
-
-        latest_period = periods[0]["period"] if periods else None
-        previous_period = periods[1]["period"] if len(periods) > 1 else None
+def explore_period_fingerprints(cur):
+    """Content fingerprint and latest publication date of every period. Row digests are summed, so the result does
+    not depend on row order and needs no sort; a period's partial is reused while its fingerprint is unchanged."""
+    digests = defaultdict(int)
+    counts = Counter()
+    latest_dates = {}
+    rows = cur.execute(
+        """
+        SELECT
+          period, url, lobbyist_name, public_policy_area, date_published, dpo_entries_json,
+          subject_matter, intended_results, specific_details, relevant_matter
+        FROM lobbying_records
+        WHERE period IS NOT NULL AND TRIM(period) != ''
+        """
+    )
+    for row in rows:
+        period, date_published = row[0], row[4]
+        digest = hashlib.sha1(json.dumps(list(row), ensure_ascii=False, default=str).encode("utf-8")).digest()
+        digests[period] = (digests[period] + int.from_bytes(digest[:16], "big")) % (1 << 128)
+        counts[period] += 1
+        if date_published is not None and (latest_dates.get(period) is None or date_published > latest_dates[period]):
+            latest_dates[period] = date_published
+    return {
+        period: (f"{EXPLORE_PARTIALS_VERSION}:{counts[period]}:{digest:032x}", latest_dates.get(period))
+        for period, digest in digests.items()
+    }
 
-        def fetch_rows(query, params=()):
-            return [dict(r) for r in cur.execute(query, params).fetchall()]
+def compute_explore_partial(cur, period):
+    """Aggregates of one period that the explore views are merged from: returns per official, lobbyist and policy
+    area, the officials each lobbyist named (the official-lobbyist edges) and keyword counts."""
+    official_returns = Counter()
+    lobbyist_returns = Counter()
+    lobbyist_officials = defaultdict(set)
+    policy_areas = Counter()
+    keywords = Counter()
+    rows = cur.execute(
+        """
+        SELECT
+          lobbyist_name, public_policy_area, dpo_entries_json,
+          COALESCE(subject_matter, '') AS subject_matter,
+          COALESCE(intended_results, '') AS intended_results,
+          COALESCE(specific_details, '') AS specific_details,
+          COALESCE(relevant_matter, '') AS relevant_matter
+        FROM lobbying_records
+        WHERE period = ?
+        """,
+        (period,),
+    )
+    for row in rows:
+        officials = {
+            entry["person_name"]
+            for entry in json.loads(row["dpo_entries_json"] or "[]")
+            if entry.get("person_name") and entry["person_name"].strip()
+        }
+        official_returns.update(officials)
+        lobbyist = row["lobbyist_name"]
+        if lobbyist and lobbyist.strip():
+            lobbyist_returns[lobbyist] += 1
+            lobbyist_officials[lobbyist].update(officials)
+        area = row["public_policy_area"]
+        if area and area.strip():
+            policy_areas[area] += 1
+        text_blob = " ".join([
+            row["subject_matter"], row["intended_results"], row["specific_details"], row["relevant_matter"]
+        ])
+        for raw in text_blob.split():
+            token = normalize_token(raw)
+            if token:
+                keywords[token] += 1
+    return {
+        "official_returns": dict(official_returns),
+        "lobbyist_returns": dict(lobbyist_returns),
+        "lobbyist_officials": {name: sorted(names) for name, names in lobbyist_officials.items()},
+        "policy_areas": dict(policy_areas),
+        "keywords": dict(keywords),
+    }
 
-        top_targets_latest = fetch_rows(
+def load_explore_partials(conn):
+    """Per-period partials for the current records, reusing the stored ones whose fingerprint still matches and
+    computing the rest, so a build that adds one period aggregates that period alone."""
+    cur = conn.cursor()
+    fingerprints = explore_period_fingerprints(cur)
+    stored = {
+        row["period"]: row
+        for row in cur.execute("SELECT period, fingerprint, payload FROM explore_period_partials").fetchall()
+    }
+    partials = {}
+    computed = 0
+    for period, (fingerprint, latest_date) in fingerprints.items():
+        row = stored.get(period)
+        if row is not None and row["fingerprint"] == fingerprint:
+            partials[period] = json.loads(row["payload"])
+            continue
+        partials[period] = compute_explore_partial(cur, period)
+        computed += 1
+        cur.execute(
             """
-            SELECT dpo.person_name AS name, COUNT(DISTINCT lr.id) AS contact_count
-            FROM dpo_entries dpo
-            JOIN lobbying_records lr ON lr.id = dpo.lobbying_record_id
-            WHERE lr.period = ? AND dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-            GROUP BY dpo.person_name
-            ORDER BY contact_count DESC, dpo.person_name ASC
-            LIMIT 20
+            INSERT OR REPLACE INTO explore_period_partials (period, fingerprint, latest_date, payload)
+            VALUES (?, ?, ?, ?)
             """,
-            (latest_period,),
-        ) if latest_period else []
-
-        top_targets_last_year = fetch_rows(
-            """
-            SELECT dpo.person_name AS name, COUNT(DISTINCT lr.id) AS contact_count
-            FROM dpo_entries dpo
-            JOIN lobbying_records lr ON lr.id = dpo.lobbying_record_id
-            WHERE lr.date_published >= datetime('now', '-1 year')
-              AND dpo.person_name IS NOT NULL
-              AND TRIM(dpo.person_name) != ''
-            GROUP BY dpo.person_name
-            ORDER BY contact_count DESC, dpo.person_name ASC
-            LIMIT 20
-            """
+            (period, fingerprint, latest_date, json.dumps(partials[period], ensure_ascii=False)),
         )
+    for period in stored.keys() - fingerprints.keys():
+        cur.execute("DELETE FROM explore_period_partials WHERE period = ?", (period,))
+    conn.commit()
+    latest_dates = {period: latest_date for period, (_, latest_date) in fingerprints.items()}
+    return partials, latest_dates, computed
 
-        top_lobbyists_latest = fetch_rows(
-            """
-            SELECT
-              lr.lobbyist_name AS name,
-              COUNT(DISTINCT lr.id) AS return_count,
-              COUNT(DISTINCT dpo.person_name) AS unique_targets
-            FROM lobbying_records lr
-            LEFT JOIN dpo_entries dpo ON dpo.lobbying_record_id = lr.id
-            WHERE lr.period = ? AND lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-            GROUP BY lr.lobbyist_name
-            ORDER BY return_count DESC, unique_targets DESC, lr.lobbyist_name ASC
-            LIMIT 20
-            """,
-            (latest_period,),
-        ) if latest_period else []
+def merge_explore_partials(partials):
+    official_returns = Counter()
+    lobbyist_returns = Counter()
+    lobbyist_officials = defaultdict(set)
+    for partial in partials:
+        official_returns.update(partial["official_returns"])
+        lobbyist_returns.update(partial["lobbyist_returns"])
+        for name, officials in partial["lobbyist_officials"].items():
+            lobbyist_officials[name].update(officials)
+    return {
+        "official_returns": official_returns,
+        "lobbyist_returns": lobbyist_returns,
+        "lobbyist_officials": lobbyist_officials,
+    }
 
-        most_active_lobbyists = fetch_rows(
-            """
-            SELECT
-              lr.lobbyist_name AS name,
-              COUNT(DISTINCT lr.id) AS return_count,
-              COUNT(DISTINCT dpo.person_name) AS unique_targets
-            FROM lobbying_records lr
-            LEFT JOIN dpo_entries dpo ON dpo.lobbying_record_id = lr.id
-            WHERE lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-            GROUP BY lr.lobbyist_name
-            ORDER BY return_count DESC, unique_targets DESC, lr.lobbyist_name ASC
-            LIMIT 20
-            """
-        )
+def ranked(counts, limit=None):
+    rows = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return rows[:limit] if limit is not None else rows
 
-        current_official_counts = fetch_rows(
-            """
-            SELECT dpo.person_name AS name, COUNT(DISTINCT lr.id) AS contact_count
-            FROM dpo_entries dpo
-            JOIN lobbying_records lr ON lr.id = dpo.lobbying_record_id
-            WHERE lr.period = ? AND dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-            GROUP BY dpo.person_name
-            """,
-            (latest_period,),
-        ) if latest_period else []
+def contact_rows(counts, limit=None):
+    return [{"name": name, "contact_count": count} for name, count in ranked(counts, limit)]
 
-        previous_official_counts = fetch_rows(
-            """
-            SELECT dpo.person_name AS name, COUNT(DISTINCT lr.id) AS contact_count
-            FROM dpo_entries dpo
-            JOIN lobbying_records lr ON lr.id = dpo.lobbying_record_id
-            WHERE lr.period = ? AND dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-            GROUP BY dpo.person_name
-            """,
-            (previous_period,),
-        ) if previous_period else []
-
-        current_lobbyist_counts = fetch_rows(
-            """
-            SELECT lr.lobbyist_name AS name, COUNT(DISTINCT lr.id) AS contact_count
-            FROM lobbying_records lr
-            WHERE lr.period = ? AND lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-            GROUP BY lr.lobbyist_name
-            """,
-            (latest_period,),
-        ) if latest_period else []
+def lobbyist_rows(partial):
+    rows = [
+        {"name": name, "return_count": count, "unique_targets": len(partial["lobbyist_officials"].get(name, ()))}
+        for name, count in partial["lobbyist_returns"].items()
+    ]
+    rows.sort(key=lambda r: (-r["return_count"], -r["unique_targets"], r["name"]))
+    return rows[:20]
 
-        previous_lobbyist_counts = fetch_rows(
-            """
-            SELECT lr.lobbyist_name AS name, COUNT(DISTINCT lr.id) AS contact_count
-            FROM lobbying_records lr
-            WHERE lr.period = ? AND lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-            GROUP BY lr.lobbyist_name
-            """,
-            (previous_period,),
-        ) if previous_period else []
+def centrality_rows(partial):
+    official_degree = Counter()
+    lobbyist_degree = Counter()
+    shared = Counter()
+    for lobbyist, officials in partial["lobbyist_officials"].items():
+        officials = sorted(officials)
+        if officials:
+            lobbyist_degree[lobbyist] = len(officials)
+        official_degree.update(officials)
+        for index, official_a in enumerate(officials):
+            for official_b in officials[index + 1:]:
+                shared[(official_a, official_b)] += 1
+    shared_rows = [
+        {"official_a": a, "official_b": b, "shared_lobbyists": count}
+        for (a, b), count in sorted(shared.items(), key=lambda item: (-item[1], item[0]))[:20]
+    ]
+    return (
+        [{"name": name, "degree": degree} for name, degree in ranked(official_degree, 20)],
+        [{"name": name, "degree": degree} for name, degree in ranked(lobbyist_degree, 20)],
+        shared_rows,
+    )
 
-        top_policy_areas_latest = fetch_rows(
-            """
-            SELECT public_policy_area AS name, COUNT(*) AS return_count
-            FROM lobbying_records
-            WHERE period = ? AND public_policy_area IS NOT NULL AND TRIM(public_policy_area) != ''
-            GROUP BY public_policy_area
-            ORDER BY return_count DESC, public_policy_area ASC
-            LIMIT 20
-            """,
-            (latest_period,),
-        ) if latest_period else []
+def last_year_periods(periods):
+    """Periods that start less than twelve months before the latest one does. The window is anchored to the data
+    rather than the clock, so the same records always give the same view."""
+    if not periods:
+        return []
+    year, month, day = period_start_key(periods[0])
+    window_start = (year - 1, month, day)
+    return [period for period in periods if window_start < period_start_key(period) <= (year, month, day)]
 
-        keyword_rows = fetch_rows(
-            """
-            SELECT
-              COALESCE(subject_matter, '') AS subject_matter,
-              COALESCE(intended_results, '') AS intended_results,
-              COALESCE(specific_details, '') AS specific_details,
-              COALESCE(relevant_matter, '') AS relevant_matter
-            FROM lobbying_records
-            WHERE period = ?
-            """,
-            (latest_period,),
-        ) if latest_period else []
-
-        keyword_counts = Counter()
-        for row in keyword_rows:
-            text_blob = " ".join([
-                row.get("subject_matter", ""),
-                row.get("intended_results", ""),
-                row.get("specific_details", ""),
-                row.get("relevant_matter", ""),
-            ])
-            for raw in text_blob.split():
-                token = normalize_token(raw)
-                if token:
-                    keyword_counts[token] += 1
-
-        top_keywords_latest = [
-            {"token": token, "count": count}
-            for token, count in sorted(keyword_counts.items(), key=lambda x: (-x[1], x[0]))[:30]
-        ]
+def build_explore_precomputed():
+    conn = open_database()
+    conn.row_factory = sqlite3.Row
+    try:
+        partials, latest_dates, computed = load_explore_partials(conn)
+    finally:
+        conn.close()
 
-        official_centrality_latest = fetch_rows(
-            """
-            WITH edges AS (
-              SELECT DISTINCT dpo.person_name AS official, lr.lobbyist_name AS lobbyist
-              FROM lobbying_records lr
-              JOIN dpo_entries dpo ON dpo.lobbying_record_id = lr.id
-              WHERE lr.period = ?
-                AND dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-                AND lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-            )
-            SELECT official AS name, COUNT(DISTINCT lobbyist) AS degree
-            FROM edges
-            GROUP BY official
-            ORDER BY degree DESC, official ASC
-            LIMIT 20
-            """,
-            (latest_period,),
-        ) if latest_period else []
+    # Latest first, by the most recent publication date in each period.
+    periods = sorted(
+        latest_dates, key=lambda period: (latest_dates[period] is not None, latest_dates[period] or ""), reverse=True
+    )
+    latest_period = periods[0] if periods else None
+    previous_period = periods[1] if len(periods) > 1 else None
+    latest_partial = partials[latest_period] if latest_period else {}
+    latest = merge_explore_partials([latest_partial] if latest_period else [])
+    previous = merge_explore_partials([partials[previous_period]] if previous_period else [])
+    window = last_year_periods(periods)
+    last_year = merge_explore_partials(partials[period] for period in window)
+    all_time = merge_explore_partials(partials.values())
 
-        lobbyist_centrality_latest = fetch_rows(
-            """
-            WITH edges AS (
-              SELECT DISTINCT dpo.person_name AS official, lr.lobbyist_name AS lobbyist
-              FROM lobbying_records lr
-              JOIN dpo_entries dpo ON dpo.lobbying_record_id = lr.id
-              WHERE lr.period = ?
-                AND dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-                AND lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-            )
-            SELECT lobbyist AS name, COUNT(DISTINCT official) AS degree
-            FROM edges
-            GROUP BY lobbyist
-            ORDER BY degree DESC, lobbyist ASC
-            LIMIT 20
-            """,
-            (latest_period,),
-        ) if latest_period else []
+    official_centrality_latest, lobbyist_centrality_latest, shared_lobbyists_latest = centrality_rows(latest)
+    top_policy_areas_latest = [
+        {"name": name, "return_count": count} for name, count in ranked(latest_partial.get("policy_areas", {}), 20)
+    ]
+    top_keywords_latest = [
+        {"token": token, "count": count} for token, count in ranked(latest_partial.get("keywords", {}), 30)
+    ]
 
-        shared_lobbyists_latest = fetch_rows(
-            """
-            WITH edges AS (
-              SELECT DISTINCT dpo.person_name AS official, lr.lobbyist_name AS lobbyist
-              FROM lobbying_records lr
-              JOIN dpo_entries dpo ON dpo.lobbying_record_id = lr.id
-              WHERE lr.period = ?
-                AND dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
-                AND lr.lobbyist_name IS NOT NULL AND TRIM(lr.lobbyist_name) != ''
-            )
-            SELECT
-              e1.official AS official_a,
-              e2.official AS official_b,
-              COUNT(*) AS shared_lobbyists
-            FROM edges e1
-            JOIN edges e2
-              ON e1.lobbyist = e2.lobbyist
-             AND e1.official < e2.official
-            GROUP BY e1.official, e2.official
-            ORDER BY shared_lobbyists DESC, e1.official ASC, e2.official ASC
-            LIMIT 20
-            """,
-            (latest_period,),
-        ) if latest_period else []
-
-        payload = {
-            "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
-            "latest_period": latest_period,
-            "previous_period": previous_period,
-            "top_targets_latest": rows_with_slug(top_targets_latest),
-            "top_targets_last_year": rows_with_slug(top_targets_last_year),
-            "top_lobbyists_latest": rows_with_slug(top_lobbyists_latest),
-            "most_active_lobbyists": rows_with_slug(most_active_lobbyists),
-            "biggest_mover_officials": biggest_movers(current_official_counts, previous_official_counts),
-            "biggest_mover_lobbyists": biggest_movers(current_lobbyist_counts, previous_lobbyist_counts),
-            "top_policy_areas_latest": top_policy_areas_latest,
-            "top_keywords_latest": top_keywords_latest,
-            "official_centrality_latest": rows_with_slug(official_centrality_latest),
-            "lobbyist_centrality_latest": rows_with_slug(lobbyist_centrality_latest),
-            "shared_lobbyists_latest": [
-                {
-                    **row,
-                    "official_a_slug": slugify(row["official_a"]),
-                    "official_b_slug": slugify(row["official_b"])
-                }
-                for row in shared_lobbyists_latest
-            ],
-            "search_term": "",
-            "search_results": []
-        }
+    payload = {
+        "generated_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "latest_period": latest_period,
+        "previous_period": previous_period,
+        "last_year_periods": window,
+        "top_targets_latest": rows_with_slug(contact_rows(latest["official_returns"], 20)),
+        "top_targets_last_year": rows_with_slug(contact_rows(last_year["official_returns"], 20)),
+        "top_lobbyists_latest": rows_with_slug(lobbyist_rows(latest)),
+        "most_active_lobbyists": rows_with_slug(lobbyist_rows(all_time)),
+        "biggest_mover_officials": biggest_movers(
+            contact_rows(latest["official_returns"]), contact_rows(previous["official_returns"])
+        ),
+        "biggest_mover_lobbyists": biggest_movers(
+            contact_rows(latest["lobbyist_returns"]), contact_rows(previous["lobbyist_returns"])
+        ),
+        "top_policy_areas_latest": top_policy_areas_latest,
+        "top_keywords_latest": top_keywords_latest,
+        "official_centrality_latest": rows_with_slug(official_centrality_latest),
+        "lobbyist_centrality_latest": rows_with_slug(lobbyist_centrality_latest),
+        "shared_lobbyists_latest": [
+            {
+                **row,
+                "official_a_slug": slugify(row["official_a"]),
+                "official_b_slug": slugify(row["official_b"])
+            }
+            for row in shared_lobbyists_latest
+        ],
+        "search_term": "",
+        "search_results": []
+    }
 
-        os.makedirs(DERIVED_FOLDER, exist_ok=True)
-        with open(PRECOMPUTED_INSIGHTS_PATH, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False)
-        print(f"Wrote precomputed insights: {PRECOMPUTED_INSIGHTS_PATH}")
-    finally:
-        conn.close()
+    os.makedirs(DERIVED_FOLDER, exist_ok=True)
+    with open(PRECOMPUTED_INSIGHTS_PATH, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False)
+    print(
+        f"Wrote precomputed insights: {PRECOMPUTED_INSIGHTS_PATH} "
+        f"({computed} of {len(periods)} period partials recomputed)."
+    )
 
 # --- Data Extraction & Normalization ---
 def fetch_and_parse_csv_from_file(file_path):
@@ -614,7 +893,7 @@ def fetch_all_csv_records(folder):
     return all_records
 
 # --- Database Integration ---
-def insert_records(records):
+def insert_records(records, first_record_id=1):
     session = Session()
     inserted = 0
     name_variants = defaultdict(list)
@@ -625,6 +904,7 @@ def insert_records(records):
             continue
 
         new_record = LobbyingRecord(
+            id=first_record_id + inserted,
             csv_id=record["csv_id"],
             url=record["url"],
             lobbyist_name=record["lobbyist_name"],
@@ -679,107 +959,1258 @@ def insert_records(records):
         inserted += 1
 
     # Deduplicate by most common variant (with preference for capitalized names)
-    replacements = {}
-    for ascii_key, variants in name_variants.items():
-        count = Counter(variants)
-        sorted_variants = sorted(count.items(), key=lambda x: (-x[1], x[0].lower(), x[0]))
-        preferred = sorted([v[0] for v in sorted_variants if any(w[0].isupper() for w in v[0].split())], key=lambda x: -count[x])
-        replacements[ascii_key] = preferred[0] if preferred else sorted_variants[0][0]
+    replacements = {ascii_key: preferred_spelling(Counter(variants)) for ascii_key, variants in name_variants.items()}
 
     for dpo in session.query(DPOEntry).all():
         ascii = to_ascii(dpo.person_name)
         if ascii in replacements:
             dpo.person_name = replacements[ascii]
 
+    # Stored so the API can sort and keyset-paginate by official count without a correlated subquery per row.
+    session.flush()
+    # Grouped once rather than correlated per return: dpo_entries has no index on lobbying_record_id during ingest.
+    session.execute(text("""
+        UPDATE lobbying_records
+        SET official_count = grouped.official_count, fewest_officials_key = -grouped.official_count
+        FROM (
+          SELECT lobbying_record_id, COUNT(DISTINCT person_name) AS official_count
+          FROM dpo_entries
+          WHERE person_name IS NOT NULL AND TRIM(person_name) != ''
+          GROUP BY lobbying_record_id
+        ) AS grouped
+        WHERE grouped.lobbying_record_id = lobbying_records.id
+    """))
+    session.execute(text("""
+        UPDATE lobbying_records SET dpo_entries_json = grouped.entries
+        FROM (
+          SELECT lobbying_record_id, json_group_array(json_object(
+            'person_name', person_name, 'job_title', job_title, 'public_body', public_body
+          )) AS entries
+          FROM (SELECT * FROM dpo_entries ORDER BY lobbying_record_id, id)
+          GROUP BY lobbying_record_id
+        ) AS grouped
+        WHERE grouped.lobbying_record_id = lobbying_records.id
+    """))
+    session.execute(text("""
+        UPDATE lobbying_records SET activities_json = grouped.entries
+        FROM (
+          SELECT lobbying_record_id, json_group_array(activity) AS entries
+          FROM (SELECT * FROM lobbying_activity_entries ORDER BY lobbying_record_id, id)
+          GROUP BY lobbying_record_id
+        ) AS grouped
+        WHERE grouped.lobbying_record_id = lobbying_records.id
+    """))
+
+    build_lobbyists(session)
+
     session.commit()
     session.close()
     return inserted
 
-def insert_committee_memberships():
+def preferred_spelling(counts):
+    """Most frequent spelling, preferring ones with capitals (so "ACME Ltd" wins over "acme ltd" at equal counts)."""
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0].lower(), item[0]))
+    capitalized = [name for name, _ in ranked if any(word[0].isupper() for word in name.split())]
+    return capitalized[0] if capitalized else ranked[0][0]
+
+def lobbyist_slug_merges(merges):
+    """Accepted lobbyist merges as {variant slug: canonical slug}. Two spellings can share a slug without being
+    reviewed together, so chains through slugs (a -> b, and b's slug -> c) are resolved here too."""
+    slug_merges = {}
+    for variant, canonical in merges.items():
+        variant_slug, canonical_slug = lobbyist_slugify(variant), lobbyist_slugify(canonical)
+        if variant_slug and canonical_slug and variant_slug != canonical_slug:
+            slug_merges[variant_slug] = canonical_slug
+    for variant_slug in list(slug_merges):
+        seen = {variant_slug}
+        canonical_slug = slug_merges[variant_slug]
+        while canonical_slug in slug_merges and canonical_slug not in seen:
+            seen.add(canonical_slug)
+            canonical_slug = slug_merges[canonical_slug]
+        slug_merges[variant_slug] = canonical_slug
+    return slug_merges
+
+def build_lobbyists(session):
+    """Group lobbyist spellings by slug into the lobbyists table and point each return at its lobbyist, so slug
+    lookups and per-lobbyist filters are index seeks on integer ids. Accepted merges from NAME_VARIANTS_PATH file
+    the variant's slug under its canonical name's slug, so every spelling of the variant moves with it, and the
+    reviewed canonical spelling becomes the lobbyist's name."""
+    spellings = defaultdict(Counter)
+    merges = lobbyist_slug_merges(ACCEPTED_NAME_VARIANTS["lobbyist"])
+    merge_targets = set(ACCEPTED_NAME_VARIANTS["lobbyist"].values())
+    # Returns in year partitions are counted too, and keep the lobbyist ids they were stored with (the lowest, should
+    # a slug carry two; ingest reloads such partitions first, see split_lobbyist_partitions).
+    slug_ids = {}
+    years = session.execute(text("SELECT year FROM year_partitions ORDER BY year")).scalars().all()
+    for schema in ["main"] + [partition_schema(year) for year in years]:
+        for name, lobbyist_id, count in session.execute(text(f"""
+            SELECT TRIM(lobbyist_name), MIN(lobbyist_id), COUNT(*)
+            FROM {schema}.lobbying_records
+            WHERE lobbyist_name IS NOT NULL AND TRIM(lobbyist_name) != ''
+            GROUP BY TRIM(lobbyist_name)
+        """)):
+            slug = lobbyist_slugify(name)
+            slug = merges.get(slug, slug)
+            if slug:
+                spellings[slug][name] += count
+                if schema != "main" and lobbyist_id is not None:
+                    slug_ids[slug] = min(slug_ids.get(slug, lobbyist_id), lobbyist_id)
+
+    session.execute(delete(Lobbyist))
+    lobbyist_ids = {}
+    next_id = max(slug_ids.values(), default=0) + 1
+    for slug, counts in sorted(spellings.items()):
+        if slug not in slug_ids:
+            slug_ids[slug] = next_id
+            next_id += 1
+        lobbyist = Lobbyist(
+            id=slug_ids[slug],
+            name=next((name for name in counts if name in merge_targets), None) or preferred_spelling(counts),
+            slug=slug,
+            variants=json.dumps([name for name, _ in counts.most_common()], ensure_ascii=False),
+            return_count=sum(counts.values()),
+        )
+        session.add(lobbyist)
+        session.flush()
+        for name in counts:
+            lobbyist_ids[name] = lobbyist.id
+
+    assignments = [
+        {"id": record_id, "lobbyist_id": lobbyist_ids[name]}
+        for record_id, name in session.execute(text("SELECT id, TRIM(lobbyist_name) FROM main.lobbying_records"))
+        if name in lobbyist_ids
+    ]
+    if assignments:
+        session.execute(text("UPDATE lobbying_records SET lobbyist_id = :lobbyist_id WHERE id = :id"), assignments)
+    print(f"Built {len(spellings)} lobbyists from {sum(len(counts) for counts in spellings.values())} spellings.")
+
+MEMBERSHIP_FIELDS = ("member_name", "member_uri", "member_url", "constituency", "email", "phones")
+
+def load_stored_committee_memberships(session):
+    stored = {}
+    duplicate_ids = []
+    rows = session.execute(
+        select(CommitteeMembership, Committee.url, Committee.name)
+        .join(Committee, Committee.id == CommitteeMembership.committee_id)
+        .order_by(CommitteeMembership.id)
+    ).all()
+    for membership, committee_url, committee_name in rows:
+        key = (committee_url, membership.member_slug or "", membership.role or "")
+        if key in stored:
+            duplicate_ids.append(membership.id)
+            continue
+        stored[key] = {
+            "id": membership.id,
+            "committee_name": committee_name,
+            **{field: getattr(membership, field) or "" for field in MEMBERSHIP_FIELDS},
+        }
+    return stored, duplicate_ids
+
+def membership_change(change_type, key, committee_name, member_name, changed_at):
+    committee_url, member_slug, role = key
+    return {
+        "committee_url": committee_url,
+        "committee_name": committee_name,
+        "member_slug": member_slug,
+        "member_name": member_name,
+        "role": role,
+        "change_type": change_type,
+        "changed_at": changed_at,
+    }
+
+def sync_committee_memberships():
+    """Diff committee_memberships.json against the stored rows using natural keys
+    (committee url, member slug, role) and apply only the inserts, updates and deletes."""
+    stats = {"inserted": 0, "updated": 0, "deleted": 0, "unchanged": 0, "committees": 0}
     if not os.path.exists(COMMITTEE_MEMBERSHIPS_PATH):
         print(f"No committee memberships found at {COMMITTEE_MEMBERSHIPS_PATH}; skipping.")
-        return 0
+        return stats
 
     with open(COMMITTEE_MEMBERSHIPS_PATH, "r", encoding="utf-8") as f:
         payload = json.load(f)
+    generated_at = payload.get("generated_at", "")
 
-    session = Session()
-    committee_by_url = {}
+    incoming_committees = {}
     for row in payload.get("committees", []):
-        committee = Committee(
-            name=row.get("name", ""),
-            url=row.get("url", ""),
-            membership_url=row.get("membership_url", ""),
-            house_no=str(row.get("house_no", "")),
-            source_url=payload.get("source_url", ""),
-            scraped_at=row.get("scraped_at") or payload.get("generated_at", ""),
-        )
-        session.add(committee)
-        session.flush()
-        committee_by_url[committee.url] = committee
+        url = row.get("url", "")
+        if not url or url in incoming_committees:
+            continue
+        incoming_committees[url] = {
+            "name": row.get("name", ""),
+            "url": url,
+            "membership_url": row.get("membership_url", ""),
+            "house_no": str(row.get("house_no", "")),
+            "source_url": payload.get("source_url", ""),
+            "scraped_at": row.get("scraped_at") or generated_at,
+        }
 
-    inserted = 0
-    seen_memberships = set()
+    incoming_memberships = {}
     for row in payload.get("memberships", []):
-        committee = committee_by_url.get(row.get("committee_url", ""))
-        if not committee:
+        committee_url = row.get("committee_url", "")
+        if committee_url not in incoming_committees:
             continue
         member_name = row.get("member_name", "")
-        member_key = (
-            committee.id,
-            row.get("member_slug") or official_slugify(member_name),
-            member_name,
-            row.get("role", ""),
-            row.get("member_uri", ""),
-            row.get("member_url", ""),
-            row.get("constituency", ""),
-        )
-        if member_key in seen_memberships:
+        key = (committee_url, row.get("member_slug") or official_slugify(member_name), row.get("role", ""))
+        if key in incoming_memberships:
             continue
-        seen_memberships.add(member_key)
-        session.add(
-            CommitteeMembership(
-                committee_id=committee.id,
-                member_name=member_name,
-                member_slug=row.get("member_slug") or official_slugify(member_name),
-                member_uri=row.get("member_uri", ""),
-                member_url=row.get("member_url", ""),
-                role=row.get("role", ""),
-                constituency=row.get("constituency", ""),
-                email=row.get("email", ""),
-                phones=row.get("phones", ""),
-                scraped_at=row.get("scraped_at") or payload.get("generated_at", ""),
+        incoming_memberships[key] = {
+            "member_name": member_name,
+            "member_uri": row.get("member_uri", ""),
+            "member_url": row.get("member_url", ""),
+            "constituency": row.get("constituency", ""),
+            "email": row.get("email", ""),
+            "phones": row.get("phones", ""),
+            "scraped_at": row.get("scraped_at") or generated_at,
+        }
+
+    session = Session()
+    try:
+        stored_committees = {url: committee_id for committee_id, url in session.execute(select(Committee.id, Committee.url))}
+        stored_memberships, duplicate_ids = load_stored_committee_memberships(session)
+        # The first import into an empty database is a baseline, not a set of people joining committees.
+        initial_sync = not stored_committees
+
+        new_committees = [row for url, row in incoming_committees.items() if url not in stored_committees]
+        if new_committees:
+            session.execute(insert(Committee), new_committees)
+        # Committees are always re-stamped so pages show when the listing was last scraped.
+        committee_updates = [
+            {"id": stored_committees[url], **row}
+            for url, row in incoming_committees.items()
+            if url in stored_committees
+        ]
+        if committee_updates:
+            session.execute(update(Committee), committee_updates)
+        committee_ids = {url: committee_id for committee_id, url in session.execute(select(Committee.id, Committee.url))}
+
+        changes = []
+        inserts = []
+        updates = []
+        delete_ids = list(duplicate_ids)
+        for key, row in incoming_memberships.items():
+            existing = stored_memberships.get(key)
+            committee_name = incoming_committees[key[0]]["name"]
+            if existing is None:
+                inserts.append({
+                    "committee_id": committee_ids[key[0]],
+                    "member_slug": key[1],
+                    "role": key[2],
+                    **row,
+                })
+                changes.append(membership_change("joined", key, committee_name, row["member_name"], generated_at))
+            elif any((existing[field] or "") != (row[field] or "") for field in MEMBERSHIP_FIELDS):
+                updates.append({"id": existing["id"], **row})
+                changes.append(membership_change("updated", key, committee_name, row["member_name"], generated_at))
+            else:
+                stats["unchanged"] += 1
+
+        for key, existing in stored_memberships.items():
+            if key in incoming_memberships:
+                continue
+            delete_ids.append(existing["id"])
+            changes.append(
+                membership_change("left", key, existing["committee_name"], existing["member_name"], generated_at)
             )
-        )
-        inserted += 1
 
+        if inserts:
+            session.execute(insert(CommitteeMembership), inserts)
+        if updates:
+            session.execute(update(CommitteeMembership), updates)
+        if delete_ids:
+            session.execute(delete(CommitteeMembership).where(CommitteeMembership.id.in_(delete_ids)))
+
+        removed_committee_ids = [
+            committee_id for url, committee_id in stored_committees.items() if url not in incoming_committees
+        ]
+        if removed_committee_ids:
+            session.execute(delete(Committee).where(Committee.id.in_(removed_committee_ids)))
+        if initial_sync:
+            changes = []
+        if changes:
+            session.execute(insert(CommitteeMembershipChange), changes)
+
+        session.commit()
+    finally:
+        session.close()
+
+    stats["inserted"] = len(inserts)
+    stats["updated"] = len(updates)
+    stats["deleted"] = len(delete_ids)
+    stats["committees"] = len(incoming_committees)
+    for change in changes:
+        if change["change_type"] != "updated":
+            verb = "joined" if change["change_type"] == "joined" else "left"
+            print(f"  {change['member_name']} {verb} {change['committee_name']} ({change['role'] or 'Member'})")
+    return stats
+
+def enable_wal():
+    # Persisted in the file; the API opens read-only connections that cannot switch journal modes themselves.
+    conn = sqlite3.connect("lobbying.db")
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    finally:
+        conn.close()
+
+def compute_dataset_version():
+    """Content hash of the inputs the database and API responses are built from, including this parser."""
+    digest = hashlib.sha256()
+    sources = sorted(glob.glob(os.path.join(DATA_FOLDER, "*.csv")))
+    sources += [
+        path
+        for path in (COMMITTEE_MEMBERSHIPS_PATH, CURRENT_MEMBERS_PATH, NAME_VARIANTS_PATH, __file__)
+        if os.path.exists(path)
+    ]
+    for path in sources:
+        digest.update(os.path.basename(path).encode("utf-8"))
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+def compute_dataset_summary(session):
+    """Totals and coverage served by /api/data-metadata; fixed for a build, so computed once here."""
+    totals = session.execute(text("""
+        SELECT
+          COUNT(*) AS total_returns,
+          COUNT(DISTINCT CASE WHEN period IS NOT NULL AND TRIM(period) != '' THEN period END) AS total_periods,
+          COUNT(DISTINCT lobbyist_id) AS total_lobbyists,
+          MIN(date_published) AS first_published_at,
+          MAX(date_published) AS last_published_at
+        FROM lobbying_records
+    """)).mappings().one()
+    total_officials = session.execute(text("""
+        SELECT COUNT(DISTINCT CASE WHEN person_name IS NOT NULL AND TRIM(person_name) != '' THEN person_name END)
+        FROM dpo_entries
+    """)).scalar()
+
+    def edge_period(direction):
+        period = session.execute(text(f"""
+            SELECT period FROM lobbying_records
+            WHERE period IS NOT NULL AND TRIM(period) != '' AND date_published IS NOT NULL
+            ORDER BY date_published {direction}
+            LIMIT 1
+        """)).scalar()
+        if period is None:
+            period = session.execute(text(f"""
+                SELECT period FROM lobbying_records
+                WHERE period IS NOT NULL AND TRIM(period) != ''
+                ORDER BY period {direction}
+                LIMIT 1
+            """)).scalar()
+        return period
+
+    return {
+        "total_returns": totals["total_returns"] or 0,
+        "total_periods": totals["total_periods"] or 0,
+        "total_lobbyists": totals["total_lobbyists"] or 0,
+        "total_officials": total_officials or 0,
+        "earliest_period": edge_period("ASC"),
+        "latest_period": edge_period("DESC"),
+        "first_published_at": totals["first_published_at"],
+        "last_published_at": totals["last_published_at"],
+    }
+
+MONTHS = {name: index for index, name in enumerate(
+    ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], start=1
+)}
+
+def period_start_key(period):
+    match = re.match(r"\s*(\d{1,2}) (\w{3})\w*, (\d{4})", period or "")
+    if not match:
+        return (0, 0, 0)
+    return (int(match.group(3)), MONTHS.get(match.group(2), 0), int(match.group(1)))
+
+def official_name_key(name):
+    # Mirrors normalizeNameKey in the API: variants that differ only by accents, case or spacing are one official.
+    stripped = "".join(c for c in unicodedata.normalize("NFD", name) if unicodedata.category(c) != "Mn")
+    return re.sub(r"\s+", " ", stripped).lower().strip()
+
+def build_official_summary():
+    """One row per official for every year (and for all years) and every directory title set, holding the latest
+    job title and period and the number of distinct returns, so /api/officials is a single indexed read."""
+    title_sets = {"": None}
+    for titles in OFFICIAL_DIRECTORY_TITLES.values():
+        title_sets[",".join(sorted(titles))] = set(titles)
+
+    groups = {}
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT dpo.person_name, dpo.job_title, lr.period, lr.date_published, lr.id
+            FROM dpo_entries dpo
+            JOIN lobbying_records lr ON lr.id = dpo.lobbying_record_id
+            WHERE dpo.person_name IS NOT NULL AND TRIM(dpo.person_name) != ''
+        """))
+        for person_name, job_title, period, date_published, record_id in rows:
+            period = period or ""
+            year = period.strip()[-4:]
+            rank = (period_start_key(period), str(date_published or ""), record_id)
+            name_key = official_name_key(person_name)
+            for title_set, titles in title_sets.items():
+                if titles is not None and job_title not in titles:
+                    continue
+                for year_key in ("all", year) if year.isdigit() else ("all",):
+                    group = groups.get((title_set, year_key, name_key))
+                    if group is None:
+                        group = groups[(title_set, year_key, name_key)] = {"records": set(), "rank": None}
+                    group["records"].add(record_id)
+                    if group["rank"] is None or rank > group["rank"]:
+                        group.update(rank=rank, person_name=person_name, job_title=job_title, period=period)
+
+    summary_rows = [
+        {
+            "person_name": group["person_name"],
+            "year": year_key,
+            "title_set": title_set,
+            "job_title": group["job_title"],
+            "latest_period": group["period"],
+            "return_count": len(group["records"]),
+        }
+        for (title_set, year_key, _), group in groups.items()
+    ]
+    session = Session()
+    session.execute(delete(OfficialSummary))
+    if summary_rows:
+        session.execute(insert(OfficialSummary), summary_rows)
     session.commit()
     session.close()
-    return inserted
+    print(f"Built official summary: {len(summary_rows)} rows across {len(title_sets)} title sets.")
+
+def activity_method(activity):
+    # Activities are stored as "description|method|..."; the method is the first non-empty field after the first,
+    # as in /api/officials/[slug]/methods.
+    return next((part.strip() for part in (activity or "").split("|")[1:] if part.strip()), None)
+
+def period_start_date(period):
+    year, month, day = period_start_key(period)
+    return f"{year:04d}-{month:02d}-{day:02d}" if year and month else ""
+
+def build_period_rollups():
+    """Returns, distinct counterparts and method counts per (official, period) and (lobbyist, period), and returns
+    per (policy area, period), so trends and period-over-period movers read a few rows per entity instead of
+    grouping the dpo_entries join on demand."""
+    officials = defaultdict(lambda: {"returns": 0, "counterparts": set(), "methods": Counter()})
+    lobbyists = defaultdict(lambda: {"returns": 0, "counterparts": set(), "methods": Counter()})
+    policy_areas = Counter()
+
+    with engine.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT lobbyist_id, period, public_policy_area, dpo_entries_json, activities_json
+            FROM lobbying_records
+            WHERE period IS NOT NULL AND TRIM(period) != ''
+        """))
+        for lobbyist_id, period, policy_area, dpo_entries_json, activities_json in rows:
+            methods = Counter(filter(None, map(activity_method, json.loads(activities_json or "[]"))))
+            names = {
+                (entry.get("person_name") or "").strip() for entry in json.loads(dpo_entries_json or "[]")
+            } - {""}
+            for name in names:
+                rollup = officials[(name, period)]
+                rollup["returns"] += 1
+                if lobbyist_id is not None:
+                    rollup["counterparts"].add(lobbyist_id)
+                rollup["methods"].update(methods)
+            if lobbyist_id is not None:
+                rollup = lobbyists[(lobbyist_id, period)]
+                rollup["returns"] += 1
+                rollup["counterparts"].update(names)
+                rollup["methods"].update(methods)
+            if policy_area and policy_area.strip():
+                policy_areas[(policy_area.strip(), period)] += 1
+
+    def method_json(counts):
+        return json.dumps(dict(sorted(counts.items(), key=lambda item: (-item[1], item[0]))), ensure_ascii=False)
+
+    official_rows = [
+        {
+            "person_name": name,
+            "period": period,
+            "period_start": period_start_date(period),
+            "return_count": rollup["returns"],
+            "lobbyist_count": len(rollup["counterparts"]),
+            "method_counts": method_json(rollup["methods"]),
+        }
+        for (name, period), rollup in officials.items()
+    ]
+    lobbyist_rows = [
+        {
+            "lobbyist_id": lobbyist_id,
+            "period": period,
+            "period_start": period_start_date(period),
+            "return_count": rollup["returns"],
+            "official_count": len(rollup["counterparts"]),
+            "method_counts": method_json(rollup["methods"]),
+        }
+        for (lobbyist_id, period), rollup in lobbyists.items()
+    ]
+    policy_area_rows = [
+        {"public_policy_area": area, "period": period, "period_start": period_start_date(period), "return_count": count}
+        for (area, period), count in policy_areas.items()
+    ]
+
+    session = Session()
+    for model, table_rows in (
+        (OfficialPeriodRollup, official_rows),
+        (LobbyistPeriodRollup, lobbyist_rows),
+        (PolicyAreaPeriodRollup, policy_area_rows),
+    ):
+        session.execute(delete(model))
+        if table_rows:
+            session.execute(insert(model), table_rows)
+    session.commit()
+    session.close()
+    print(
+        f"Built period rollups: {len(official_rows)} official, {len(lobbyist_rows)} lobbyist and "
+        f"{len(policy_area_rows)} policy area rows."
+    )
+
+def pack_record_ids(ids):
+    packed = array("I", ids)
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+# Descending sort keys of the return listings in lib/returnPagination.js, ahead of (date_published, id). Returns
+# without a date_published come after every dated return.
+LISTING_ORDERS = {
+    "newest": lambda fewest_officials_key, official_count: (),
+    "fewest-officials": lambda fewest_officials_key, official_count: (fewest_officials_key,),
+    "most-officials": lambda fewest_officials_key, official_count: (official_count,),
+}
+
+def listing_order(record_ids, sort_keys, listing):
+    """record_ids in the given listing order; sort_keys maps an id to (date_published, fewest_officials_key,
+    official_count)."""
+    def key(record_id):
+        date_published, fewest_officials_key, official_count = sort_keys[record_id]
+        lead = LISTING_ORDERS[listing](fewest_officials_key, official_count)
+        return (date_published is not None, *lead, date_published or "", record_id)
+    return sorted(record_ids, key=key, reverse=True)
+
+def build_official_facets():
+    """Sorted return ids per (official, facet, value) for the official detail filters and their facet counts, and
+    each official's returns in every listing order."""
+    facets = defaultdict(list)
+    sort_keys = {}
+
+    def add(name, facet, value, record_id):
+        ids = facets[(name, facet, value)]
+        if not ids or ids[-1] != record_id:
+            ids.append(record_id)
+
+    with engine.connect() as conn:
+        # Scanning in id order keeps every list sorted as it is built.
+        rows = conn.execute(text("""
+            SELECT id, lobbyist_name, period, official_count, dpo_entries_json, activities_json, date_published,
+              fewest_officials_key
+            FROM lobbying_records
+            ORDER BY id
+        """))
+        for (
+            record_id, lobbyist_name, period, official_count, dpo_entries_json, activities_json, date_published,
+            fewest_officials_key,
+        ) in rows:
+            sort_keys[record_id] = (date_published, fewest_officials_key, official_count)
+            year = (period or "").strip()[-4:]
+            methods = set(filter(None, map(activity_method, json.loads(activities_json or "[]"))))
+            titles = defaultdict(set)
+            for entry in json.loads(dpo_entries_json or "[]"):
+                name = entry.get("person_name")
+                if name and name.strip():
+                    titles[name].add(entry.get("job_title") or "")
+            for name, job_titles in titles.items():
+                add(name, "all", "", record_id)
+                if official_count == 1:
+                    add(name, "single", "", record_id)
+                if len(year) == 4 and year.isdigit():
+                    add(name, "year", year, record_id)
+                for method in methods:
+                    add(name, "method", method, record_id)
+                if lobbyist_name:
+                    add(name, "lobbyist", lobbyist_name, record_id)
+                for job_title in job_titles - {""}:
+                    add(name, "job_title", job_title, record_id)
+
+    for (name, facet, _), ids in list(facets.items()):
+        if facet == "all":
+            for listing in LISTING_ORDERS:
+                facets[(name, "order", listing)] = listing_order(ids, sort_keys, listing)
+
+    facet_rows = [
+        {
+            "person_name": name,
+            "facet": facet,
+            "value": value,
+            "record_count": len(ids),
+            "record_ids": pack_record_ids(ids),
+        }
+        for (name, facet, value), ids in facets.items()
+    ]
+    session = Session()
+    session.execute(delete(OfficialFacet))
+    if facet_rows:
+        session.execute(insert(OfficialFacet), facet_rows)
+    session.commit()
+    session.close()
+    officials = len({name for name, _, _ in facets})
+    print(f"Built official facets: {len(facet_rows)} facet values across {officials} officials.")
+
+def pagerank(adjacency, strength, damping=0.85, tolerance=1e-10, max_iterations=100):
+    """Weighted PageRank on an undirected graph: each node passes its score to its neighbours in proportion to the
+    returns linking them."""
+    count = len(adjacency)
+    scores = [1.0 / count] * count
+    for _ in range(max_iterations):
+        updated = [(1.0 - damping) / count] * count
+        for node, neighbours in enumerate(adjacency):
+            share = damping * scores[node] / strength[node]
+            for neighbour, weight in neighbours:
+                updated[neighbour] += share * weight
+        change = sum(abs(a - b) for a, b in zip(updated, scores))
+        scores = updated
+        if change < tolerance:
+            break
+    return scores
+
+def hits(adjacency, officials, lobbyists, tolerance=1e-10, max_iterations=100):
+    """HITS on the bipartite graph with lobbyists as hubs and officials as authorities: an official scores highly
+    when lobbied by lobbyists that reach many important officials, and the other way round."""
+    scores = [1.0] * len(adjacency)
+    for _ in range(max_iterations):
+        previous = scores[:]
+        for side in (officials, lobbyists):
+            for node in side:
+                scores[node] = sum(weight * scores[neighbour] for neighbour, weight in adjacency[node])
+            norm = math.sqrt(sum(scores[node] ** 2 for node in side)) or 1.0
+            for node in side:
+                scores[node] /= norm
+        if sum(abs(a - b) for a, b in zip(scores, previous)) < tolerance:
+            break
+    return scores
+
+def approximate_betweenness(adjacency, samples, seed=0):
+    """Brandes' betweenness over hop-count shortest paths from a fixed random sample of sources, scaled up to the
+    whole graph and normalized to [0, 1]."""
+    count = len(adjacency)
+    sources = random.Random(seed).sample(range(count), min(samples, count))
+    scores = [0.0] * count
+    for source in sources:
+        order = []
+        predecessors = [[] for _ in range(count)]
+        paths = [0] * count
+        distance = [-1] * count
+        paths[source] = 1
+        distance[source] = 0
+        queue = deque([source])
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for neighbour, _ in adjacency[node]:
+                if distance[neighbour] < 0:
+                    distance[neighbour] = distance[node] + 1
+                    queue.append(neighbour)
+                if distance[neighbour] == distance[node] + 1:
+                    paths[neighbour] += paths[node]
+                    predecessors[neighbour].append(node)
+        dependency = [0.0] * count
+        for node in reversed(order):
+            for predecessor in predecessors[node]:
+                dependency[predecessor] += paths[predecessor] / paths[node] * (1.0 + dependency[node])
+            if node != source:
+                scores[node] += dependency[node]
+    # Every unordered pair is counted once from each end when all sources are used.
+    scale = count / len(sources) / ((count - 1) * (count - 2)) if count > 2 and sources else 0.0
+    return [score * scale for score in scores]
+
+def graph_centrality_rows(year, edges, lobbyist_names):
+    """Centrality of every node in one official-lobbyist graph; `edges` maps (official, lobbyist_id) to the number
+    of returns in which the lobbyist named the official. Lobbyist nodes are keyed by slug: node order decides which
+    sources approximate_betweenness samples, and ids depend on the order partitions were built in."""
+    nodes = {}
+    adjacency = []
+    names_by_slug = {slug: (name, slug) for name, slug in lobbyist_names.values()}
+    stable_edges = sorted(
+        ((official, lobbyist_names[lobbyist_id][1]), weight) for (official, lobbyist_id), weight in edges.items()
+    )
 
-def run_pipeline():
+    def node_index(key):
+        index = nodes.get(key)
+        if index is None:
+            index = nodes[key] = len(adjacency)
+            adjacency.append([])
+        return index
+
+    for (official, lobbyist_slug), weight in stable_edges:
+        official_node = node_index(("official", official))
+        lobbyist_node = node_index(("lobbyist", lobbyist_slug))
+        adjacency[official_node].append((lobbyist_node, weight))
+        adjacency[lobbyist_node].append((official_node, weight))
+    if not adjacency:
+        return []
+
+    strength = [sum(weight for _, weight in neighbours) for neighbours in adjacency]
+    officials = [index for (kind, _), index in nodes.items() if kind == "official"]
+    lobbyists = [index for (kind, _), index in nodes.items() if kind == "lobbyist"]
+    rank = pagerank(adjacency, strength)
+    hub_authority = hits(adjacency, officials, lobbyists)
+    betweenness = approximate_betweenness(adjacency, GRAPH_BETWEENNESS_SAMPLES)
+
+    rows = []
+    for (kind, key), index in nodes.items():
+        name, slug = (key, official_slugify(key)) if kind == "official" else names_by_slug[key]
+        rows.append({
+            "entity_type": kind,
+            "name": name,
+            "slug": slug,
+            "year": year,
+            "degree": len(adjacency[index]),
+            "weighted_degree": strength[index],
+            "pagerank": rank[index],
+            "hits": hub_authority[index],
+            "betweenness": betweenness[index],
+        })
+    return rows
+
+def load_official_lobbyist_edges():
+    """Returns per lobbyist id its (name, slug), and per year (and "all") the number of returns in which each
+    lobbyist named each official, keyed by (official, lobbyist_id)."""
+    edges_by_year = defaultdict(Counter)
+    with engine.connect() as conn:
+        lobbyist_names = {
+            lobbyist_id: (name, slug)
+            for lobbyist_id, name, slug in conn.execute(text("SELECT id, name, slug FROM lobbyists"))
+        }
+        rows = conn.execute(text("""
+            SELECT lobbyist_id, period, dpo_entries_json
+            FROM lobbying_records
+            WHERE lobbyist_id IS NOT NULL
+        """))
+        for lobbyist_id, period, dpo_entries_json in rows:
+            year = (period or "").strip()[-4:]
+            officials = {
+                entry["person_name"]
+                for entry in json.loads(dpo_entries_json or "[]")
+                if entry.get("person_name") and entry["person_name"].strip()
+            }
+            for official in officials:
+                edges_by_year["all"][(official, lobbyist_id)] += 1
+                if year.isdigit():
+                    edges_by_year[year][(official, lobbyist_id)] += 1
+    return lobbyist_names, edges_by_year
+
+def build_graph_centrality():
+    """Degree, weighted degree, PageRank, HITS and approximate betweenness for every official and lobbyist in the
+    bipartite official-lobbyist graph, per year and for all years, for the explore page's network rankings."""
+    lobbyist_names, edges_by_year = load_official_lobbyist_edges()
+    centrality = []
+    for year, edges in sorted(edges_by_year.items()):
+        centrality.extend(graph_centrality_rows(year, edges, lobbyist_names))
+
+    session = Session()
+    session.execute(delete(GraphCentrality))
+    if centrality:
+        session.execute(insert(GraphCentrality), centrality)
+    session.commit()
+    session.close()
+    print(f"Built graph centrality: {len(centrality)} rows across {len(edges_by_year)} graphs.")
+
+class MinHasher:
+    """MinHash signatures of string sets. Each counterpart is hashed once into MINHASH_PERMUTATIONS values of the form
+    (a * x + b) mod p; a set's signature is their element-wise minimum, and the share of equal positions between
+    two signatures estimates the Jaccard similarity of the sets."""
+
+    PRIME = (1 << 61) - 1
+
+    def __init__(self, permutations, seed=0):
+        rng = random.Random(seed)
+        self.coefficients = [(rng.randrange(1, self.PRIME), rng.randrange(self.PRIME)) for _ in range(permutations)]
+        self.vectors = {}
+
+    def vector(self, key):
+        vector = self.vectors.get(key)
+        if vector is None:
+            x = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "big")
+            vector = self.vectors[key] = [(a * x + b) % self.PRIME for a, b in self.coefficients]
+        return vector
+
+    def signature(self, keys):
+        return [min(column) for column in zip(*(self.vector(key) for key in keys))]
+
+def similar_neighbours(signatures):
+    """Candidate pairs are entities whose signatures agree on every row of at least one LSH band (about 0.4 Jaccard
+    and up for 32 bands of 4 rows), so only those pairs are scored rather than all of them. Buckets holding more than
+    SIMILAR_MAX_BUCKET entities are skipped, as in scripts/detect_name_variants.py."""
+    rows_per_band = MINHASH_PERMUTATIONS // LSH_BANDS
+    buckets = defaultdict(list)
+    for key, signature in signatures.items():
+        for band in range(LSH_BANDS):
+            start = band * rows_per_band
+            buckets[(band, tuple(signature[start:start + rows_per_band]))].append(key)
+
+    candidates = set()
+    for members in buckets.values():
+        if 1 < len(members) <= SIMILAR_MAX_BUCKET:
+            members = sorted(members)
+            for index, left in enumerate(members):
+                for right in members[index + 1:]:
+                    candidates.add((left, right))
+
+    neighbours = defaultdict(list)
+    for left, right in candidates:
+        agreement = sum(a == b for a, b in zip(signatures[left], signatures[right])) / MINHASH_PERMUTATIONS
+        if agreement >= SIMILAR_MIN_JACCARD:
+            neighbours[left].append((agreement, right))
+            neighbours[right].append((agreement, left))
+    return {
+        key: sorted(matches, key=lambda match: (-match[0], match[1]))[:SIMILAR_NEIGHBOURS]
+        for key, matches in neighbours.items()
+    }
+
+def build_similarity_index():
+    """Most similar officials for every official (by the lobbyists that named them) and most similar lobbyists for
+    every lobbyist (by the officials they named), per year and for all years, with the MinHash Jaccard estimate."""
+    lobbyist_names, edges_by_year = load_official_lobbyist_edges()
+    # Lobbyists are keyed by slug rather than id: ids depend on the order partitions were built in, and the hashed
+    # counterparts, LSH buckets and tie-breaks must depend only on the data.
+    names_by_slug = {slug: (name, slug) for name, slug in lobbyist_names.values()}
+    hasher = MinHasher(MINHASH_PERMUTATIONS)
+    similar_rows = []
+    for year, edges in sorted(edges_by_year.items()):
+        lobbyists_by_official = defaultdict(set)
+        officials_by_lobbyist = defaultdict(set)
+        for official, lobbyist_id in edges:
+            slug = lobbyist_names[lobbyist_id][1]
+            lobbyists_by_official[official].add(f"lobbyist:{slug}")
+            officials_by_lobbyist[slug].add(f"official:{official}")
+
+        for entity_type, sets in (("official", lobbyists_by_official), ("lobbyist", officials_by_lobbyist)):
+            # One or two counterparts make every entity sharing them look identical.
+            signatures = {
+                key: hasher.signature(counterparts)
+                for key, counterparts in sets.items()
+                if len(counterparts) >= SIMILAR_MIN_COUNTERPARTS
+            }
+            for key, matches in similar_neighbours(signatures).items():
+                for rank, (jaccard, other) in enumerate(matches, start=1):
+                    if entity_type == "official":
+                        similar_name, similar_slug = other, official_slugify(other)
+                    else:
+                        similar_name, similar_slug = names_by_slug[other]
+                    similar_rows.append({
+                        "entity_type": entity_type,
+                        "entity_key": key,
+                        "year": year,
+                        "rank": rank,
+                        "similar_name": similar_name,
+                        "similar_slug": similar_slug,
+                        "jaccard": round(jaccard, 4),
+                        "counterpart_count": len(sets[other]),
+                    })
+
+    session = Session()
+    session.execute(delete(SimilarEntity))
+    if similar_rows:
+        session.execute(insert(SimilarEntity), similar_rows)
+    session.commit()
+    session.close()
+    print(f"Built similarity index: {len(similar_rows)} neighbour rows across {len(edges_by_year)} scopes.")
+
+def load_current_roster_slugs():
+    if not os.path.exists(CURRENT_MEMBERS_PATH):
+        return set()
+    with open(CURRENT_MEMBERS_PATH, encoding="utf-8") as f:
+        roster = json.load(f)
+    return {member.get("slug") for member in roster if isinstance(member, dict) and member.get("slug")}
+
+EMPTY_OFFICIAL_PROFILE = {
+    "first_seen_at": None,
+    "last_seen_at": None,
+    "most_recent_title": None,
+    "most_recent_public_body": None,
+    "job_titles": "[]",
+    "public_bodies": "[]",
+}
+
+def build_official_profiles(session):
+    """The profile columns of official_links per DPO name, from every dated return naming them. On ties the most
+    recent return is the one with the lowest id, and its first entry for the name."""
+    profiles = {}
+    for date_published, dpo_entries_json in session.execute(text("""
+        SELECT date_published, dpo_entries_json FROM lobbying_records WHERE date_published IS NOT NULL ORDER BY id
+    """)):
+        for entry in json.loads(dpo_entries_json or "[]"):
+            name = entry.get("person_name")
+            if not name:
+                continue
+            title = (entry.get("job_title") or "").strip()
+            body = (entry.get("public_body") or "").strip()
+            profile = profiles.get(name)
+            if profile is None:
+                profile = profiles[name] = {
+                    "first_seen_at": date_published,
+                    "last_seen_at": date_published,
+                    "most_recent_title": title,
+                    "most_recent_public_body": body,
+                    "job_titles": set(),
+                    "public_bodies": set(),
+                }
+            elif date_published > profile["last_seen_at"]:
+                profile.update(last_seen_at=date_published, most_recent_title=title, most_recent_public_body=body)
+            profile["first_seen_at"] = min(profile["first_seen_at"], date_published)
+            profile["job_titles"].add(title)
+            profile["public_bodies"].add(body)
+    for profile in profiles.values():
+        for field in ("job_titles", "public_bodies"):
+            profile[field] = json.dumps(sorted(profile[field] - {""}), ensure_ascii=False)
+    return profiles
+
+def build_official_links():
+    """Resolve every DPO name to its profile slug, current roster member and committee member slug once, so the
+    committee and official APIs join on these keys instead of slugifying names per request."""
+    session = Session()
+    people = session.execute(text("""
+        SELECT person_name, COUNT(DISTINCT lobbying_record_id) AS return_count
+        FROM dpo_entries
+        WHERE person_name IS NOT NULL AND TRIM(person_name) != ''
+        GROUP BY person_name
+    """)).all()
+    roster_slugs = load_current_roster_slugs()
+    profiles = build_official_profiles(session)
+
+    # A committee member is matched on its stored slug or on the general slug of its name, against either slug
+    # form of the DPO name. When several DPO names match one member, the one with the most returns wins.
+    member_keys = {}
+    for member_slug, member_name in session.execute(
+        select(CommitteeMembership.member_slug, CommitteeMembership.member_name).distinct()
+    ):
+        profile_slug = member_slug or official_slugify(member_name)
+        member_keys.setdefault(profile_slug, profile_slug)
+        member_keys.setdefault(slugify(member_name), profile_slug)
+
+    links = []
+    best_for_member = {}
+    for person_name, return_count in people:
+        official_slug = official_slugify(person_name)
+        candidates = (official_slug, slugify(person_name))
+        member_slug = next((member_keys[key] for key in candidates if key in member_keys), None)
+        link = {
+            "person_name": person_name,
+            "official_slug": official_slug,
+            "roster_slug": official_slug if official_slug in roster_slugs else None,
+            "member_slug": None,
+            "return_count": return_count,
+            **profiles.get(person_name, EMPTY_OFFICIAL_PROFILE),
+        }
+        links.append(link)
+        if member_slug:
+            current = best_for_member.get(member_slug)
+            if current is None or return_count > current["return_count"]:
+                best_for_member[member_slug] = link
+    for member_slug, link in best_for_member.items():
+        link["member_slug"] = member_slug
+
+    session.execute(delete(OfficialLink))
+    if links:
+        session.execute(insert(OfficialLink), links)
+    session.commit()
+    session.close()
+    print(
+        f"Linked {len(links)} officials: {sum(1 for link in links if link['roster_slug'])} current members, "
+        f"{len(best_for_member)} committee members."
+    )
+
+def stamp_dataset_version():
+    version = compute_dataset_version()
+    session = Session()
+    summary = compute_dataset_summary(session)
+    session.query(DatasetMetadata).delete()
+    session.add(DatasetMetadata(
+        dataset_version=version,
+        built_at=datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        **summary,
+    ))
+    session.commit()
+    session.close()
+    print(
+        f"Stamped dataset version {version}: {summary['total_returns']} returns, "
+        f"{summary['total_lobbyists']} lobbyists, {summary['total_officials']} officials."
+    )
+    return version
+
+def ingest(partition_years=False, rebuild_partitions=False):
+    recreate_tables(REBUILT_TABLES)
+    stale = list(load_year_partitions()) if rebuild_partitions else stale_year_partitions()
+    if stale:
+        drop_year_partitions(stale)
+        print(f"Dropped year partitions {', '.join(stale)}; those years are reloaded from the CSVs.")
+    partitions = load_year_partitions()
     records = fetch_all_csv_records(DATA_FOLDER)
+    if partitions:
+        records = [record for record in records if record_year(record["period"]) not in partitions]
     if records:
-        new_inserts = insert_records(records)
+        with engine.connect() as conn:
+            last_partitioned_id = conn.execute(text("SELECT MAX(last_record_id) FROM year_partitions")).scalar()
+        new_inserts = insert_records(records, first_record_id=(last_partitioned_id or 0) + 1)
         print(f"Inserted {new_inserts} new records (out of {len(records)} parsed records).")
     else:
         print("No records found.")
-    committee_inserts = insert_committee_memberships()
-    print(f"Inserted {committee_inserts} committee membership rows.")
+    if partition_years:
+        create_year_partitions()
 
-if __name__ == "__main__":
-    run_pipeline()
+def sync_committees():
+    committee_stats = sync_committee_memberships()
+    print(
+        f"Synced committee memberships across {committee_stats['committees']} committees: "
+        f"{committee_stats['inserted']} inserted, {committee_stats['updated']} updated, "
+        f"{committee_stats['deleted']} deleted, {committee_stats['unchanged']} unchanged."
+    )
+
+# (name, "table(columns)"). idx_lr_year matches the API's year filter, so a year-filtered query over the partition
+# views is an index seek in every partition, which comes back empty straight away for the other years.
+INDEXES = [
+    ("idx_dpo_person_name", "dpo_entries(person_name)"),
+    ("idx_dpo_person_name_record", "dpo_entries(person_name, lobbying_record_id)"),
+    ("idx_dpo_lobbying_record_id", "dpo_entries(lobbying_record_id)"),
+    ("idx_lr_period", "lobbying_records(period)"),
+    ("idx_lr_year", "lobbying_records(substr(TRIM(period), -4))"),
+    ("idx_lr_lobbyist_name", "lobbying_records(lobbyist_name)"),
+    ("idx_lr_period_date", "lobbying_records(period, date_published)"),
+    ("idx_lr_lobbyist_period_date", "lobbying_records(lobbyist_name, period, date_published)"),
+    ("idx_activity_lobbying_record_id", "lobbying_activity_entries(lobbying_record_id)"),
+    ("idx_activity_record_activity", "lobbying_activity_entries(lobbying_record_id, activity)"),
+    ("idx_lr_date_published", "lobbying_records(date_published)"),
+    ("idx_lr_date_published_id", "lobbying_records(date_published, id)"),
+    ("idx_lr_lobbyist_id_date_id", "lobbying_records(lobbyist_id, date_published, id)"),
+    ("idx_lr_lobbyist_id_most_officials", "lobbying_records(lobbyist_id, official_count, date_published, id)"),
+    ("idx_lr_lobbyist_id_fewest_officials", "lobbying_records(lobbyist_id, fewest_officials_key, date_published, id)"),
+    ("idx_committee_memberships_member_slug", "committee_memberships(member_slug)"),
+    ("idx_committee_memberships_committee_id", "committee_memberships(committee_id)"),
+    ("idx_committee_memberships_natural_key", "committee_memberships(committee_id, member_slug, role)"),
+    ("idx_committee_membership_changes_member_slug", "committee_membership_changes(member_slug)"),
+    ("idx_official_summary_lookup", "official_summary(title_set, year, person_name)"),
+    ("idx_official_links_person_name", "official_links(person_name)"),
+    ("idx_official_links_member_slug", "official_links(member_slug)"),
+    ("idx_official_links_official_slug", "official_links(official_slug, return_count)"),
+    ("idx_official_period_rollups_name", "official_period_rollups(person_name, period_start)"),
+    ("idx_official_period_rollups_period", "official_period_rollups(period, return_count)"),
+    ("idx_lobbyist_period_rollups_lobbyist", "lobbyist_period_rollups(lobbyist_id, period_start)"),
+    ("idx_lobbyist_period_rollups_period", "lobbyist_period_rollups(period, return_count)"),
+    ("idx_policy_area_period_rollups_period", "policy_area_period_rollups(period, return_count)"),
+    ("idx_official_facets_lookup", "official_facets(person_name, facet, value)"),
+    ("idx_graph_centrality_degree", "graph_centrality(year, entity_type, degree DESC, name)"),
+    ("idx_graph_centrality_pagerank", "graph_centrality(year, entity_type, pagerank DESC, name)"),
+    ("idx_graph_centrality_betweenness", "graph_centrality(year, entity_type, betweenness DESC, name)"),
+    ("idx_graph_centrality_name", "graph_centrality(entity_type, name, year)"),
+    ("idx_similar_entities_lookup", "similar_entities(entity_type, entity_key, year, rank)"),
+]
+
+def create_indexes(schema="main", tables=None):
+    with engine.connect() as conn:
+        for name, target in INDEXES:
+            if tables is None or target.split("(")[0] in tables:
+                conn.execute(text(f"CREATE INDEX IF NOT EXISTS {schema}.{name} ON {target}"))
+
+def load_year_partitions():
     with engine.connect() as conn:
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_dpo_person_name ON dpo_entries(person_name)"))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_dpo_person_name_record ON dpo_entries(person_name, lobbying_record_id)"))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_dpo_lobbying_record_id ON dpo_entries(lobbying_record_id)"))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lr_period ON lobbying_records(period)"))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lr_lobbyist_name ON lobbying_records(lobbyist_name)"))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lr_period_date ON lobbying_records(period, date_published)"))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lr_lobbyist_period_date ON lobbying_records(lobbyist_name, period, date_published)"))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_activity_lobbying_record_id ON lobbying_activity_entries(lobbying_record_id)"))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_activity_record_activity ON lobbying_activity_entries(lobbying_record_id, activity)"))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_lr_date_published ON lobbying_records(date_published)"))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_committee_memberships_member_slug ON committee_memberships(member_slug)"))
-        conn.execute(text("CREATE INDEX IF NOT EXISTS idx_committee_memberships_committee_id ON committee_memberships(committee_id)"))
+        return dict(conn.execute(text("SELECT year, path FROM main.year_partitions ORDER BY year")).all())
+
+def record_year(period):
+    year = (period or "").strip()[-4:]
+    return year if len(year) == 4 and year.isdigit() else None
+
+def drop_year_partitions(years):
+    with engine.begin() as conn:
+        for year in years:
+            path = conn.execute(text("SELECT path FROM year_partitions WHERE year = :year"), {"year": year}).scalar()
+            conn.execute(text("DELETE FROM year_partitions WHERE year = :year"), {"year": year})
+            if path and os.path.exists(path):
+                os.remove(path)
+    use_partition_views(False)
+
+def stale_year_partitions():
+    """Registered partitions whose file is missing or whose tables no longer match the models, e.g. after a column
+    was added; their years are ingested from the CSVs again."""
+    expected = {table.name: [column.name for column in table.columns] for table in PARTITIONED_TABLES}
+    stale = []
+    for year, path in load_year_partitions().items():
+        if not os.path.exists(path):
+            stale.append(year)
+            continue
+        conn = sqlite3.connect(path)
+        try:
+            columns = {
+                table: [row[1] for row in conn.execute(f"PRAGMA table_info({table})")] for table in expected
+            }
+        finally:
+            conn.close()
+        if columns != expected:
+            stale.append(year)
+    stale.extend(year for year in split_lobbyist_partitions() if year not in stale)
+    return sorted(stale)
+
+def split_lobbyist_partitions():
+    """Partitions whose returns point at a lobbyist id that disagrees with the other partitions once the accepted
+    merges are applied. build_lobbyists keeps the lowest stored id for each slug, so after a merge joins two lobbyists
+    filed in different partitions (or a removed merge splits one), the returns carrying the other id would point at
+    no lobbyist, or at the wrong one. Those years are reloaded so their returns are stored with the current ids."""
+    merges = lobbyist_slug_merges(ACCEPTED_NAME_VARIANTS["lobbyist"])
+    years_by_slug_id = defaultdict(set)
+    for year, path in load_year_partitions().items():
+        if not os.path.exists(path):
+            continue
+        conn = sqlite3.connect(path)
+        try:
+            rows = conn.execute("""
+                SELECT DISTINCT TRIM(lobbyist_name), lobbyist_id
+                FROM lobbying_records
+                WHERE lobbyist_id IS NOT NULL AND lobbyist_name IS NOT NULL AND TRIM(lobbyist_name) != ''
+            """).fetchall()
+        finally:
+            conn.close()
+        for name, lobbyist_id in rows:
+            slug = lobbyist_slugify(name)
+            slug = merges.get(slug, slug)
+            if slug:
+                years_by_slug_id[(slug, lobbyist_id)].add(year)
+
+    kept_ids = {}
+    for slug, lobbyist_id in sorted(years_by_slug_id):
+        kept_ids.setdefault(slug, lobbyist_id)
+    kept_slugs = {}
+    for slug, lobbyist_id in sorted(kept_ids.items()):
+        kept_slugs.setdefault(lobbyist_id, slug)
+    return sorted({
+        year
+        for (slug, lobbyist_id), years in years_by_slug_id.items()
+        if kept_ids[slug] != lobbyist_id or kept_slugs.get(lobbyist_id) != slug
+        for year in years
+    })
+
+def create_year_partitions():
+    """Moves the returns of closed years (all but the latest OPEN_PARTITION_YEARS) out of lobbying.db into one
+    database per year. The files are written once: later ingests skip those years' CSV rows, so only the open years
+    are reloaded, and readers attach the files and see every year through UNION ALL views."""
+    with engine.connect() as conn:
+        periods = conn.execute(text("SELECT DISTINCT period FROM main.lobbying_records")).scalars()
+        years = sorted({record_year(period) for period in periods} - {None})
+    registered = load_year_partitions()
+    latest = max([int(year) for year in years + list(registered)], default=0)
+    closed = [year for year in years if int(year) <= latest - OPEN_PARTITION_YEARS and year not in registered]
+    if not closed:
+        return
+
+    os.makedirs(PARTITION_FOLDER, exist_ok=True)
+    for year in closed:
+        path = os.path.join(PARTITION_FOLDER, f"lobbying_{year}.db")
+        if os.path.exists(path):
+            os.remove(path)  # left over from an interrupted build; never registered
+        partition_engine = create_engine(f"sqlite:///{path}", echo=False)
+        Base.metadata.create_all(partition_engine, tables=PARTITIONED_TABLES)
+        partition_engine.dispose()
+
+        schema = partition_schema(year)
+        with engine.connect() as conn:
+            conn.execute(text(f"ATTACH DATABASE :path AS {schema}"), {"path": path})
+            conn.execute(
+                text(f"""
+                    INSERT INTO {schema}.lobbying_records
+                    SELECT * FROM main.lobbying_records WHERE substr(TRIM(period), -4) = :year
+                """),
+                {"year": year},
+            )
+            for table in ("dpo_entries", "lobbying_activity_entries"):
+                conn.execute(text(f"""
+                    INSERT INTO {schema}.{table}
+                    SELECT * FROM main.{table}
+                    WHERE lobbying_record_id IN (SELECT id FROM {schema}.lobbying_records)
+                """))
+                conn.execute(text(f"""
+                    DELETE FROM main.{table} WHERE lobbying_record_id IN (SELECT id FROM {schema}.lobbying_records)
+                """))
+            conn.execute(text(f"""
+                DELETE FROM main.lobbying_records WHERE id IN (SELECT id FROM {schema}.lobbying_records)
+            """))
+            for name, target in INDEXES:
+                if target.split("(")[0] in {table.name for table in PARTITIONED_TABLES}:
+                    conn.execute(text(f"CREATE INDEX {schema}.{name} ON {target}"))
+            count, first_id, last_id = conn.execute(
+                text(f"SELECT COUNT(*), MIN(id), MAX(id) FROM {schema}.lobbying_records")
+            ).one()
+            conn.execute(
+                insert(YearPartition),
+                {
+                    "year": year,
+                    "path": path,
+                    "record_count": count,
+                    "first_record_id": first_id,
+                    "last_record_id": last_id,
+                    "built_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                },
+            )
+            conn.commit()
+            conn.execute(text(f"DETACH DATABASE {schema}"))
+        print(f"Partitioned {year}: {count} returns moved to {path}.")
+    use_partition_views(False)
+
+def precompute():
+    """Rebuilds every derived table and explore_insights.json from the ingested returns, without re-reading the
+    CSVs, and restamps the dataset version so API caches pick up the change."""
+    use_partition_views(True)
+    recreate_tables(DERIVED_TABLES)
+    create_indexes()
+    build_official_summary()
+    build_period_rollups()
+    build_official_facets()
+    build_graph_centrality()
+    build_similarity_index()
+    build_official_links()
     build_explore_precomputed()
+    stamp_dataset_version()
+
+COMMANDS = {
+    "ingest": ("ingest",),
+    "committees": ("committees",),
+    "indexes": ("indexes",),
+    "precompute": ("precompute",),
+    "all": ("ingest", "committees", "indexes", "precompute"),
+}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Build lobbying.db from the CSVs in data/. With no command every step runs, as `all`."
+    )
+    parser.add_argument(
+        "command",
+        nargs="?",
+        default="all",
+        choices=list(COMMANDS),
+        help="ingest: reload the returns from data/*.csv (derived tables are emptied); committees: sync committee "
+        "memberships; indexes: create missing indexes; precompute: rebuild the derived tables and insights only.",
+    )
+    parser.add_argument(
+        "--partition-years",
+        action="store_true",
+        help=f"On ingest, move closed years (all but the latest {OPEN_PARTITION_YEARS}) into per-year databases in "
+        f"{PARTITION_FOLDER}/. Existing partitions are always used.",
+    )
+    parser.add_argument(
+        "--rebuild-partitions",
+        action="store_true",
+        help="On ingest, drop the year partitions and reload every year from the CSVs (for example after accepting "
+        "name merges that affect closed years).",
+    )
+    args = parser.parse_args(argv)
+
+    connect_database()
+    steps = {
+        "ingest": lambda: ingest(partition_years=args.partition_years, rebuild_partitions=args.rebuild_partitions),
+        "committees": sync_committees,
+        "indexes": create_indexes,
+        "precompute": precompute,
+    }
+    for step in COMMANDS[args.command]:
+        steps[step]()
+    enable_wal()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""Check and benchmark the Oireachtas scrapers against the page corpus in fixtures/oireachtas.
+
+Each page listed in fixtures/oireachtas/manifest.json is parsed by the scraper for its kind and compared with the
+output recorded in fixtures/oireachtas/expected, then timed to report pages/sec, MB/sec, peak memory and allocated
+blocks per parser:
+
+    python scripts/bench_scrapers.py
+
+Each page is also re-timed with its body repeated (--scale) to flag parse times that grow well beyond linear, which
+is how regex backtracking shows up on large pages. After an intentional parser change, record the new output with
+--update-expected.
+
+Pages marked synthetic in the manifest are not live captures: most were rebuilt from the markup the parsers target,
+and the stress profile is generated. The report says how many pages are synthetic. --record replaces every page that
+has a source_url with a fresh download and clears its flag.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.fetch_committee_memberships import extract_current_committee_links, fetch_text, parse_membership_page
+from scripts.oireachtas_members import _parse_profile_contacts, parse_directory_date_start
+
+CORPUS_DIR = Path(__file__).resolve().parent / "fixtures" / "oireachtas"
+MANIFEST_PATH = CORPUS_DIR / "manifest.json"
+EXPECTED_DIR = CORPUS_DIR / "expected"
+
+
+def parse_committees(html, page):
+    return extract_current_committee_links(html, page.get("house_no", "34"))
+
+
+def parse_membership(html, page):
+    committee_name, members = parse_membership_page(html)
+    return {"committee_name": committee_name, "members": members}
+
+
+def parse_directory(html, page):
+    return {"date_start": parse_directory_date_start(html)}
+
+
+def parse_profile(html, page):
+    return _parse_profile_contacts(html)
+
+
+PARSERS = {
+    "committees": ("extract_current_committee_links", parse_committees),
+    "membership": ("MembershipPageParser", parse_membership),
+    "directory": ("parse_directory_date_start", parse_directory),
+    "profile": ("_parse_profile_contacts", parse_profile),
+}
+
+
+def load_corpus(kinds=None):
+    manifest = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    pages = []
+    for page in manifest.get("pages", []):
+        if kinds and page["kind"] not in kinds:
+            continue
+        html = (CORPUS_DIR / page["file"]).read_text(encoding="utf-8")
+        pages.append((page, html))
+    return pages
+
+
+def expected_path(page):
+    return EXPECTED_DIR / f"{Path(page['file']).stem}.json"
+
+
+def check_outputs(pages, update=False):
+    mismatches = []
+    for page, html in pages:
+        _, parse = PARSERS[page["kind"]]
+        output = parse(html, page)
+        path = expected_path(page)
+        if update:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(output, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+            continue
+        if not path.exists():
+            mismatches.append((page["file"], "no expected output recorded"))
+            continue
+        if json.loads(path.read_text(encoding="utf-8")) != json.loads(json.dumps(output)):
+            mismatches.append((page["file"], "output differs from expected"))
+    return mismatches
+
+
+def time_parse(parse, html, page, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        parse(html, page)
+    return (time.perf_counter() - start) / iterations
+
+
+def measure_allocations(parse, html, page):
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        result = parse(html, page)
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        del result
+    finally:
+        tracemalloc.stop()
+    allocated_blocks = sum(stat.count_diff for stat in after.compare_to(before, "lineno") if stat.count_diff > 0)
+    return peak, allocated_blocks
+
+
+def benchmark(pages, iterations):
+    results = {}
+    for page, html in pages:
+        label, parse = PARSERS[page["kind"]]
+        row = results.setdefault(
+            page["kind"],
+            {"parser": label, "pages": 0, "bytes": 0, "seconds": 0.0, "peak_bytes": 0, "allocated_blocks": 0},
+        )
+        row["pages"] += 1
+        row["bytes"] += len(html.encode("utf-8"))
+        row["seconds"] += time_parse(parse, html, page, iterations)
+        peak, blocks = measure_allocations(parse, html, page)
+        row["peak_bytes"] = max(row["peak_bytes"], peak)
+        row["allocated_blocks"] += blocks
+
+    for row in results.values():
+        seconds = row["seconds"] or 1e-9
+        row["pages_per_sec"] = round(row["pages"] / seconds, 1)
+        row["mb_per_sec"] = round(row["bytes"] / seconds / 1_000_000, 2)
+        row["blocks_per_page"] = round(row["allocated_blocks"] / row["pages"])
+        row["seconds"] = round(row["seconds"], 6)
+    return results
+
+
+def scaled_html(html, factor):
+    head, sep, tail = html.partition("<main")
+    if not sep:
+        return html * factor
+    body, main_end, rest = tail.partition("</main>")
+    inner = body.split(">", 1)[1] if ">" in body else body
+    return head + sep + body + inner * (factor - 1) + main_end + rest
+
+
+def check_scaling(pages, factor, threshold, iterations):
+    """Time each page at 1x and `factor`x body size and flag growth well beyond linear,
+    which is how catastrophic backtracking shows up on large pages."""
+    findings = []
+    for page, html in pages:
+        _, parse = PARSERS[page["kind"]]
+        base = time_parse(parse, html, page, iterations)
+        large = time_parse(parse, scaled_html(html, factor), page, max(1, iterations // factor))
+        ratio = large / (base * factor) if base else 0.0
+        findings.append(
+            {
+                "file": page["file"],
+                "kind": page["kind"],
+                "base_ms": round(base * 1000, 3),
+                "scaled_ms": round(large * 1000, 3),
+                "growth_vs_linear": round(ratio, 2),
+                "superlinear": ratio > threshold,
+            }
+        )
+    return findings
+
+
+def record_corpus(pages):
+    # Generated pages have no source_url; they are kept as committed. A recorded page is a live capture, so its
+    # synthetic flag is cleared in the manifest.
+    manifest = json.loads(MANIFEST_PATH.read_text(encoding="utf-8"))
+    entries = {entry["file"]: entry for entry in manifest.get("pages", [])}
+    for page, _ in pages:
+        if not page.get("source_url"):
+            print(f"Skipped generated page {page['file']}")
+            continue
+        html = fetch_text(page["source_url"])
+        (CORPUS_DIR / page["file"]).write_text(html, encoding="utf-8")
+        entries[page["file"]].pop("synthetic", None)
+        print(f"Recorded {page['source_url']} -> {page['file']}")
+    MANIFEST_PATH.write_text(json.dumps(manifest, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and benchmark the Oireachtas scrapers against the recorded corpus.")
+    parser.add_argument("--kind", action="append", choices=sorted(PARSERS), help="Only run parsers of this kind.")
+    parser.add_argument("--iterations", type=int, default=20, help="Parse iterations per page when timing.")
+    parser.add_argument("--scale", type=int, default=8, help="Body multiplier for the backtracking check (0 disables).")
+    parser.add_argument(
+        "--scale-threshold",
+        type=float,
+        default=3.0,
+        help="Flag a page when its scaled parse time exceeds this multiple of linear growth.",
+    )
+    parser.add_argument("--update-expected", action="store_true", help="Rewrite expected outputs from current parsers.")
+    parser.add_argument("--record", action="store_true", help="Re-download every recorded page from its source URL.")
+    parser.add_argument("--json", dest="json_path", help="Write the benchmark report to this file.")
+    args = parser.parse_args()
+
+    pages = load_corpus(args.kind)
+    if args.record:
+        record_corpus(pages)
+        pages = load_corpus(args.kind)
+
+    mismatches = check_outputs(pages, update=args.update_expected)
+    if args.update_expected:
+        print(f"Updated expected output for {len(pages)} pages in {EXPECTED_DIR}")
+    for file_name, reason in mismatches:
+        print(f"MISMATCH {file_name}: {reason}")
+
+    synthetic = sum(1 for page, _ in pages if page.get("synthetic"))
+    if synthetic:
+        print(f"{synthetic} of {len(pages)} pages are synthetic, not live captures (see {MANIFEST_PATH.name}).")
+
+    results = benchmark(pages, args.iterations)
+    print(f"{'kind':<12} {'parser':<32} {'pages/sec':>10} {'MB/sec':>8} {'peak KiB':>9} {'blocks/page':>12}")
+    for kind, row in sorted(results.items()):
+        print(
+            f"{kind:<12} {row['parser']:<32} {row['pages_per_sec']:>10} {row['mb_per_sec']:>8} "
+            f"{row['peak_bytes'] // 1024:>9} {row['blocks_per_page']:>12}"
+        )
+
+    scaling = check_scaling(pages, args.scale, args.scale_threshold, args.iterations) if args.scale > 1 else []
+    for finding in scaling:
+        if finding["superlinear"]:
+            print(
+                f"SUPERLINEAR {finding['file']}: {finding['base_ms']}ms at 1x, {finding['scaled_ms']}ms at "
+                f"{args.scale}x ({finding['growth_vs_linear']}x linear)"
+            )
+
+    if args.json_path:
+        report = {"parsers": results, "scaling": scaling, "mismatches": [name for name, _ in mismatches]}
+        Path(args.json_path).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
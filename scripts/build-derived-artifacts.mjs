@@ -0,0 +1,96 @@
+#!/usr/bin/env node
+// Writes minified, content-hashed copies of the derived JSON files with gzip and brotli variants next to them, plus
+// a manifest, so nginx or lib/derivedArtifacts.js can send the stored bytes instead of re-serializing per request.
+// Runs after parser.py (npm run build:db, and the Docker build):
+//   node scripts/build-derived-artifacts.mjs
+
+import crypto from "crypto"
+import fs from "fs/promises"
+import path from "path"
+import zlib from "zlib"
+
+const DERIVED_DIR = path.join(process.cwd(), "data", "derived")
+const ARTIFACTS_DIR = path.join(DERIVED_DIR, "artifacts")
+const MANIFEST_PATH = path.join(ARTIFACTS_DIR, "manifest.json")
+
+// explore_insights.json is not listed: /api/explore/insights computes its own payload, so nothing would read it.
+const SOURCES = ["committee_memberships.json", "current_oireachtas_members.json"]
+
+// /api/current-oireachtas-members serves the roster filtered by chamber, so each filter gets its own artifact.
+const VARIANTS = {
+  "current_oireachtas_members.json": {
+    dail: (roster) => (Array.isArray(roster) ? roster : []).filter((member) => member?.chamber === "dail"),
+    seanad: (roster) => (Array.isArray(roster) ? roster : []).filter((member) => member?.chamber === "seanad")
+  }
+}
+
+function sourceHash(buffer) {
+  return crypto.createHash("sha256").update(buffer).digest("hex").slice(0, 16)
+}
+
+function compress(body) {
+  return {
+    gzip: zlib.gzipSync(body, { level: zlib.constants.Z_BEST_COMPRESSION }),
+    br: zlib.brotliCompressSync(body, {
+      params: {
+        [zlib.constants.BROTLI_PARAM_QUALITY]: zlib.constants.BROTLI_MAX_QUALITY,
+        [zlib.constants.BROTLI_PARAM_SIZE_HINT]: body.length
+      }
+    })
+  }
+}
+
+// `source` records the file the artifact was built from, so lib/derivedArtifacts.js can tell when it has changed since.
+async function writeArtifact(name, payload, source) {
+  const body = Buffer.from(JSON.stringify(payload), "utf-8")
+  const hash = crypto.createHash("sha256").update(body).digest("hex").slice(0, 16)
+  const file = `${name}.${hash}.json`
+  const { gzip, br } = compress(body)
+  await fs.writeFile(path.join(ARTIFACTS_DIR, file), body)
+  await fs.writeFile(path.join(ARTIFACTS_DIR, `${file}.gz`), gzip)
+  await fs.writeFile(path.join(ARTIFACTS_DIR, `${file}.br`), br)
+  return { file, hash, bytes: body.length, gzip_bytes: gzip.length, br_bytes: br.length, ...source }
+}
+
+async function main() {
+  await fs.mkdir(ARTIFACTS_DIR, { recursive: true })
+  const artifacts = {}
+
+  for (const source of SOURCES) {
+    let payload
+    let sourceInfo
+    try {
+      const raw = await fs.readFile(path.join(DERIVED_DIR, source))
+      const stat = await fs.stat(path.join(DERIVED_DIR, source))
+      payload = JSON.parse(raw.toString("utf-8"))
+      sourceInfo = { source, source_mtime_ms: stat.mtimeMs, source_hash: sourceHash(raw) }
+    } catch (err) {
+      console.warn(`Skipping ${source}: ${err.message}`)
+      continue
+    }
+    const name = path.basename(source, ".json")
+    artifacts[name] = await writeArtifact(name, payload, sourceInfo)
+    for (const [variant, select] of Object.entries(VARIANTS[source] || {})) {
+      artifacts[`${name}.${variant}`] = await writeArtifact(`${name}.${variant}`, select(payload), sourceInfo)
+    }
+  }
+
+  // Hashed names change with the content, so anything the new manifest no longer lists is stale.
+  const keep = new Set(Object.values(artifacts).flatMap(({ file }) => [file, `${file}.gz`, `${file}.br`]))
+  keep.add(path.basename(MANIFEST_PATH))
+  for (const entry of await fs.readdir(ARTIFACTS_DIR)) {
+    if (!keep.has(entry)) await fs.unlink(path.join(ARTIFACTS_DIR, entry))
+  }
+
+  await fs.writeFile(MANIFEST_PATH, `${JSON.stringify({ artifacts }, null, 2)}\n`)
+  for (const [name, artifact] of Object.entries(artifacts)) {
+    console.log(
+      `${name}: ${artifact.bytes} bytes, gzip ${artifact.gzip_bytes}, brotli ${artifact.br_bytes} -> ${artifact.file}`
+    )
+  }
+}
+
+main().catch((err) => {
+  console.error(err)
+  process.exit(1)
+})
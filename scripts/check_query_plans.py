@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Check the query plans of the SQL the API runs against a large lobbying.db.
+
+Capture the statements by running the app with SQLITE_TRACE_FILE set (lib/sqlite.js appends every statement it
+runs), for example through the load-test harness on a synthetic database:
+
+    SQLITE_TRACE_FILE=/tmp/api-sql.jsonl node scripts/load-test.mjs --setup --returns 20000
+    python scripts/check_query_plans.py --db /tmp/lobbying-load-test/lobbying.db --trace /tmp/api-sql.jsonl
+
+fixtures/query_plans.json was recorded on that database (seed 1) from fixtures/query_plans_trace.jsonl, which keeps
+the statement variants checked for each shape, so --trace scripts/fixtures/query_plans_trace.jsonl repeats the
+check without running the app.
+
+Each distinct statement shape is run through EXPLAIN QUERY PLAN and timed. Full table scans, temp B-trees and
+automatic indexes that are not in the recorded baseline fail the check, as does a query that got much slower than
+its baseline timing. After reviewing an intended change, record it with --update-baseline.
+
+A database built with `parser.py --partition-years` runs one branch per partition (partitionBranches in
+lib/sqlite.js), so it has its own baseline, fixtures/query_plans_partitioned.json, recorded from
+fixtures/query_plans_partitioned_trace.jsonl:
+
+    python scripts/check_query_plans.py --db /tmp/lobbying-load-test/lobbying.db \
+        --trace scripts/fixtures/query_plans_partitioned_trace.jsonl \
+        --baseline scripts/fixtures/query_plans_partitioned.json
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.year_partitions import attach_year_partitions
+
+BASELINE_PATH = Path(__file__).resolve().parent / "fixtures" / "query_plans.json"
+
+CTE_NAME_RE = re.compile(r"\b(\w+)\s+AS\s+(?:NOT\s+)?(?:MATERIALIZED\s+)?\(", re.IGNORECASE)
+# Per-schema queries name their tables "partition_2021.lobbying_records lr" (partitionBranches in lib/sqlite.js).
+TABLE_ALIAS_RE = re.compile(r"\b(?:FROM|JOIN)\s+(?:\w+\.)?(\w+)(?:\s+(?:AS\s+)?(\w+))?", re.IGNORECASE)
+STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+PARAM_LIST_RE = re.compile(r"\?(?:\s*,\s*\?)+")
+SQL_KEYWORDS = {"where", "on", "join", "left", "inner", "cross", "group", "order", "limit", "using", "natural"}
+
+
+def load_trace(path):
+    statements = []
+    for line in Path(path).read_text(encoding="utf-8").splitlines():
+        if not line.strip():
+            continue
+        sql = json.loads(line)["sql"].strip()
+        if re.match(r"(?:WITH|SELECT)\b", sql, re.IGNORECASE):
+            statements.append(sql)
+    return statements
+
+
+def normalize_sql(sql):
+    """Replace literals with placeholders so the same query with different filters shares one fingerprint."""
+    sql = re.sub(r"--[^\n]*", "", sql)
+    sql = STRING_LITERAL_RE.sub("?", sql)
+    sql = NUMBER_LITERAL_RE.sub("?", sql)
+    sql = PARAM_LIST_RE.sub("?, ...", sql)
+    return " ".join(sql.split())
+
+
+def fingerprint(normalized):
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+def group_statements(statements, max_variants):
+    groups = {}
+    for sql in statements:
+        normalized = normalize_sql(sql)
+        group = groups.setdefault(fingerprint(normalized), {"sql": normalized, "variants": [], "calls": 0})
+        group["calls"] += 1
+        if sql not in group["variants"] and len(group["variants"]) < max_variants:
+            group["variants"].append(sql)
+    return groups
+
+
+def real_tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def plan_findings(conn, sql, tables):
+    """Return the scans, temp B-trees and automatic indexes in the statement's plan, e.g. 'SCAN lobbying_records'."""
+    ctes = {name.lower() for name in CTE_NAME_RE.findall(sql)}
+    aliases = {}
+    for table, alias in TABLE_ALIAS_RE.findall(sql):
+        aliases[table.lower()] = table
+        if alias and alias.lower() not in SQL_KEYWORDS:
+            aliases[alias.lower()] = table
+
+    findings = set()
+    for _, _, _, detail in conn.execute(f"EXPLAIN QUERY PLAN {sql}"):
+        if "AUTOMATIC" in detail:
+            findings.add(f"AUTOMATIC INDEX {detail.split()[1]}")
+        if detail.startswith("USE TEMP B-TREE"):
+            findings.add(detail)
+        # Partitioned tables are scanned per schema ("SCAN partition_2021.lobbying_records").
+        match = re.match(r"SCAN (?:\w+\.)?(\w+)$", detail)
+        if match and match.group(1).lower() not in ctes:
+            table = aliases.get(match.group(1).lower(), match.group(1))
+            if table in tables:
+                findings.add(f"SCAN {table}")
+    return sorted(findings)
+
+
+def time_query(conn, sql, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(sql).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(rows)
+
+
+def connect(db_path):
+    # Match the read-only connections in lib/sqlite.js so timings reflect what the API sees.
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA mmap_size=268435456")
+    # After temp_store, which discards the temp schema.
+    attach_year_partitions(conn, db_path)
+    return conn
+
+
+def check(groups, conn, baseline, repeat, slowdown, min_regression_ms):
+    tables = real_tables(conn)
+    results = []
+    for key, group in sorted(groups.items()):
+        findings = set()
+        median_ms = 0.0
+        rows = 0
+        for sql in group["variants"]:
+            findings.update(plan_findings(conn, sql, tables))
+            variant_ms, variant_rows = time_query(conn, sql, repeat)
+            if variant_ms >= median_ms:
+                median_ms, rows = variant_ms, variant_rows
+
+        recorded = baseline.get(key)
+        problems = []
+        new_findings = sorted(findings - set(recorded["findings"] if recorded else []))
+        if new_findings:
+            problems.append("new plan findings: " + "; ".join(new_findings))
+        if recorded:
+            limit = max(recorded["median_ms"] * slowdown, recorded["median_ms"] + min_regression_ms)
+            if median_ms > limit:
+                problems.append(f"{median_ms:.1f} ms vs baseline {recorded['median_ms']:.1f} ms")
+        results.append(
+            {
+                "fingerprint": key,
+                "sql": group["sql"],
+                "calls": group["calls"],
+                "rows": rows,
+                "median_ms": round(median_ms, 2),
+                "findings": sorted(findings),
+                "problems": problems,
+                "new": recorded is None,
+            }
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check API query plans against the recorded baseline.")
+    parser.add_argument("--db", default="lobbying.db", help="Database to explain and time the queries against.")
+    parser.add_argument("--trace", required=True, help="JSON-lines trace written by the app with SQLITE_TRACE_FILE.")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Accepted plan findings and timings.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per statement; the median is reported.")
+    parser.add_argument("--max-variants", type=int, default=3, help="Distinct literal variants checked per shape.")
+    parser.add_argument("--slowdown", type=float, default=2.0, help="Fail when a query exceeds this multiple of its baseline.")
+    parser.add_argument(
+        "--min-regression-ms",
+        type=float,
+        default=5.0,
+        help="Ignore slowdowns smaller than this many milliseconds (timer noise on fast queries).",
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="Record the current findings and timings.")
+    parser.add_argument("--json", dest="json_path", help="Write the full report to this file.")
+    args = parser.parse_args()
+
+    groups = group_statements(load_trace(args.trace), args.max_variants)
+    if not groups:
+        print(f"No SELECT statements in {args.trace}; run the app with SQLITE_TRACE_FILE set first.")
+        return 1
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8")) if baseline_path.exists() else {}
+    conn = connect(args.db)
+    results = check(groups, conn, baseline, args.repeat, args.slowdown, args.min_regression_ms)
+
+    print(f"{'fingerprint':<12} {'calls':>6} {'rows':>7} {'median ms':>10}  findings")
+    for result in sorted(results, key=lambda r: r["median_ms"], reverse=True):
+        status = "FAIL" if result["problems"] else ("new" if result["new"] else "")
+        print(
+            f"{result['fingerprint']:<12} {result['calls']:>6} {result['rows']:>7} {result['median_ms']:>10.2f}  "
+            f"{', '.join(result['findings']) or '-'} {status}".rstrip()
+        )
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+
+    if args.update_baseline:
+        recorded = {
+            result["fingerprint"]: {
+                "sql": result["sql"],
+                "findings": result["findings"],
+                "median_ms": result["median_ms"],
+            }
+            for result in results
+        }
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps({**baseline, **recorded}, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"Recorded {len(recorded)} query shapes in {baseline_path}")
+        return 0
+
+    failures = [result for result in results if result["problems"]]
+    for result in failures:
+        print(f"\nFAIL {result['fingerprint']}: {' / '.join(result['problems'])}\n  {result['sql'][:400]}")
+    print(f"\n{len(results)} query shapes checked, {len(failures)} failed.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
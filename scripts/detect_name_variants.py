@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""Propose merges for misspelled official and lobbyist names in lobbying.db.
+
+Names are blocked on character trigrams, so only names that share rare trigrams are compared, and each candidate
+pair is scored with a normalized edit distance. Proposals are merged into a reviewable CSV; mark a row's status as
+"accept" (or "reject") and parser.py applies the accepted merges on the next build:
+
+    python scripts/detect_name_variants.py --db lobbying.db
+    # review data/overrides/name_variants.csv, then
+    python parser.py
+"""
+
+import argparse
+import csv
+import re
+import sqlite3
+import sys
+import unicodedata
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.year_partitions import attach_year_partitions
+
+OVERRIDES_PATH = Path(__file__).resolve().parents[1] / "data" / "overrides" / "name_variants.csv"
+FIELDS = ["kind", "variant", "canonical", "score", "variant_returns", "canonical_returns", "status"]
+
+# Spelling differences in company names that are not misspellings: legal forms are dropped, so "Ibec" and
+# "IBEC CLG" or "Acme Limited" and "The Acme Ltd." compare equal.
+LOBBYIST_TOKEN_REPLACEMENTS = {"&": "and", "company": "co"}
+LOBBYIST_DROPPED_TOKENS = {"the", "ltd", "limited", "clg", "dac", "plc", "uc", "teo", "teoranta", "inc", "incorporated"}
+
+
+def fold(name):
+    stripped = "".join(c for c in unicodedata.normalize("NFD", name) if unicodedata.category(c) != "Mn")
+    return re.sub(r"[^a-z0-9&]+", " ", stripped.lower()).strip()
+
+
+def comparison_key(name, kind):
+    tokens = fold(name).split()
+    if kind == "lobbyist":
+        tokens = [
+            LOBBYIST_TOKEN_REPLACEMENTS.get(token, token) for token in tokens if token not in LOBBYIST_DROPPED_TOKENS
+        ]
+    return " ".join(tokens)
+
+
+def ngrams(key, size):
+    padded = f" {key} "
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 as soon as every path exceeds `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def similarity(a, b, threshold):
+    """1 - edit distance / length, on the keys as written and with their tokens sorted (for swapped name order)."""
+    best = 0.0
+    for left, right in ((a, b), (" ".join(sorted(a.split())), " ".join(sorted(b.split())))):
+        longest = max(len(left), len(right)) or 1
+        limit = int(longest * (1 - threshold))
+        best = max(best, 1 - edit_distance(left, right, limit) / longest)
+    return best
+
+
+def candidate_pairs(keys, ngram_size, max_block, min_dice):
+    """Pairs of key indexes that share enough trigrams, found through an inverted index. Trigrams shared by more
+    than `max_block` names (" mc", "ltd") carry no signal and are skipped, which keeps the comparison count near
+    linear in the number of names instead of quadratic."""
+    grams = [ngrams(key, ngram_size) for key in keys]
+    index = defaultdict(list)
+    for position, key_grams in enumerate(grams):
+        for gram in key_grams:
+            index[gram].append(position)
+
+    pairs = []
+    for position, key_grams in enumerate(grams):
+        shared = defaultdict(int)
+        for gram in key_grams:
+            block = index[gram]
+            if len(block) > max_block:
+                continue
+            for other in block:
+                if other > position:
+                    shared[other] += 1
+        for other, count in shared.items():
+            if 2 * count / (len(key_grams) + len(grams[other])) >= min_dice:
+                pairs.append((position, other))
+    return pairs
+
+
+def load_names(conn, kind):
+    if kind == "official":
+        query = """
+            SELECT person_name, COUNT(DISTINCT lobbying_record_id)
+            FROM dpo_entries
+            WHERE person_name IS NOT NULL AND TRIM(person_name) != ''
+            GROUP BY person_name
+        """
+    else:
+        query = "SELECT name, return_count FROM lobbyists"
+    return conn.execute(query).fetchall()
+
+
+def detect(names, kind, args):
+    """Return the merge proposals for one kind of name, the number of pairs scored and the number of distinct keys."""
+    names_by_key = defaultdict(list)
+    for name, returns in names:
+        names_by_key[comparison_key(name, kind)].append((name, returns))
+    keys = [key for key in names_by_key if key]
+
+    # Different spellings with the same key (case, accents, punctuation, "Limited" for "Ltd") are merged outright.
+    grouped = [(group, 1.0) for group in names_by_key.values() if len(group) > 1]
+    pairs = candidate_pairs(keys, args.ngram, args.max_block, args.min_dice)
+    for left, right in pairs:
+        # "Group 10" and "Group 100", or "Section 38" and "Section 39", are different organisations.
+        if re.findall(r"\d+", keys[left]) != re.findall(r"\d+", keys[right]):
+            continue
+        score = similarity(keys[left], keys[right], args.threshold)
+        if score >= args.threshold:
+            grouped.append((names_by_key[keys[left]] + names_by_key[keys[right]], score))
+
+    # A pair can come up from its shared key and again from a scored comparison of the two keys' groups; it is
+    # proposed once, with its best score.
+    best = {}
+    for group, score in grouped:
+        # The spelling on the most returns is proposed as canonical for the rest of the group.
+        ranked = sorted(group, key=lambda item: (-item[1], item[0]))
+        canonical, canonical_returns = ranked[0]
+        for variant, variant_returns in ranked[1:]:
+            pair = frozenset((variant, canonical))
+            if pair in best and best[pair][0] >= score:
+                continue
+            best[pair] = (
+                score,
+                {
+                    "kind": kind,
+                    "variant": variant,
+                    "canonical": canonical,
+                    "score": f"{score:.3f}",
+                    "variant_returns": variant_returns,
+                    "canonical_returns": canonical_returns,
+                    "status": "proposed",
+                },
+            )
+    proposals = [proposal for _, proposal in best.values()]
+    return proposals, len(pairs), len(keys)
+
+
+def read_overrides(path):
+    if not path.exists():
+        return []
+    with path.open(newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Propose official and lobbyist name merges for review.")
+    parser.add_argument("--db", default="lobbying.db")
+    parser.add_argument("--out", default=str(OVERRIDES_PATH), help="Reviewed override file to add proposals to.")
+    parser.add_argument("--kind", action="append", choices=["official", "lobbyist"], help="Only check this kind.")
+    parser.add_argument("--threshold", type=float, default=0.85, help="Minimum edit-distance similarity to propose.")
+    parser.add_argument("--ngram", type=int, default=3, help="Character n-gram size used for blocking.")
+    parser.add_argument("--max-block", type=int, default=200, help="Skip n-grams shared by more names than this.")
+    parser.add_argument("--min-dice", type=float, default=0.5, help="Minimum n-gram overlap before scoring a pair.")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(f"file:{args.db}?mode=ro", uri=True)
+    attach_year_partitions(conn, args.db)
+    out_path = Path(args.out)
+    rows = read_overrides(out_path)
+    # Reviewed rows keep their status; a pair is never proposed twice, in either direction.
+    known = {(row["kind"], frozenset((row["variant"], row["canonical"]))) for row in rows}
+
+    added = 0
+    for kind in args.kind or ["official", "lobbyist"]:
+        proposals, comparisons, key_count = detect(load_names(conn, kind), kind, args)
+        new = [row for row in proposals if (kind, frozenset((row["variant"], row["canonical"]))) not in known]
+        for row in new:
+            known.add((kind, frozenset((row["variant"], row["canonical"]))))
+        rows.extend(new)
+        added += len(new)
+        all_pairs = key_count * (key_count - 1) // 2
+        print(
+            f"{kind}: {key_count} distinct names, scored {comparisons} candidate pairs "
+            f"({comparisons / max(all_pairs, 1):.2%} of all pairs), {len(proposals)} proposals, {len(new)} new."
+        )
+
+    rows.sort(key=lambda row: (row["kind"], row["status"] != "proposed", -float(row["score"] or 0), row["variant"]))
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"Wrote {len(rows)} rows ({added} new) to {out_path}; set status to accept or reject after review.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
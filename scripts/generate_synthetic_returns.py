@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Write a synthetic Register of Lobbying CSV export for load tests and benchmarks.
+
+Lobbyists and officials are drawn from a Zipf-like distribution, so a few of them have thousands of returns the
+way the real register does, while the long tail has a handful each.
+"""
+
+import argparse
+import csv
+import random
+from pathlib import Path
+
+CSV_HEADER = [
+    "Id",
+    "Url",
+    "Lobbyist Name",
+    "Date Published",
+    "Period",
+    "Relevant Matter",
+    "Public Policy Area",
+    "Specific Details",
+    "DPOs Lobbied",
+    "Subject Matter",
+    "Intended Results",
+    "Lobbying Activities",
+    "Person primarily responsible for lobbying on this activity",
+    "Any DPOs or Former DPOs who carried out lobbying activities",
+    "Current or Former DPOs",
+    "Was this a grassroots campaign?",
+    "Grassroots directive",
+    "Was this lobbying done on behalf of a client?",
+    "Client(s)",
+]
+
+PERIODS = [
+    ("1 Jan, {year} to 30 Apr, {year}", 5, 0),
+    ("1 May, {year} to 31 Aug, {year}", 9, 0),
+    ("1 Sep, {year} to 31 Dec, {year}", 1, 1),
+]
+TITLES = ["TD", "Minister", "Minister of State", "Senator", "Special Adviser", "Secretary General", "Councillor"]
+PUBLIC_BODIES = ["Dáil Éireann", "Seanad Éireann", "Department of Housing", "Department of Health", "Dublin City Council"]
+POLICY_AREAS = ["Health", "Housing", "Energy", "Agriculture", "Transport", "Finance", "Education", "Environment"]
+METHODS = ["Meeting", "Email", "Phone call", "Letter", "Social media", "Event/Reception"]
+TOPICS = [
+    "housing supply", "energy costs", "planning reform", "hospital waiting lists", "rural broadband",
+    "carbon tax", "childcare funding", "public transport", "farm payments", "insurance costs",
+]
+FIRST_NAMES = ["Micheál", "Mary", "Seán", "Aoife", "Darragh", "Niamh", "Paschal", "Róisín", "Eamon", "Ciara"]
+SURNAMES = ["Ó Snodaigh", "Murphy", "Kelly", "O'Brien", "Walsh", "Byrne", "Ryan", "Ní Riada", "McDonald", "Doyle"]
+
+
+def zipf_weights(count, exponent=1.1):
+    return [1 / (rank ** exponent) for rank in range(1, count + 1)]
+
+
+def build_officials(count, rng):
+    names = set()
+    while len(names) < count:
+        names.add(f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}" + (f" {len(names)}" if len(names) > 80 else ""))
+    return [(name, rng.choice(TITLES), rng.choice(PUBLIC_BODIES)) for name in sorted(names)]
+
+
+def write_returns(path, returns, lobbyist_count, official_count, first_year, last_year, seed):
+    rng = random.Random(seed)
+    lobbyists = [f"Lobby Group {index}" for index in range(lobbyist_count)]
+    officials = build_officials(official_count, rng)
+    lobbyist_weights = zipf_weights(len(lobbyists))
+    official_weights = zipf_weights(len(officials))
+    years = list(range(first_year, last_year + 1))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for index in range(returns):
+            year = rng.choice(years)
+            period_template, publish_month, year_offset = rng.choice(PERIODS)
+            published = f"{rng.randint(1, 28):02d}/{publish_month:02d}/{year + year_offset} {rng.randint(8, 18):02d}:{rng.randint(0, 59):02d}"
+            lobbied = {
+                officials[i]
+                for i in rng.choices(range(len(officials)), weights=official_weights, k=rng.choice([1, 1, 2, 3, 5, 8]))
+            }
+            topic = rng.choice(TOPICS)
+            activities = "::".join(
+                f"{method}|{rng.choice(TOPICS).capitalize()} discussion|"
+                for method in rng.sample(METHODS, rng.randint(1, 3))
+            )
+            writer.writerow([
+                index,
+                f"https://www.lobbying.ie/return/{index}/synthetic",
+                rng.choices(lobbyists, weights=lobbyist_weights)[0],
+                published,
+                period_template.format(year=year),
+                "Public policy or programme",
+                rng.choice(POLICY_AREAS),
+                f"Engagement on {topic} and related measures in the {year} budget",
+                "::".join(f"{name}|{title}|{body}" for name, title, body in sorted(lobbied)),
+                f"{topic.capitalize()} policy",
+                f"Changes to {topic} policy",
+                activities,
+                "Jane Doe",
+                rng.choice(["Yes", "No", "No", "No"]),
+                "",
+                rng.choice(["No", "No", "No", "Yes"]),
+                "",
+                rng.choice(["No", "Yes"]),
+                "",
+            ])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out-dir", default="data", help="Directory the CSV is written to (parser.py reads data/).")
+    parser.add_argument("--returns", type=int, default=20_000)
+    parser.add_argument("--lobbyists", type=int, default=2_000)
+    parser.add_argument("--officials", type=int, default=400)
+    parser.add_argument("--first-year", type=int, default=2015)
+    parser.add_argument("--last-year", type=int, default=2025)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    path = Path(args.out_dir) / "Lobbying_ie_returns_results_synthetic.csv"
+    write_returns(path, args.returns, args.lobbyists, args.officials, args.first_year, args.last_year, args.seed)
+    print(f"Wrote {args.returns} synthetic returns to {path}")
+
+
+if __name__ == "__main__":
+    main()
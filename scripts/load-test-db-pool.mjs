@@ -0,0 +1,80 @@
+#!/usr/bin/env node
+// Measures how a slow aggregation affects fast lookups running at the same time.
+// Start the app (npm run build && npm start) with SQLITE_POOL_SIZE=1 and then with the default pool, and compare:
+//   node scripts/load-test-db-pool.mjs --base-url http://localhost:3000 --duration 20
+
+const args = Object.fromEntries(
+  process.argv
+    .slice(2)
+    .reduce((pairs, arg, index, all) => (arg.startsWith("--") ? [...pairs, [arg.slice(2), all[index + 1]]] : pairs), [])
+)
+
+const BASE_URL = args["base-url"] || "http://localhost:3000"
+const DURATION_MS = Number(args.duration || 20) * 1000
+const SLOW_CONCURRENCY = Number(args["slow-concurrency"] || 2)
+const FAST_CONCURRENCY = Number(args["fast-concurrency"] || 8)
+
+// A fresh search term per request keeps explore/insights off the server cache so every call runs the full aggregation.
+const slowPath = (n) => `/api/explore/insights?year=all&q=${encodeURIComponent(`load-${n}-${Date.now()}`)}`
+const fastPath = () => "/api/officials/names"
+
+function percentile(sorted, p) {
+  if (!sorted.length) return 0
+  const index = Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1)
+  return sorted[Math.max(0, index)]
+}
+
+function summarize(latencies, errors) {
+  const sorted = latencies.slice().sort((a, b) => a - b)
+  return {
+    requests: sorted.length,
+    errors,
+    p50_ms: Math.round(percentile(sorted, 50)),
+    p95_ms: Math.round(percentile(sorted, 95)),
+    p99_ms: Math.round(percentile(sorted, 99)),
+    max_ms: Math.round(sorted.at(-1) || 0)
+  }
+}
+
+async function worker(buildPath, deadline, latencies, counters) {
+  let n = 0
+  while (Date.now() < deadline) {
+    const started = performance.now()
+    try {
+      const res = await fetch(`${BASE_URL}${buildPath(n++)}`)
+      await res.arrayBuffer()
+      if (!res.ok) counters.errors += 1
+      latencies.push(performance.now() - started)
+    } catch {
+      counters.errors += 1
+    }
+  }
+}
+
+async function main() {
+  const deadline = Date.now() + DURATION_MS
+  const slow = { latencies: [], errors: 0 }
+  const fast = { latencies: [], errors: 0 }
+
+  await Promise.all([
+    ...Array.from({ length: SLOW_CONCURRENCY }, () => worker(slowPath, deadline, slow.latencies, slow)),
+    ...Array.from({ length: FAST_CONCURRENCY }, () => worker(fastPath, deadline, fast.latencies, fast))
+  ])
+
+  const report = {
+    base_url: BASE_URL,
+    duration_s: DURATION_MS / 1000,
+    slow: {
+      path: "/api/explore/insights?year=all&q=<unique>",
+      concurrency: SLOW_CONCURRENCY,
+      ...summarize(slow.latencies, slow.errors)
+    },
+    fast: { path: fastPath(), concurrency: FAST_CONCURRENCY, ...summarize(fast.latencies, fast.errors) }
+  }
+  console.log(JSON.stringify(report, null, 2))
+}
+
+main().catch((err) => {
+  console.error(err)
+  process.exit(1)
+})
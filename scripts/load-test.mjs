@@ -0,0 +1,355 @@
+#!/usr/bin/env node
+// Replays a weighted mix of API requests at a fixed concurrency and reports p50/p95/p99 latency, throughput and
+// X-Data-Cache hit ratio per route. Results are saved under benchmarks/load-test/ so runs can be compared across
+// commits.
+//   npm run build && node scripts/load-test.mjs --setup --duration 60
+//   node scripts/load-test.mjs --base-url http://localhost:3000 --compare benchmarks/load-test/<earlier run>.json
+// --setup builds a synthetic lobbying.db (scripts/generate_synthetic_returns.py + parser.py) in a scratch directory,
+// with --partition-years moving its closed years into partitions/; without --base-url the script starts `next start`
+// against that database (or --db) and stops it afterwards.
+
+import { execFileSync, spawn } from "child_process"
+import fs from "fs/promises"
+import os from "os"
+import path from "path"
+
+const args = Object.fromEntries(
+  process.argv
+    .slice(2)
+    .reduce(
+      (pairs, arg, index, all) =>
+        arg.startsWith("--")
+          ? [...pairs, [arg.slice(2), all[index + 1] && !all[index + 1].startsWith("--") ? all[index + 1] : "true"]]
+          : pairs,
+      []
+    )
+)
+
+const ROOT = process.cwd()
+const PORT = Number(args.port || 3100)
+const BASE_URL = args["base-url"] || `http://127.0.0.1:${PORT}`
+const DURATION_MS = Number(args.duration || 30) * 1000
+const WARMUP_MS = Number(args.warmup || 5) * 1000
+const CONCURRENCY = Number(args.concurrency || 8)
+const SEED = Number(args.seed || 1)
+const WORKDIR = path.resolve(args.workdir || path.join(os.tmpdir(), "lobbying-load-test"))
+const DB_PATH = path.resolve(args.db || (args.setup ? path.join(WORKDIR, "lobbying.db") : "lobbying.db"))
+const OUT_DIR = path.resolve(args["out-dir"] || path.join("benchmarks", "load-test"))
+const PYTHON = args.python || process.env.PYTHON || "python3"
+
+// Deterministic so two runs against the same database replay the same request sequence.
+function createRandom(seed) {
+  let state = seed >>> 0
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0
+    let t = state
+    t = Math.imul(t ^ (t >>> 15), t | 1)
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61)
+    return ((t ^ (t >>> 14)) >>> 0) / 4294967296
+  }
+}
+
+const random = createRandom(SEED)
+
+// Skewed towards the front of a list sorted by popularity, the way real traffic concentrates on a few profiles.
+function pickPopular(list) {
+  return list[Math.floor(list.length * random() ** 3)]
+}
+
+function pick(list) {
+  return list[Math.floor(list.length * random())]
+}
+
+function lobbyistSlugify(name) {
+  return name
+    .normalize("NFD")
+    .replace(/[^\p{L}\p{N}]+/gu, "-")
+    .replace(/-+/g, "-")
+    .replace(/^-|-$/g, "")
+    .toLowerCase()
+}
+
+async function getJson(urlPath) {
+  const res = await fetch(`${BASE_URL}${urlPath}`)
+  if (!res.ok) throw new Error(`${urlPath} returned ${res.status}`)
+  return res.json()
+}
+
+function run(command, commandArgs, options) {
+  console.error(`$ ${command} ${commandArgs.join(" ")}`)
+  execFileSync(command, commandArgs, { stdio: ["ignore", process.stderr, process.stderr], ...options })
+}
+
+// parser.py reads data/*.csv and data/derived/ relative to its working directory and writes lobbying.db there.
+async function setupDatabase() {
+  await fs.rm(WORKDIR, { recursive: true, force: true })
+  await fs.mkdir(path.join(WORKDIR, "data"), { recursive: true })
+  await fs.cp(path.join(ROOT, "data", "derived"), path.join(WORKDIR, "data", "derived"), { recursive: true })
+  run(PYTHON, [
+    path.join(ROOT, "scripts", "generate_synthetic_returns.py"),
+    "--out-dir",
+    path.join(WORKDIR, "data"),
+    "--returns",
+    String(args.returns || 20000),
+    "--seed",
+    String(SEED)
+  ])
+  const parserArgs = args["partition-years"] ? ["--partition-years"] : []
+  run(PYTHON, [path.join(ROOT, "parser.py"), ...parserArgs], { cwd: WORKDIR })
+}
+
+async function startServer() {
+  const server = spawn("npx", ["next", "start", "-p", String(PORT)], {
+    cwd: ROOT,
+    env: { ...process.env, LOBBYING_DB_PATH: DB_PATH },
+    stdio: ["ignore", "ignore", "inherit"]
+  })
+  const deadline = Date.now() + 60_000
+  for (;;) {
+    if (server.exitCode !== null) throw new Error(`next start exited with code ${server.exitCode}`)
+    try {
+      await getJson("/api/periods-latest")
+      return server
+    } catch (err) {
+      if (Date.now() >= deadline) {
+        server.kill()
+        throw err
+      }
+      await new Promise((resolve) => setTimeout(resolve, 500))
+    }
+  }
+}
+
+async function discoverTargets() {
+  const [officials, lobbyists, years, committees] = await Promise.all([
+    getJson("/api/officials?period=All"),
+    getJson("/api/lobbyists?period=All"),
+    getJson("/api/years"),
+    getJson("/api/committees").catch(() => [])
+  ])
+  return {
+    officials: officials.slice().sort((a, b) => (b.return_count || 0) - (a.return_count || 0)),
+    lobbyists: lobbyists
+      .slice()
+      .sort((a, b) => (b.returnCount || 0) - (a.returnCount || 0))
+      .map((lobbyist) => lobbyistSlugify(lobbyist.name)),
+    years: years.years || [],
+    committees: (Array.isArray(committees) ? committees : []).map((committee) => committee.slug).filter(Boolean)
+  }
+}
+
+// Each route builds a path from the discovered targets; weights approximate the relative traffic of each page.
+function buildRoutes(targets) {
+  const { officials, lobbyists, years, committees } = targets
+  const sorts = ["newest", "newest", "newest", "fewest-officials", "most-officials"]
+  const searchTerms = ["housing", "energy", "health", "transport", "budget"]
+  const officialSlug = () => encodeURIComponent(pickPopular(officials).slug)
+  const routes = [
+    { name: "officials-index", weight: 4, path: () => "/api/officials?period=All" },
+    { name: "officials-index-year", weight: 2, path: () => `/api/officials?year=${pick(years)}` },
+    { name: "officials-names", weight: 2, path: () => "/api/officials/names" },
+    {
+      name: "official-detail",
+      weight: 20,
+      path: () => `/api/officials/${officialSlug()}?page=${1 + Math.floor(random() ** 2 * 5)}&sort=${pick(sorts)}`
+    },
+    {
+      name: "official-detail-filtered",
+      weight: 6,
+      path: () => `/api/officials/${officialSlug()}?year=${pick(years)}&method=Meeting`
+    },
+    { name: "official-methods", weight: 4, path: () => `/api/officials/${officialSlug()}/methods` },
+    { name: "lobbyists-index", weight: 3, path: () => "/api/lobbyists?period=All" },
+    {
+      name: "lobbyist-detail",
+      weight: 12,
+      path: () => `/api/lobbyists/${encodeURIComponent(pickPopular(lobbyists))}?page=${1 + Math.floor(random() * 3)}`
+    },
+    { name: "explore-insights", weight: 8, path: () => `/api/explore/insights?year=${pick(["all", ...years])}` },
+    {
+      name: "explore-search",
+      weight: 3,
+      path: () => `/api/explore/insights?year=all&q=${encodeURIComponent(pick(searchTerms))}`
+    },
+    {
+      name: "chord-data",
+      weight: 4,
+      path: () => {
+        const names = officials.slice(0, 10).map((official) => encodeURIComponent(official.name))
+        return `/api/chord-data?officials=${pick(names)},${pick(names)}&start_year=${years[0]}&end_year=${years.at(-1)}`
+      }
+    },
+    { name: "committees-index", weight: 2, path: () => "/api/committees" },
+    { name: "committee-detail", weight: 2, path: () => `/api/committees/${encodeURIComponent(pick(committees))}` },
+    { name: "current-members", weight: 2, path: () => "/api/current-oireachtas-members?chamber=dail" },
+    { name: "years", weight: 2, path: () => "/api/years" },
+    { name: "periods", weight: 1, path: () => "/api/periods" },
+    { name: "periods-latest", weight: 2, path: () => "/api/periods-latest" },
+    { name: "data-metadata", weight: 2, path: () => "/api/data-metadata" },
+    { name: "derived", weight: 1, path: () => "/api/derived/committee_memberships" },
+    { name: "export-official", weight: 1, path: () => `/api/export/officials/${officialSlug()}?format=ndjson` }
+  ]
+  // Routes that need a target are dropped when the database has none (e.g. no committee memberships fetched).
+  const needs = { official: officials, chord: officials, lobbyist: lobbyists, committee: committees }
+  return routes.filter((route) => !(needs[route.name.split("-")[0]]?.length === 0))
+}
+
+function pickRoute(routes, totalWeight) {
+  let remaining = random() * totalWeight
+  for (const route of routes) {
+    remaining -= route.weight
+    if (remaining < 0) return route
+  }
+  return routes.at(-1)
+}
+
+function percentile(sorted, p) {
+  if (!sorted.length) return 0
+  const index = Math.min(sorted.length - 1, Math.ceil((p / 100) * sorted.length) - 1)
+  return sorted[Math.max(0, index)]
+}
+
+function summarize(stats, durationMs) {
+  const sorted = stats.latencies.slice().sort((a, b) => a - b)
+  const cacheable = stats.hits + stats.misses
+  return {
+    requests: sorted.length + stats.errors,
+    errors: stats.errors,
+    rps: Number(((sorted.length / durationMs) * 1000).toFixed(2)),
+    p50_ms: Number(percentile(sorted, 50).toFixed(1)),
+    p95_ms: Number(percentile(sorted, 95).toFixed(1)),
+    p99_ms: Number(percentile(sorted, 99).toFixed(1)),
+    max_ms: Number((sorted.at(-1) || 0).toFixed(1)),
+    cache_hit_ratio: cacheable ? Number((stats.hits / cacheable).toFixed(3)) : null
+  }
+}
+
+async function replay(routes, durationMs) {
+  const totalWeight = routes.reduce((sum, route) => sum + route.weight, 0)
+  const emptyStats = () => ({ latencies: [], errors: 0, hits: 0, misses: 0 })
+  const stats = Object.fromEntries(routes.map((route) => [route.name, emptyStats()]))
+  const deadline = Date.now() + durationMs
+
+  async function worker() {
+    while (Date.now() < deadline) {
+      const route = pickRoute(routes, totalWeight)
+      const routeStats = stats[route.name]
+      const started = performance.now()
+      try {
+        const res = await fetch(`${BASE_URL}${route.path()}`)
+        await res.arrayBuffer()
+        if (!res.ok) {
+          routeStats.errors += 1
+          continue
+        }
+        routeStats.latencies.push(performance.now() - started)
+        const cache = res.headers.get("x-data-cache")
+        if (cache === "HIT") routeStats.hits += 1
+        else if (cache === "MISS") routeStats.misses += 1
+      } catch {
+        routeStats.errors += 1
+      }
+    }
+  }
+
+  await Promise.all(Array.from({ length: CONCURRENCY }, worker))
+  const all = emptyStats()
+  for (const routeStats of Object.values(stats)) {
+    all.latencies.push(...routeStats.latencies)
+    all.errors += routeStats.errors
+    all.hits += routeStats.hits
+    all.misses += routeStats.misses
+  }
+  return {
+    total: summarize(all, durationMs),
+    routes: Object.fromEntries(
+      Object.entries(stats)
+        .filter(([, routeStats]) => routeStats.latencies.length || routeStats.errors)
+        .map(([name, routeStats]) => [name, summarize(routeStats, durationMs)])
+    )
+  }
+}
+
+function gitDescribe() {
+  try {
+    const sha = execFileSync("git", ["rev-parse", "--short", "HEAD"], { encoding: "utf-8" }).trim()
+    const dirty = execFileSync("git", ["status", "--porcelain", "--untracked-files=no"], { encoding: "utf-8" }).trim()
+    return dirty ? `${sha}-dirty` : sha
+  } catch {
+    return "unknown"
+  }
+}
+
+function formatDelta(current, previous) {
+  if (current == null || previous == null) return ""
+  if (!previous) return ""
+  const change = ((current - previous) / previous) * 100
+  return ` (${change >= 0 ? "+" : ""}${change.toFixed(1)}%)`
+}
+
+function printTable(result, previous) {
+  const columns = ["requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "cache_hit_ratio"]
+  const rows = [["route", ...columns]]
+  for (const [name, summary] of [...Object.entries(result.routes), ["total", result.total]]) {
+    const before = name === "total" ? previous?.total : previous?.routes?.[name]
+    rows.push([
+      name,
+      ...columns.map((column) => {
+        const value = summary[column]
+        const delta = ["rps", "p50_ms", "p95_ms", "p99_ms"].includes(column) ? formatDelta(value, before?.[column]) : ""
+        return `${value ?? "-"}${delta}`
+      })
+    ])
+  }
+  const widths = rows[0].map((_, index) => Math.max(...rows.map((row) => String(row[index]).length)))
+  for (const row of rows) {
+    console.log(row.map((cell, index) => String(cell).padEnd(widths[index])).join("  "))
+  }
+}
+
+async function main() {
+  let server = null
+  if (args.setup) await setupDatabase()
+  if (!args["base-url"]) {
+    await fs.access(DB_PATH)
+    server = await startServer()
+  }
+
+  try {
+    const targets = await discoverTargets()
+    const routes = buildRoutes(targets)
+    if (WARMUP_MS) await replay(routes, WARMUP_MS)
+    const result = await replay(routes, DURATION_MS)
+
+    const commit = gitDescribe()
+    const report = {
+      commit,
+      label: args.label || null,
+      recorded_at: new Date().toISOString(),
+      base_url: BASE_URL,
+      database: args["base-url"] ? null : DB_PATH,
+      synthetic_returns: args.setup ? Number(args.returns || 20000) : null,
+      duration_s: DURATION_MS / 1000,
+      warmup_s: WARMUP_MS / 1000,
+      concurrency: CONCURRENCY,
+      seed: SEED,
+      ...result
+    }
+
+    await fs.mkdir(OUT_DIR, { recursive: true })
+    const outPath = path.join(OUT_DIR, `${report.recorded_at.replace(/[:.]/g, "-")}-${commit}.json`)
+    await fs.writeFile(outPath, `${JSON.stringify(report, null, 2)}\n`)
+
+    const previous = args.compare ? JSON.parse(await fs.readFile(args.compare, "utf-8")) : null
+    if (previous) console.log(`Compared with ${previous.commit} (${previous.recorded_at})`)
+    printTable(report, previous)
+    console.log(`Saved ${path.relative(ROOT, outPath)}`)
+  } finally {
+    server?.kill()
+  }
+}
+
+main().catch((err) => {
+  console.error(err)
+  process.exit(1)
+})
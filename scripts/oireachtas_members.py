@@ -47,14 +47,17 @@ def fetch_html(url):
     return result.stdout
 
 
-def discover_date_start(chamber):
-    directory_html = fetch_html(DIRECTORIES[chamber]["directory_url"])
-    dates = re.findall(r"\.(\d{4}-\d{2}-\d{2})/", directory_html)
+def parse_directory_date_start(html):
+    dates = re.findall(r"\.(\d{4}-\d{2}-\d{2})/", html)
     if not dates:
         return None
     return Counter(dates).most_common(1)[0][0]
 
 
+def discover_date_start(chamber):
+    return parse_directory_date_start(fetch_html(DIRECTORIES[chamber]["directory_url"]))
+
+
 def fetch_current_members_for_chamber(chamber):
     date_start = discover_date_start(chamber)
     if not date_start:
@@ -0,0 +1,181 @@
+#!/usr/bin/env node
+// Pre-populates the API response cache after a rebuild or deploy, so the first visitors to popular pages do not pay
+// the cold-query cost. Targets come from an access log when one is given, otherwise from return-count rankings:
+//   node scripts/warm-cache.mjs --base-url http://localhost:3000 --budget 60
+//   node scripts/warm-cache.mjs --access-log /var/log/nginx/access.log --top 200
+// The cache lives in the app process, so run this against each running instance.
+
+const args = Object.fromEntries(
+  process.argv
+    .slice(2)
+    .reduce((pairs, arg, index, all) => (arg.startsWith("--") ? [...pairs, [arg.slice(2), all[index + 1]]] : pairs), [])
+)
+
+const BASE_URL = args["base-url"] || process.env.INTERNAL_BASE_URL || "http://localhost:3000"
+const BUDGET_MS = Number(args.budget || 60) * 1000
+const CONCURRENCY = Number(args.concurrency || 4)
+const TOP = Number(args.top || 50)
+const CHORD_OFFICIALS = Number(args["chord-officials"] || 5)
+const WAIT_FOR_SERVER_MS = Number(args["wait-for-server"] || 0) * 1000
+const ACCESS_LOG = args["access-log"]
+
+// Only these routes read from lib/serverCache.js; warming anything else would not outlive the request.
+const CACHED_ROUTES = [
+  /^\/api\/officials\/[^/?]+(\?|$)/,
+  /^\/api\/lobbyists\/[^/?]+(\?|$)/,
+  /^\/api\/explore\/insights/,
+  /^\/api\/chord-data/
+]
+
+function lobbyistSlugify(name) {
+  return name
+    .normalize("NFD")
+    .replace(/[^\p{L}\p{N}]+/gu, "-")
+    .replace(/-+/g, "-")
+    .replace(/^-|-$/g, "")
+    .toLowerCase()
+}
+
+async function getJson(path) {
+  const res = await fetch(`${BASE_URL}${path}`)
+  if (!res.ok) throw new Error(`${path} returned ${res.status}`)
+  return res.json()
+}
+
+async function waitForServer() {
+  const deadline = Date.now() + WAIT_FOR_SERVER_MS
+  for (;;) {
+    try {
+      await getJson("/api/periods-latest")
+      return
+    } catch (err) {
+      if (Date.now() >= deadline) throw err
+      await new Promise((resolve) => setTimeout(resolve, 1000))
+    }
+  }
+}
+
+// Counts GET requests to cached routes in a common/combined format access log, most requested first.
+async function targetsFromAccessLog(logPath) {
+  const { readFile } = await import("fs/promises")
+  const counts = new Map()
+  for (const line of (await readFile(logPath, "utf-8")).split("\n")) {
+    const match = line.match(/"GET (\S+) HTTP\/[\d.]+" (\d{3})/)
+    if (!match || !["200", "304"].includes(match[2])) continue
+    const path = match[1]
+    if (!CACHED_ROUTES.some((route) => route.test(path))) continue
+    counts.set(path, (counts.get(path) || 0) + 1)
+  }
+  return Array.from(counts.entries())
+    .sort((a, b) => b[1] - a[1])
+    .slice(0, TOP)
+    .map(([path]) => path)
+}
+
+// Without a log, warm the default view of the officials and lobbyists with the most returns, every explore year,
+// and the default chord view for each pair of the busiest officials. Interleaving keeps every kind represented if
+// the budget runs out.
+async function targetsFromRankings() {
+  const [officials, lobbyists, years] = await Promise.all([
+    getJson("/api/officials?period=All"),
+    getJson("/api/lobbyists?period=All"),
+    getJson("/api/years")
+  ])
+  const topOfficials = officials
+    .slice()
+    .sort((a, b) => (b.return_count || 0) - (a.return_count || 0))
+    .slice(0, TOP)
+  const topLobbyists = lobbyists
+    .slice()
+    .sort((a, b) => (b.returnCount || 0) - (a.returnCount || 0))
+    .slice(0, TOP)
+
+  const explorePaths = ["/api/explore/insights", "/api/explore/insights?year=all"]
+  for (const year of (years.years || []).slice().reverse()) {
+    explorePaths.push(`/api/explore/insights?year=${encodeURIComponent(year)}`)
+  }
+
+  const chordPaths = []
+  const chordNames = topOfficials.slice(0, CHORD_OFFICIALS).map((official) => official.name)
+  const startYear = 2015
+  const endYear = new Date().getFullYear()
+  for (let i = 0; i < chordNames.length; i++) {
+    for (let j = i + 1; j < chordNames.length; j++) {
+      chordPaths.push(
+        `/api/chord-data?officials=${encodeURIComponent(chordNames[i])},${encodeURIComponent(
+          chordNames[j]
+        )}&start_year=${startYear}&end_year=${endYear}`
+      )
+    }
+  }
+
+  const lists = [
+    explorePaths,
+    topOfficials.map((official) => `/api/officials/${encodeURIComponent(official.slug)}`),
+    topLobbyists.map((lobbyist) => `/api/lobbyists/${encodeURIComponent(lobbyistSlugify(lobbyist.name))}`),
+    chordPaths
+  ]
+  const interleaved = []
+  for (let i = 0; lists.some((list) => i < list.length); i++) {
+    for (const list of lists) {
+      if (i < list.length) interleaved.push(list[i])
+    }
+  }
+  return interleaved
+}
+
+async function main() {
+  const started = performance.now()
+  if (WAIT_FOR_SERVER_MS) await waitForServer()
+
+  const targets = ACCESS_LOG ? await targetsFromAccessLog(ACCESS_LOG) : await targetsFromRankings()
+  const deadline = Date.now() + BUDGET_MS
+  const report = { warmed: 0, already_cached: 0, failed: 0, skipped: 0, slowest: [] }
+  const timings = []
+  let next = 0
+
+  async function worker() {
+    while (next < targets.length) {
+      if (Date.now() >= deadline) return
+      const path = targets[next++]
+      const requestStarted = performance.now()
+      try {
+        const res = await fetch(`${BASE_URL}${path}`)
+        await res.arrayBuffer()
+        if (!res.ok) {
+          report.failed += 1
+          continue
+        }
+        if (res.headers.get("x-data-cache") === "HIT") report.already_cached += 1
+        else report.warmed += 1
+        timings.push({ path, ms: Math.round(performance.now() - requestStarted) })
+      } catch {
+        report.failed += 1
+      }
+    }
+  }
+
+  await Promise.all(Array.from({ length: CONCURRENCY }, worker))
+  report.skipped = targets.length - Math.min(next, targets.length)
+  report.slowest = timings.sort((a, b) => b.ms - a.ms).slice(0, 5)
+
+  console.log(
+    JSON.stringify(
+      {
+        base_url: BASE_URL,
+        source: ACCESS_LOG ? `access log ${ACCESS_LOG}` : "return-count rankings",
+        targets: targets.length,
+        budget_s: BUDGET_MS / 1000,
+        elapsed_ms: Math.round(performance.now() - started),
+        ...report
+      },
+      null,
+      2
+    )
+  )
+}
+
+main().catch((err) => {
+  console.error(err)
+  process.exit(1)
+})
@@ -0,0 +1,26 @@
+"""Read-only access to the year partitions `parser.py --partition-years` registers in lobbying.db, for the scripts
+that inspect a built database. parser.py keeps its own attach_year_partitions: it runs before scripts/ is copied
+into the Docker image and attaches the files writable."""
+
+import sqlite3
+from pathlib import Path
+
+PARTITIONED_TABLES = ("lobbying_records", "dpo_entries", "lobbying_activity_entries")
+
+
+def attach_year_partitions(conn, db_path):
+    """Attach the closed-year databases `parser.py --partition-years` registered and shadow the partitioned tables
+    with TEMP views over all years, as lib/sqlite.js does."""
+    try:
+        partitions = conn.execute("SELECT year, path FROM year_partitions ORDER BY year").fetchall()
+    except sqlite3.OperationalError:
+        return
+    schemas = ["main"]
+    for year, path in partitions:
+        partition_path = Path(db_path).resolve().parent / path
+        conn.execute(f"ATTACH DATABASE ? AS partition_{year}", (f"file:{partition_path}?mode=ro",))
+        schemas.append(f"partition_{year}")
+    if len(schemas) > 1:
+        for table in PARTITIONED_TABLES:
+            branches = " UNION ALL ".join(f"SELECT * FROM {schema}.{table}" for schema in schemas)
+            conn.execute(f"CREATE TEMP VIEW {table} AS {branches}")